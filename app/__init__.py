@@ -13,7 +13,8 @@ from flask_login import LoginManager
 from .extensions import init_extensions, limiter, db
 from app.utils.logging_config import setup_logger
 from app.utils.db_connection_manager import init_db_connection_manager
-from app.utils.db_utils import setup_db_pool
+from app.utils.db_utils import setup_db_pool, ensure_indexes
+from app.utils.full_text_search import init_full_text_search
 from config import get_config
 
 from app.utils.filters import from_json, json_loads_filter
@@ -40,6 +41,9 @@ from app.services.initializer import initialize_services
 from app.services.apt_update_service import update_databases
 from .error_handlers import error_bp
 from app.cli.auto_tag_command import init_app as init_auto_tag_command
+from app.cli.entity_counter_command import init_app as init_entity_counter_command
+from app.cli.vector_index_command import init_app as init_vector_index_command
+from app.cli.content_maintenance_command import init_app as init_content_maintenance_command
 
 load_dotenv()
 
@@ -133,6 +137,8 @@ def create_app(config_name=None):
         init_db_connection_manager(app)
         setup_db_pool()
         db.create_all()  # Add this line to create all database tables
+        ensure_indexes()
+        init_full_text_search(db.engine)
         logger.info("Database tables created/updated and connection manager initialized")
 
     # Register blueprints
@@ -171,6 +177,9 @@ def create_app(config_name=None):
         initialize_services(app)
     init_auto_tag_command(app)
     logger.info("Auto-tag command initialized")
+    init_entity_counter_command(app)
+    init_vector_index_command(app)
+    init_content_maintenance_command(app)
 
     @login_manager.user_loader
     def load_user(user_id):
@@ -5,29 +5,102 @@ It defines various endpoints for retrieving content, feeds, users,
 and for summarizing content using the Ollama API.
 """
 
-from flask import Blueprint, jsonify, request
+import json
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_login import login_required
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from app.models.relational import db, ParsedContent, RSSFeed, User
+from app.utils.llm_cache import llm_cache_stats
+from app.utils.experimental_ollama_client import json_generation_stats
+from app.utils.pagination import after_cursor_clause, encode_cursor, keyset_paginate
 
 try:
     from app.utils.ollama_client import OllamaAPI
 except ImportError:
     OllamaAPI = None
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
 
 api_bp = Blueprint('api', __name__)
 
+CONTENT_PAGE_SIZE = 100
+MAX_CONTENT_PAGE_SIZE = 1000
+# Rows fetched from the database cursor per round trip while streaming NDJSON.
+CONTENT_STREAM_BATCH_SIZE = 500
+
 @api_bp.route('/content', methods=['GET'])
 @login_required
 def get_content() -> Dict[str, Any]:
     """
-    Retrieve all parsed content.
+    Retrieve parsed content newest first, without article bodies and summaries.
+
+    Query parameters:
+        limit: Page size (default CONTENT_PAGE_SIZE, at most MAX_CONTENT_PAGE_SIZE).
+        after / before: Cursors from a previous page's next_cursor / prev_cursor.
+        format: 'ndjson' streams every item after the optional 'after' cursor,
+            one JSON object per line, instead of returning a single page.
 
     Returns:
-        Dict[str, Any]: A JSON response containing all parsed content.
+        Dict[str, Any]: A JSON page of content with cursors for the neighbouring pages,
+        or an application/x-ndjson stream.
+    """
+    after = request.args.get('after')
+    if request.args.get('format') == 'ndjson':
+        try:
+            statement = _content_stream_statement(after)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return Response(stream_with_context(_stream_content(statement)), mimetype='application/x-ndjson')
+
+    limit = min(max(request.args.get('limit', CONTENT_PAGE_SIZE, type=int), 1), MAX_CONTENT_PAGE_SIZE)
+    query = ParsedContent.query.options(joinedload(ParsedContent.feed))
+    try:
+        page = keyset_paginate(query, limit, after=after, before=request.args.get('before'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'content': [item.to_list_dict() for item in page.items],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor
+    })
+
+def _content_stream_statement(after: Optional[str]):
+    """Build the newest-first content query streamed by get_content, resuming after a cursor."""
+    statement = select(ParsedContent).options(joinedload(ParsedContent.feed))
+    if after:
+        statement = statement.where(after_cursor_clause(after))
+    return (
+        statement.order_by(ParsedContent.pub_date.desc(), ParsedContent.id.desc())
+        .execution_options(stream_results=True, yield_per=CONTENT_STREAM_BATCH_SIZE)
+    )
+
+def _stream_content(statement) -> Iterator[str]:
+    """
+    Yield content as NDJSON lines from a server-side cursor.
+
+    Only one batch of rows is held at a time, and each line carries the item's
+    cursor so an interrupted download can resume with ?after=<cursor>.
     """
-    content = ParsedContent.query.all()
-    return jsonify([c.to_dict() for c in content])
+    for item in db.session.execute(statement).scalars():
+        yield json.dumps({**item.to_list_dict(), 'cursor': encode_cursor(item)}) + '\n'
+        # Streamed rows are not needed once written; keep the identity map from growing.
+        db.session.expunge(item)
+
+@api_bp.route('/summaries/stats', methods=['GET'])
+@login_required
+def get_summary_stats() -> Dict[str, Any]:
+    """
+    Report the summary worker's queue depth and throughput, the LLM cache hit
+    rate and how often JSON answers needed repair or a retry.
+
+    Returns:
+        Dict[str, Any]: A JSON response with the worker metrics, or 503 if no worker is running.
+    """
+    worker = getattr(current_app, 'summary_worker', None)
+    if worker is None:
+        return jsonify({'error': 'Summary worker is not running'}), 503
+    return jsonify({**worker.metrics(), 'llm_cache': llm_cache_stats(), 'llm_json': json_generation_stats()})
 
 @api_bp.route('/feeds', methods=['GET'])
 @login_required
@@ -93,13 +166,11 @@ def example():
     return jsonify({"message": "This is an example API route"})
 
 # Add other API routes here
-from flask import Blueprint, jsonify
 from flask_login import login_required
 from app.extensions import limiter
 from app.services.news_rollup_service import NewsRollupService
 import logging
 
-api_bp = Blueprint('api', __name__)
 logger = logging.getLogger('app')
 
 @api_bp.route('/generate_rollups', methods=['GET'])
@@ -1,6 +1,8 @@
+from datetime import datetime, timedelta
 from flask import render_template, jsonify, request
 from . import dashboard_bp
 from app.utils.mongodb_connection import get_mongo_client
+from app.services.entity_counter_service import EntityCounterService
 from flask import current_app
 
 @dashboard_bp.route('/')
@@ -8,37 +10,33 @@ def dashboard():
     # Render the dashboard template
     return render_template('dashboard.html')
 
+def _parse_day(value):
+    """Validate a YYYY-MM-DD query parameter and return it unchanged, or None if absent."""
+    if not value:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+
 @dashboard_bp.route('/api/entity-frequency')
 def entity_frequency():
     mongo_client = None
     try:
-        # Get the 'label' query parameter if provided
+        # Optional filters: entity label, and a time window given either as
+        # 'days' (ending today) or as explicit 'start'/'end' dates.
         label = request.args.get('label')
+        days = request.args.get('days', type=int)
+        try:
+            start_day = _parse_day(request.args.get('start'))
+            end_day = _parse_day(request.args.get('end'))
+        except ValueError:
+            return jsonify({'error': 'Dates must use the YYYY-MM-DD format'}), 400
+        if days and not start_day:
+            start_day = (datetime.utcnow().date() - timedelta(days=days - 1)).isoformat()
 
         mongo_client = get_mongo_client()
         db = mongo_client[current_app.config['MONGO_DB_NAME']]
-        pipeline = [
-            {'$unwind': '$content_tags'},
-        ]
-
-        # Filter by label if provided
-        if label:
-            pipeline.append({'$match': {'content_tags.label': label}})
-
-        pipeline.extend([
-            {
-                '$group': {
-                    '_id': '$content_tags.text',
-                    'label': {'$first': '$content_tags.label'},
-                    'count': {'$sum': 1}
-                }
-            },
-            {'$sort': {'count': -1}},
-            {'$limit': 10}
-        ])
-
-        results = db['parsed_content'].aggregate(pipeline)
-        data = [{'text': doc['_id'], 'label': doc['label'], 'count': doc['count']} for doc in results]
+        data = EntityCounterService.top_entities(
+            db, label=label, start_day=start_day, end_day=end_day, limit=10
+        )
         return jsonify(data)
     except Exception as e:
         current_app.logger.error(f"Error in entity_frequency: {str(e)}")
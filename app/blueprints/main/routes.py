@@ -9,6 +9,7 @@ from datetime import datetime, time
 from sqlalchemy import desc
 from app.services.news_rollup_service import NewsRollupService
 from app.extensions import db
+from app.utils.sse import iterate_async, sse_event, sse_response
 
 @bp.route('/about')
 def about():
@@ -71,25 +72,18 @@ def index():
 
 @bp.route('/generate_rollup/<rollup_type>')
 @login_required
-async def generate_single_rollup(rollup_type):
-    service = NewsRollupService()
+def generate_single_rollup(rollup_type):
     try:
-        existing_rollup = service.get_latest_rollup(rollup_type)
-        if existing_rollup:
-            rollup = existing_rollup['content']
-            audio_url = url_for('static', filename=f'audio/{os.path.basename(existing_rollup["audio_file"])}') if existing_rollup['audio_file'] else None
-        else:
-            rollup = await service.generate_rollup(rollup_type)
-            if isinstance(rollup, dict) and 'error' in rollup:
-                current_app.logger.error(f"Error in rollup generation: {rollup['error']}")
-                return render_template('rollup.html', rollup_type=rollup_type, rollup_content=rollup)
-            
-            audio_file = service.generate_audio_rollup(rollup, rollup_type)
-            audio_url = url_for('static', filename=f'audio/{os.path.basename(audio_file)}') if audio_file else None
-            
-            # Store the new rollup
-            await service.create_and_store_rollup(rollup_type)
-        
+        if rollup_type not in NewsRollupService.ROLLUP_TYPES:
+            raise ValueError(f"Invalid rollup_type: {rollup_type}")
+        existing_rollup = NewsRollupService.get_latest_rollup(rollup_type)
+        if not existing_rollup:
+            # Render at once and stream the rollup into the page as it is generated
+            return render_template('rollup.html', rollup_type=rollup_type, rollup_content={},
+                                   stream_url=url_for('main.stream_rollup', rollup_type=rollup_type))
+
+        rollup = existing_rollup['content']
+        audio_url = url_for('static', filename=f'audio/{os.path.basename(existing_rollup["audio_file"])}') if existing_rollup['audio_file'] else None
         return render_template('rollup.html', rollup_type=rollup_type, rollup_content=rollup, audio_url=audio_url)
     except ValueError as e:
         current_app.logger.error(f"Invalid rollup type: {str(e)}")
@@ -98,6 +92,44 @@ async def generate_single_rollup(rollup_type):
         current_app.logger.error(f"Error generating rollup: {str(e)}")
         return render_template('rollup.html', rollup_type=rollup_type, rollup_content={'error': "Failed to generate rollup"})
 
+@bp.route('/generate_rollup/<rollup_type>/stream')
+@login_required
+def stream_rollup(rollup_type):
+    """
+    Generate a rollup, streaming the model's output as server-sent events.
+
+    `token` events carry the output as it is generated; a final `done` event
+    follows once the rollup is stored, or a `failed` event with the error.
+
+    Args:
+        rollup_type (str): One of morning, midday or end_of_day.
+
+    Returns:
+        flask.Response: A text/event-stream response.
+
+    Raises:
+        404: If the rollup type is unknown.
+    """
+    if rollup_type not in NewsRollupService.ROLLUP_TYPES:
+        return jsonify({"error": "Invalid rollup type"}), 404
+    service = NewsRollupService()
+
+    def events():
+        if not service.get_latest_rollup(rollup_type):
+            try:
+                for token in iterate_async(service.stream_rollup(rollup_type)):
+                    yield sse_event('token', {"text": token})
+            except Exception as e:
+                current_app.logger.error(f"Error streaming rollup: {str(e)}")
+                yield sse_event('failed', {"error": "Failed to generate rollup"})
+                return
+        if service.get_latest_rollup(rollup_type):
+            yield sse_event('done', {"rollup_type": rollup_type})
+        else:
+            yield sse_event('failed', {"error": "Failed to generate rollup"})
+
+    return sse_response(events())
+
 @bp.route('/apt-groups')
 def apt_groups():
     return redirect(url_for('apt.apt_groups'))
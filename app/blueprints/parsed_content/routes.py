@@ -5,6 +5,8 @@ from datetime import datetime, time
 from .services import ParsedContentService
 from . import bp
 from app.models.relational.parsed_content import ParsedContent
+from app.utils.pagination import keyset_paginate
+from sqlalchemy.orm import joinedload
 
 @bp.route('/')
 def parsed_content():
@@ -18,12 +20,12 @@ def parsed_content():
     start_of_day = datetime.combine(selected_date, time.min)
     end_of_day = datetime.combine(selected_date, time.max)
 
-    content = ParsedContent.query.filter(
+    # Feeds are joined in so that rendering rss_feed_title does not query once per item
+    content = ParsedContent.query.options(joinedload(ParsedContent.feed)).filter(
         ParsedContent.pub_date.between(start_of_day, end_of_day)
     ).order_by(ParsedContent.pub_date.desc()).all()
 
-    parsed_content_service = ParsedContentService()
-    stats = parsed_content_service.calculate_stats(content)
+    stats = ParsedContentService.get_content_stats(selected_date)
 
     return render_template('parsed_content/index.html', content=content, stats=stats, selected_date=selected_date.isoformat())
 
@@ -34,15 +36,32 @@ def list_content():
     start_of_day = datetime.combine(selected_date, time.min)
     end_of_day = datetime.combine(selected_date, time.max)
 
-    content = ParsedContent.query.filter(
+    query = ParsedContent.query.options(joinedload(ParsedContent.feed)).filter(
         ParsedContent.pub_date.between(start_of_day, end_of_day)
-    ).order_by(ParsedContent.pub_date.desc()).all()
+    )
+
+    stats = ParsedContentService.get_content_stats(selected_date)
+
+    # With a 'limit', return one keyset page ('after'/'before' cursors) instead of the whole day
+    limit = request.args.get('limit', type=int)
+    if limit:
+        try:
+            page = keyset_paginate(
+                query, limit, after=request.args.get('after'), before=request.args.get('before')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'content': [item.to_list_dict() for item in page.items],
+            'stats': stats,
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor
+        })
 
-    parsed_content_service = ParsedContentService()
-    stats = parsed_content_service.calculate_stats(content)
+    content = query.order_by(ParsedContent.pub_date.desc()).all()
 
     return jsonify({
-        'content': [item.to_dict() for item in content],
+        'content': [item.to_list_dict() for item in content],
         'stats': stats
     })
 
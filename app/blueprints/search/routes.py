@@ -1,14 +1,27 @@
-from flask import Blueprint, render_template, request, current_app, jsonify, abort
+from flask import Blueprint, render_template, request, current_app, jsonify, abort, url_for
 from flask_wtf import FlaskForm
 from flask_login import login_required
 from app.models import SearchParams
+from app.extensions import db
 from app.models.relational.parsed_content import ParsedContent
+from app.models.relational.summary_job import SummaryJob
 
 search_bp = Blueprint('search', __name__)
-from app.utils.search_utils import get_search_params, perform_search, build_search_query
+from app.utils.search_utils import get_search_params, perform_search, build_search_query, compute_search_facets
+from app.utils.search_cache import search_cache_stats
+from app.utils.vector_index import DEFAULT_TOP_K, MAX_TOP_K, similar_content_ids
 from app.services.summary_service import SummaryService
+from app.utils.sse import iterate_async, sse_event, sse_response
+import time
 import uuid
 
+# Summary job event streams check the job at least this often. Each connection is closed
+# after SUMMARY_EVENTS_CONNECTION_TIMEOUT so a waiting client never holds a server thread
+# for long; EventSource reconnects after SUMMARY_EVENTS_RETRY_MS.
+SUMMARY_EVENTS_POLL_INTERVAL = 5
+SUMMARY_EVENTS_CONNECTION_TIMEOUT = 30
+SUMMARY_EVENTS_RETRY_MS = 1000
+
 @search_bp.route("/search", methods=["GET", "POST"])
 def search():
     """
@@ -24,7 +37,10 @@ def search():
     Note:
         - For GET requests, it populates search parameters from URL query parameters.
         - For POST requests, it uses form data to set search parameters.
-        - Pagination is supported through the 'page' parameter.
+        - Results are paged with the 'after'/'before' cursors, or with 'page'
+          when sorting by relevance.
+        - Facet counts by feed, category, tagged entity and publication day
+          are computed over the whole hit set, not just the current page.
     """
     form = FlaskForm()
     search_params = SearchParams(query="")  # Initialize with an empty query
@@ -44,21 +60,49 @@ def search():
         search_params = get_search_params(form)
 
     page = request.args.get('page', 1, type=int)
+    sort = request.args.get('sort', 'date')
     if form.validate_on_submit() or request.method == "GET":
         current_app.logger.info(f"Performing search with params: {search_params.__dict__}")
-        results, total_results = perform_search(search_params, page, per_page=10, order_by=ParsedContent.pub_date.desc())
+        results, total_results = perform_search(
+            search_params,
+            page=page,
+            per_page=10,
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+            order_by_relevance=(sort == 'relevance'),
+        )
         current_app.logger.info(f"Search completed. Total results: {total_results}")
+        facets = compute_search_facets(search_params) if total_results else None
+        # Query arguments for pagination links, without the current page position
+        page_args = {
+            key: value for key, value in request.args.items()
+            if key not in ('page', 'after', 'before')
+        }
         return render_template(
             "search.html",
             form=form,
             search_params=search_params,
             results=results,
             total_results=total_results,
-            page=page
+            page=page,
+            sort=sort,
+            page_args=page_args,
+            facets=facets
         )
 
     return render_template("search.html", form=form, search_params=search_params)
 
+@search_bp.route("/cache_stats")
+@login_required
+def cache_stats():
+    """
+    Report hit rates of the search result and hit-count caches.
+
+    Returns:
+        flask.Response: JSON list with hits, misses, hit_rate and size per cache.
+    """
+    return jsonify(search_cache_stats()), 200
+
 @search_bp.route("/view/<uuid:item_id>")
 def view_item(item_id):
     """
@@ -76,22 +120,71 @@ def view_item(item_id):
     item = ParsedContent.query.get_or_404(item_id)
     return render_template("view_item.html", item=item)
 
+@search_bp.route("/similar/<uuid:item_id>")
+def similar_items(item_id):
+    """
+    Return the articles most similar to a parsed content item.
+
+    Neighbours come from the local vector index; articles deleted since they
+    were indexed are skipped.
+
+    Args:
+        item_id (uuid.UUID): The UUID of the parsed content item.
+
+    Query Parameters:
+        k (int): Number of neighbours to return (default 10, at most 50).
+
+    Returns:
+        flask.Response: JSON with the neighbours, their cosine similarity and
+        the lookup time in milliseconds.
+
+    Raises:
+        404: If the item with the given ID is not found.
+    """
+    item = ParsedContent.query.get_or_404(item_id)
+    k = max(1, min(request.args.get('k', DEFAULT_TOP_K, type=int), MAX_TOP_K))
+
+    started = time.perf_counter()
+    # Over-fetch a little so neighbours deleted from the database can be dropped.
+    neighbours = similar_content_ids(item, k + 5)
+    rows = {
+        row.id: row for row in
+        ParsedContent.query.filter(ParsedContent.id.in_([content_id for content_id, _ in neighbours]))
+    }
+    results = [
+        {
+            'id': str(content_id),
+            'title': rows[content_id].title,
+            'url': rows[content_id].url,
+            'pub_date': rows[content_id].pub_date.isoformat() if rows[content_id].pub_date else None,
+            'score': round(score, 4),
+        }
+        for content_id, score in neighbours
+        if content_id in rows
+    ][:k]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return jsonify({'item_id': str(item_id), 'results': results, 'took_ms': round(elapsed_ms, 2)}), 200
+
 @search_bp.route("/summarize_content", methods=["POST"])
 @login_required
 async def summarize_content():
     """
-    Generate or enhance a summary for a specific parsed content item.
+    Request the summary of a specific parsed content item.
 
-    This asynchronous function takes a content_id from the JSON request,
-    uses the SummaryService to generate or enhance the summary, and returns
-    the result.
+    The request is queued ahead of the summary backlog and answered at once
+    with a job handle; clients follow the job through its status or events
+    URL. An item that already has a summary is answered directly. Without a
+    summary worker (under TESTING) the summary is generated inline.
 
     Returns:
-        flask.Response: JSON response containing the summary or an error message.
+        flask.Response: JSON with the summary (200), or with the job id,
+        status, queue position and status and events URLs (202).
 
     Raises:
         400: If content_id is missing or invalid.
-        500: If there's an error during summary generation.
+        404: If the item does not exist.
+        500: If there's an error queueing or generating the summary.
 
     Note:
         This route requires authentication (login_required).
@@ -103,27 +196,217 @@ async def summarize_content():
 
     try:
         content_id = uuid.UUID(content_id)
-        summary_service = SummaryService()
-        success = await summary_service.enhance_summary(str(content_id))
-        
-        if success:
-            document = ParsedContent.query.get(content_id)
-            current_app.logger.info(
-                f"Summary generated successfully for document id: {content_id}"
-            )
-            return jsonify({"summary": document.summary}), 200
-        else:
-            current_app.logger.error(f"Failed to generate summary for document id: {content_id}")
-            return jsonify({"error": "Failed to generate summary"}), 500
     except ValueError:
         current_app.logger.error(
             f"Invalid UUID format for content_id: {content_id}"
         )
         return jsonify({"error": "Invalid content_id format"}), 400
+
+    document = ParsedContent.query.get(content_id)
+    if document is None:
+        return jsonify({"error": "Content not found"}), 404
+    if document.summary:
+        return jsonify({"summary": document.summary}), 200
+
+    worker = getattr(current_app, 'summary_worker', None)
+    try:
+        if worker is None:
+            success = await SummaryService().enhance_summary(str(content_id))
+            if not success:
+                current_app.logger.error(f"Failed to generate summary for document id: {content_id}")
+                return jsonify({"error": "Failed to generate summary"}), 500
+            db.session.refresh(document)
+            return jsonify({"summary": document.summary}), 200
+
+        job = worker.submit(content_id)
+        current_app.logger.info(f"Queued summary job {job.id} for document id: {content_id}")
+        status_url = url_for('search.summary_job_status', job_id=job.id)
+        response = jsonify({
+            "job_id": str(job.id),
+            "status": job.status,
+            "queue_position": job.queue_position(),
+            "status_url": status_url,
+            "events_url": url_for('search.summary_job_events', job_id=job.id),
+        })
+        response.headers['Location'] = status_url
+        return response, 202
     except Exception as e:
+        db.session.rollback()
         current_app.logger.exception(f"Error summarizing content: {str(e)}")
         return jsonify({"error": f"Error summarizing content: {str(e)}"}), 500
 
+@search_bp.route("/summarize_content/<uuid:content_id>/stream")
+@login_required
+def stream_summary(content_id):
+    """
+    Generate the summary of a parsed content item, streaming it as server-sent events.
+
+    The item's summary job is queued (or raised) to interactive priority and
+    the tokens the worker generates for it are relayed as `token` events, so
+    the first bytes arrive long before the summary is complete and several
+    viewers of one item share a single generation. `status` events report the
+    job while it waits, and a final `done` event carries the stored summary,
+    or a `failed` event the error. An item that already has a summary gets
+    its `done` event at once. Like summary_job_events, a connection ends after
+    SUMMARY_EVENTS_CONNECTION_TIMEOUT seconds and the reconnected stream
+    replays the tokens from the start.
+
+    Args:
+        content_id (uuid.UUID): The UUID of the parsed content item.
+
+    Returns:
+        flask.Response: A text/event-stream response.
+
+    Raises:
+        404: If the item does not exist.
+    """
+    document = db.session.get(ParsedContent, content_id)
+    if document is None:
+        return jsonify({"error": "Content not found"}), 404
+    summary = document.summary
+    worker = getattr(current_app, 'summary_worker', None)
+    if summary:
+        return sse_response(iter([sse_event('done', {"summary": summary})]))
+    if worker is None:
+        # Without a worker (e.g. under TESTING) the summary is streamed in this request
+        db.session.rollback()
+        return sse_response(_stream_summary_inline(content_id))
+    job_id = worker.submit(content_id).id
+
+    def events():
+        yield f"retry: {SUMMARY_EVENTS_RETRY_MS}\n\n"
+        deadline = time.monotonic() + SUMMARY_EVENTS_CONNECTION_TIMEOUT
+        sent, last_state = 0, None
+        while True:
+            job = db.session.query(SummaryJob).populate_existing().filter_by(id=job_id).first()
+            if job is None:
+                yield sse_event('failed', {"error": "Summary job not found"})
+                return
+            state = _summary_job_state(job)
+            finished = job.is_finished
+            # End the read transaction so the next poll sees the worker's commits
+            db.session.rollback()
+            if finished:
+                yield sse_event(state['status'], state)
+                return
+            if (state['status'], state['queue_position']) != last_state:
+                last_state = (state['status'], state['queue_position'])
+                yield sse_event('status', state)
+            else:
+                yield ": keep-alive\n\n"
+            # Relay tokens until none arrive, then check the job again
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                tokens = worker.job_tokens(job_id, sent, min(SUMMARY_EVENTS_POLL_INTERVAL, remaining))
+                if not tokens:
+                    break
+                sent += len(tokens)
+                for token in tokens:
+                    yield sse_event('token', {"text": token})
+
+    return sse_response(events())
+
+def _stream_summary_inline(content_id: uuid.UUID):
+    try:
+        for token in iterate_async(SummaryService().stream_summary(str(content_id))):
+            yield sse_event('token', {"text": token})
+    except Exception as e:
+        current_app.logger.exception(f"Error streaming summary of {content_id}: {str(e)}")
+        yield sse_event('failed', {"error": f"Error summarizing content: {str(e)}"})
+        return
+    document = db.session.get(ParsedContent, content_id)
+    if document is not None and document.summary:
+        yield sse_event('done', {"summary": document.summary})
+    else:
+        yield sse_event('failed', {"error": "Failed to generate summary"})
+
+def _summary_job_state(job: SummaryJob) -> dict:
+    state = job.to_dict()
+    state['queue_position'] = job.queue_position()
+    if job.status == SummaryJob.DONE:
+        document = db.session.get(ParsedContent, job.parsed_content_id)
+        state['summary'] = document.summary if document else None
+    return state
+
+@search_bp.route("/summary_jobs/<uuid:job_id>")
+@login_required
+def summary_job_status(job_id):
+    """
+    Report the state of a summary job.
+
+    Args:
+        job_id (uuid.UUID): The id returned by summarize_content.
+
+    Returns:
+        flask.Response: JSON with the job, its queue position while queued
+        and the summary once done.
+
+    Raises:
+        404: If the job does not exist (finished jobs are pruned after a week).
+    """
+    job = db.session.get(SummaryJob, job_id)
+    if job is None:
+        return jsonify({"error": "Summary job not found"}), 404
+    return jsonify(_summary_job_state(job)), 200
+
+@search_bp.route("/summary_jobs/<uuid:job_id>/events")
+@login_required
+def summary_job_events(job_id):
+    """
+    Stream the progress of a summary job as server-sent events.
+
+    A `status` event is sent whenever the status or queue position changes,
+    and a final `done` or `failed` event carries the summary or the error.
+    Comment lines keep the connection alive while the job waits. The stream
+    ends after SUMMARY_EVENTS_CONNECTION_TIMEOUT seconds without a final
+    event and the browser's EventSource reconnects to keep waiting.
+
+    Args:
+        job_id (uuid.UUID): The id returned by summarize_content.
+
+    Returns:
+        flask.Response: A text/event-stream response.
+
+    Raises:
+        404: If the job does not exist.
+    """
+    if db.session.get(SummaryJob, job_id) is None:
+        return jsonify({"error": "Summary job not found"}), 404
+    worker = getattr(current_app, 'summary_worker', None)
+
+    def events():
+        yield f"retry: {SUMMARY_EVENTS_RETRY_MS}\n\n"
+        deadline = time.monotonic() + SUMMARY_EVENTS_CONNECTION_TIMEOUT
+        last_state = None
+        while True:
+            job = db.session.query(SummaryJob).populate_existing().filter_by(id=job_id).first()
+            if job is None:
+                yield sse_event('failed', {"error": "Summary job not found"})
+                return
+            state = _summary_job_state(job)
+            finished = job.is_finished
+            # End the read transaction so the next poll sees the worker's commits
+            db.session.rollback()
+            if finished:
+                yield sse_event(state['status'], state)
+                return
+            if (state['status'], state['queue_position']) != last_state:
+                last_state = (state['status'], state['queue_position'])
+                yield sse_event('status', state)
+            else:
+                yield ": keep-alive\n\n"
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if worker is not None:
+                worker.wait_for_job_update(min(SUMMARY_EVENTS_POLL_INTERVAL, remaining))
+            else:
+                time.sleep(min(SUMMARY_EVENTS_POLL_INTERVAL, remaining))
+
+    return sse_response(events())
+
 @search_bp.route("/clear_all_summaries", methods=["POST"])
 @login_required
 def clear_all_summaries():
@@ -0,0 +1,201 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.orm import undefer_group
+from datetime import datetime
+from app.extensions import db
+from app.models.relational.daily_stats import RECENT_DAYS, DailyStats
+from app.models.relational.parsed_content import (
+    COMPRESS_CHUNK_SIZE, DEDUPLICATE_CHUNK_SIZE, HASH_CHUNK_SIZE, ParsedContent,
+)
+from app.utils.compressed_text import compress_text, decompress_text
+from app.utils.full_text_search import rebuild_full_text_index
+from app.utils.llm_cache import clear_llm_cache, llm_cache_stats
+from app.utils.logging_config import setup_logger
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import traceback
+
+logger = setup_logger('content_maintenance_command', 'content_maintenance_command.log', level=logging.DEBUG)
+
+@click.command('deduplicate-content')
+@click.option('--chunk-size', default=DEDUPLICATE_CHUNK_SIZE, show_default=True,
+              help='Duplicates deleted per transaction.')
+@with_appcontext
+def deduplicate_content_command(chunk_size):
+    """Delete parsed content that repeats an earlier article's URL."""
+    logger.info(f"Starting deduplicate_content_command with chunk_size={chunk_size}")
+    try:
+        deleted = ParsedContent.deduplicate(chunk_size=chunk_size)
+        logger.info(f"Deduplication removed {deleted} duplicate items")
+        click.echo(f"Removed {deleted} duplicate items.")
+    except Exception as e:
+        logger.error(f"An error occurred during deduplication: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred during deduplication. Check the logs for details.")
+
+@click.command('hash-articles')
+@click.option('--chunk-size', default=HASH_CHUNK_SIZE, show_default=True,
+              help='Articles hashed per transaction.')
+@click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start from the first article.')
+@with_appcontext
+def hash_articles_command(chunk_size, restart):
+    """Compute art_hash for every article, resuming from the last checkpoint."""
+    logger.info(f"Starting hash_articles_command with chunk_size={chunk_size}, restart={restart}")
+    try:
+        hashed = ParsedContent.hash_existing_articles(chunk_size=chunk_size, restart=restart)
+        logger.info(f"Hashed {hashed} articles")
+        click.echo(f"Hashed {hashed} articles.")
+    except Exception as e:
+        logger.error(f"An error occurred while hashing articles: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while hashing articles. Re-run the command to resume from the last checkpoint.")
+
+@click.command('compress-content')
+@click.option('--chunk-size', default=COMPRESS_CHUNK_SIZE, show_default=True,
+              help='Articles rewritten per transaction.')
+@click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start from the first article.')
+@click.option('--vacuum', is_flag=True, help='Run VACUUM afterwards so the database file shrinks.')
+@with_appcontext
+def compress_content_command(chunk_size, restart, vacuum):
+    """Compress article bodies and summaries stored before compression was enabled."""
+    logger.info(f"Starting compress_content_command with chunk_size={chunk_size}, restart={restart}")
+    try:
+        compressed = ParsedContent.compress_existing_articles(chunk_size=chunk_size, restart=restart)
+        logger.info(f"Compressed {compressed} articles")
+        click.echo(f"Compressed {compressed} articles.")
+        if vacuum and db.engine.dialect.name == 'sqlite':
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql("VACUUM")
+            # VACUUM may renumber the rowids the search index is keyed on
+            rebuild_full_text_index(db.engine)
+            click.echo("Vacuumed the database and rebuilt the search index.")
+    except Exception as e:
+        logger.error(f"An error occurred while compressing articles: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while compressing articles. Re-run the command to resume from the last checkpoint.")
+
+def _storage_benchmark(rows, compressed, repeat):
+    """Write rows to a scratch SQLite file and time full-table reads; returns (bytes on disk, seconds per read)."""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE articles (id INTEGER PRIMARY KEY, content TEXT, summary TEXT)")
+        encode = compress_text if compressed else (lambda value: value)
+        connection.executemany(
+            "INSERT INTO articles (content, summary) VALUES (?, ?)",
+            [(encode(content), encode(summary) if summary is not None else None) for content, summary in rows],
+        )
+        connection.commit()
+        connection.execute("VACUUM")
+        size = os.path.getsize(path)
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for content, summary in connection.execute("SELECT content, summary FROM articles"):
+                decompress_text(content)
+                decompress_text(summary)
+            timings.append(time.perf_counter() - started)
+        connection.close()
+        return size, min(timings)
+    finally:
+        os.remove(path)
+
+@click.command('benchmark-content-storage')
+@click.option('--sample', default=1000, show_default=True, help='Number of most recent articles to benchmark with.')
+@click.option('--repeat', default=5, show_default=True, help='Full-table reads per storage format; the fastest is reported.')
+@with_appcontext
+def benchmark_content_storage_command(sample, repeat):
+    """Compare disk size and read throughput of plain and compressed article storage."""
+    articles = (
+        ParsedContent.query.options(undefer_group('body'), undefer_group('summary'))
+        .order_by(ParsedContent.created_at.desc())
+        .limit(sample)
+        .all()
+    )
+    if not articles:
+        click.echo("No articles to benchmark.")
+        return
+    rows = [
+        (article.content, json.dumps(article.summary) if article.summary is not None else None)
+        for article in articles
+    ]
+    text_mb = sum(len(content.encode()) + len((summary or '').encode()) for content, summary in rows) / 1e6
+
+    click.echo(f"{len(rows)} articles, {text_mb:.1f} MB of text")
+    results = {}
+    for label, compressed in (('plain', False), ('compressed', True)):
+        size, seconds = _storage_benchmark(rows, compressed, repeat)
+        results[label] = size
+        click.echo(
+            f"{label:>10}: {size / 1e6:8.2f} MB on disk, "
+            f"{len(rows) / seconds:10.0f} rows/s, {text_mb / seconds:8.1f} MB/s read"
+        )
+    click.echo(f"Compressed storage is {results['compressed'] / results['plain']:.0%} of plain size.")
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuild the full-text search index; run it after a manual VACUUM of the SQLite database."""
+    try:
+        rebuild_full_text_index(db.engine)
+        click.echo("Rebuilt the search index.")
+    except Exception as e:
+        logger.error(f"An error occurred while rebuilding the search index: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while rebuilding the search index. Check the logs for details.")
+
+@click.command('llm-cache')
+@click.option('--clear', is_flag=True, help='Drop every cached LLM response.')
+@with_appcontext
+def llm_cache_command(clear):
+    """Show the LLM response cache statistics, or clear the cache."""
+    try:
+        if clear:
+            removed = clear_llm_cache()
+            logger.info(f"Cleared {removed} cached LLM responses")
+            click.echo(f"Removed {removed} cached LLM responses.")
+            return
+        stats = llm_cache_stats()
+        click.echo(json.dumps(stats, indent=2) if stats else "The LLM cache is disabled.")
+    except Exception as e:
+        logger.error(f"An error occurred while accessing the LLM cache: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while accessing the LLM cache. Check the logs for details.")
+
+@click.command('daily-stats')
+@click.option('--day', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Rebuild the stats of this day (YYYY-MM-DD) only.')
+@click.option('--days', default=RECENT_DAYS, show_default=True,
+              help='Number of most recent days, today included, to rebuild.')
+@with_appcontext
+def daily_stats_command(day, days):
+    """Rebuild the materialized dashboard stats from the source tables."""
+    try:
+        today = datetime.utcnow().date()
+        if day is not None:
+            DailyStats.materialize(day.date(), finalized=day.date() < today)
+            db.session.commit()
+            click.echo(f"Rebuilt daily stats for {day.date()}.")
+            return
+        rebuilt = DailyStats.materialize_recent_days(days, rebuild=True)
+        click.echo(f"Rebuilt daily stats for {rebuilt} day(s).")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"An error occurred while rebuilding daily stats: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while rebuilding daily stats. Check the logs for details.")
+
+def init_app(app):
+    app.cli.add_command(deduplicate_content_command)
+    app.cli.add_command(hash_articles_command)
+    app.cli.add_command(compress_content_command)
+    app.cli.add_command(benchmark_content_storage_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(llm_cache_command)
+    app.cli.add_command(daily_stats_command)
@@ -0,0 +1,32 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from app.services.entity_counter_service import EntityCounterService
+from app.utils.mongodb_connection import get_mongo_client
+from app.utils.logging_config import setup_logger
+import logging
+import traceback
+
+logger = setup_logger('entity_counter_command', 'entity_counter_command.log', level=logging.DEBUG)
+
+@click.command('rebuild-entity-counters')
+@with_appcontext
+def rebuild_entity_counters_command():
+    """Recompute the dashboard entity counters from all tagged content."""
+    logger.info("Starting rebuild_entity_counters_command")
+    mongo_client = None
+    try:
+        mongo_client = get_mongo_client()
+        db = mongo_client[current_app.config['MONGO_DB_NAME']]
+        written = EntityCounterService.rebuild(db)
+        click.echo(f"Rebuilt {written} entity counters.")
+    except Exception as e:
+        logger.error(f"An error occurred while rebuilding entity counters: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while rebuilding entity counters. Check the logs for details.")
+    finally:
+        if mongo_client:
+            mongo_client.close()
+
+def init_app(app):
+    app.cli.add_command(rebuild_entity_counters_command)
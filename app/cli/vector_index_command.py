@@ -0,0 +1,55 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from app.extensions import db
+from app.models.relational.parsed_content import ParsedContent
+from app.utils.vector_index import get_vector_index, index_content
+from app.utils.logging_config import setup_logger
+import logging
+import traceback
+
+logger = setup_logger('vector_index_command', 'vector_index_command.log', level=logging.DEBUG)
+
+BATCH_SIZE = 500
+
+@click.command('build-vector-index')
+@click.option('--rebuild', is_flag=True, help='Drop the existing index and re-embed every article.')
+@with_appcontext
+def build_vector_index_command(rebuild):
+    """Embed parsed content that is missing from the related-articles index."""
+    logger.info(f"Starting build_vector_index_command with rebuild={rebuild}")
+    try:
+        index = get_vector_index()
+        if rebuild:
+            index.reset()
+
+        statement = (
+            select(ParsedContent)
+            .options(load_only(ParsedContent.id, ParsedContent.title,
+                               ParsedContent.description, ParsedContent.content))
+            .order_by(ParsedContent.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        batch = []
+        added = 0
+        for item in db.session.execute(statement).scalars():
+            if item.id in index:
+                continue
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE:
+                added += index_content(batch)
+                batch = []
+                click.echo(f"Embedded {added} articles...")
+        if batch:
+            added += index_content(batch)
+
+        logger.info(f"Vector index now holds {len(index)} articles ({added} added)")
+        click.echo(f"Embedded {added} articles; the index now holds {len(index)}.")
+    except Exception as e:
+        logger.error(f"An error occurred while building the vector index: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        click.echo("An error occurred while building the vector index. Check the logs for details.")
+
+def init_app(app):
+    app.cli.add_command(build_vector_index_command)
@@ -9,6 +9,10 @@ from .relational.alltools import AllTools, AllToolsValues, AllToolsValuesNames
 from .relational.allgroups import AllGroups, AllGroupsValues, AllGroupsValuesNames
 from .relational.rollup import Rollup
 from .relational.content_tag import ContentTag
+from .relational.content_fingerprint import ContentFingerprint, LSHBucket
+from .relational.job_checkpoint import JobCheckpoint
+from .relational.daily_stats import DailyStatCount, DailyStats
+from .relational.summary_job import SummaryJob
 
 __all__ = [
     "db",
@@ -26,4 +30,10 @@ __all__ = [
     "AllGroupsValuesNames",
     "Rollup",
     "ContentTag",
+    "ContentFingerprint",
+    "LSHBucket",
+    "JobCheckpoint",
+    "DailyStats",
+    "DailyStatCount",
+    "SummaryJob",
 ]
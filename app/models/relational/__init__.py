@@ -9,6 +9,10 @@ from .alltools import AllTools, AllToolsValues, AllToolsValuesNames
 from .allgroups import AllGroups, AllGroupsValues, AllGroupsValuesNames
 from .rollup import Rollup
 from .content_tag import ContentTag
+from .content_fingerprint import ContentFingerprint, LSHBucket
+from .job_checkpoint import JobCheckpoint
+from .daily_stats import DailyStatCount, DailyStats
+from .summary_job import SummaryJob
 
 __all__ = [
     "db",
@@ -26,4 +30,10 @@ __all__ = [
     "AllGroupsValuesNames",
     "Rollup",
     "ContentTag",
+    "ContentFingerprint",
+    "LSHBucket",
+    "JobCheckpoint",
+    "DailyStats",
+    "DailyStatCount",
+    "SummaryJob",
 ]
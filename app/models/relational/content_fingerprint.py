@@ -0,0 +1,40 @@
+from __future__ import annotations
+from datetime import datetime
+from uuid import uuid4
+from sqlalchemy import Column, DateTime, ForeignKey, Index, LargeBinary, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from app.extensions import db
+
+class ContentFingerprint(db.Model):
+    """MinHash signature of an article and the near-duplicate cluster it belongs to."""
+
+    __tablename__ = 'content_fingerprints'
+
+    parsed_content_id = Column(UUID(as_uuid=True), ForeignKey('parsed_content.id'), primary_key=True)
+    # Id of the first article seen in the cluster; equal to parsed_content_id for originals.
+    cluster_id = Column(UUID(as_uuid=True), nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_content_fingerprints_cluster_id', cluster_id),
+    )
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.cluster_id != self.parsed_content_id
+
+class LSHBucket(db.Model):
+    """One locality-sensitive hashing band of a fingerprint, keyed by band number and band hash."""
+
+    __tablename__ = 'lsh_buckets'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    band_key = Column(String(24), nullable=False)
+    parsed_content_id = Column(UUID(as_uuid=True), ForeignKey('parsed_content.id'), nullable=False)
+
+    __table_args__ = (
+        # Also serves the candidate lookup by band_key
+        UniqueConstraint(band_key, parsed_content_id, name='uq_lsh_buckets_band_key_parsed_content_id'),
+        Index('idx_lsh_buckets_parsed_content_id', parsed_content_id),
+    )
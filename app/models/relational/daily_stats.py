@@ -0,0 +1,276 @@
+"""
+Materialized per-day statistics for the parsed content dashboard.
+
+A daily_stats row marks a publication day whose article, feed, author and actor
+counts are stored in daily_stat_counts, one row per counted key. Rows are built
+by the scheduler (and the daily-stats CLI command) and afterwards kept current
+by a before_flush hook that applies the inserts and deletes of ParsedContent
+and actor ContentTag rows as atomic `count = count + delta` upserts, so
+concurrent ingest transactions never overwrite each other's increments.
+Reading a stored day is a single indexed query; days that are not stored yet
+are aggregated from the source tables without writing anything.
+
+Past days are recounted once more and marked finalized by the scheduler, which
+corrects any drift from writes that raced the day being built. Bulk deletes
+bypass the ORM and must call recount_days() with the publication days of the
+deleted rows instead.
+"""
+
+from __future__ import annotations
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import (Boolean, Column, Date, DateTime, Integer, String, UniqueConstraint, and_, event, func,
+                        insert, update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import UUID as UUIDType
+from sqlalchemy.orm import Session
+from app.extensions import db
+from .content_tag import ContentTag
+from .parsed_content import ParsedContent
+from .rss_feed import RSSFeed
+
+UNKNOWN = 'Unknown'
+ACTOR_ENTITY_TYPE = 'actor'
+TOP_COUNT = 3
+# The scheduler keeps this many days, today included, materialized
+RECENT_DAYS = 7
+
+# Count dimensions; articles are counted under a single empty key
+ARTICLES = 'articles'
+FEED = 'feed'
+AUTHOR = 'author'
+ACTOR = 'actor'
+DIMENSIONS = (ARTICLES, FEED, AUTHOR, ACTOR)
+
+class DailyStats(db.Model):
+    """A publication day whose counts are materialized in daily_stat_counts."""
+
+    __tablename__ = 'daily_stats'
+
+    id = Column(UUIDType(as_uuid=True), primary_key=True, default=uuid4)
+    day = Column(Date, nullable=False, unique=True)
+    # Set once the day is over and its counts have been rebuilt from the source tables
+    finalized = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def stats_for_day(cls, day: date) -> Dict[str, Any]:
+        """
+        Return the dashboard stats of a day without writing anything.
+
+        Stored days are read from daily_stat_counts; other days are aggregated
+        from the source tables.
+        """
+        if db.session.query(cls.id).filter_by(day=day).first() is not None:
+            counts = {dimension: {} for dimension in DIMENSIONS}
+            rows = db.session.query(DailyStatCount.dimension, DailyStatCount.key, DailyStatCount.count)\
+                .filter(DailyStatCount.day == day)
+            for dimension, key, count in rows:
+                counts.setdefault(dimension, {})[key] = count
+        else:
+            counts = cls.aggregate(day)
+        return _render_stats(counts)
+
+    @classmethod
+    def aggregate(cls, day: date, session: Optional[Session] = None) -> Dict[str, Dict[str, int]]:
+        """Count a day from the source tables, by dimension and key."""
+        session = session or db.session
+        day_start = datetime.combine(day, time.min)
+        day_end = datetime.combine(day, time.max)
+        on_day = ParsedContent.pub_date.between(day_start, day_end)
+
+        feed_counts = session.query(
+            ParsedContent.feed_id, func.count(ParsedContent.id)
+        ).filter(on_day).group_by(ParsedContent.feed_id).all()
+
+        author = func.coalesce(ParsedContent.creator, UNKNOWN)
+        author_counts = session.query(
+            author, func.count(ParsedContent.id)
+        ).filter(on_day).group_by(author).all()
+
+        actor_counts = session.query(
+            ContentTag.entity_name, func.count(ContentTag.id)
+        ).join(ParsedContent, ContentTag.parsed_content_id == ParsedContent.id)\
+         .filter(ContentTag.entity_type == ACTOR_ENTITY_TYPE, on_day)\
+         .group_by(ContentTag.entity_name)\
+         .all()
+
+        article_count = sum(count for _, count in feed_counts)
+        return {
+            ARTICLES: {'': article_count} if article_count else {},
+            FEED: {feed_id.hex: count for feed_id, count in feed_counts},
+            AUTHOR: dict(author_counts),
+            ACTOR: dict(actor_counts),
+        }
+
+    @classmethod
+    def materialize(cls, day: date, finalized: bool = False, session: Optional[Session] = None) -> DailyStats:
+        """Store a fresh count of a day, replacing any stored one; the caller commits."""
+        session = session or db.session
+        counts = cls.aggregate(day, session)
+        session.query(DailyStatCount).filter(DailyStatCount.day == day).delete(synchronize_session=False)
+        session.add_all(
+            DailyStatCount(day=day, dimension=dimension, key=key, count=count)
+            for dimension, keys in counts.items()
+            for key, count in keys.items()
+        )
+        stats = session.query(cls).filter_by(day=day).first()
+        if stats is None:
+            stats = cls(day=day)
+            session.add(stats)
+        stats.finalized = finalized
+        stats.updated_at = datetime.utcnow()
+        return stats
+
+    @classmethod
+    def materialize_recent_days(cls, days: int = RECENT_DAYS, rebuild: bool = False) -> int:
+        """
+        Store the counts of the most recent days that are not stored yet, or of all of them with rebuild.
+
+        Returns:
+            int: The number of days materialized.
+        """
+        today = datetime.utcnow().date()
+        wanted = [today - timedelta(days=offset) for offset in range(days)]
+        stored = set() if rebuild else {day for (day,) in db.session.query(cls.day).filter(cls.day.in_(wanted))}
+        missing = [day for day in wanted if day not in stored]
+        for day in missing:
+            cls.materialize(day, finalized=day < today)
+        db.session.commit()
+        return len(missing)
+
+    @classmethod
+    def finalize_past_days(cls) -> int:
+        """
+        Recount and finalize every stored day before today.
+
+        Returns:
+            int: The number of days finalized.
+        """
+        days = [
+            day for (day,) in db.session.query(cls.day).filter(
+                cls.day < datetime.utcnow().date(), cls.finalized.is_(False)
+            )
+        ]
+        for day in days:
+            cls.materialize(day, finalized=True)
+        db.session.commit()
+        return len(days)
+
+    @classmethod
+    def recount_days(cls, days: Iterable[date], session: Optional[Session] = None) -> int:
+        """
+        Recount the stored days among days from the source tables; the caller commits.
+
+        Bulk deletes call this with the publication days of the rows they
+        removed, so the other stored days, finalized ones included, stay as they are.
+
+        Returns:
+            int: The number of days recounted.
+        """
+        session = session or db.session
+        days = set(days)
+        if not days:
+            return 0
+        stored = session.query(cls.day, cls.finalized).filter(cls.day.in_(days)).all()
+        for day, finalized in stored:
+            cls.materialize(day, finalized=finalized, session=session)
+        return len(stored)
+
+    def __repr__(self):
+        return f'<DailyStats {self.day} finalized={self.finalized}>'
+
+class DailyStatCount(db.Model):
+    """One count of a materialized day: articles, or articles per feed, author or actor."""
+
+    __tablename__ = 'daily_stat_counts'
+
+    id = Column(UUIDType(as_uuid=True), primary_key=True, default=uuid4)
+    day = Column(Date, nullable=False)
+    dimension = Column(String(16), nullable=False)
+    # Feed id (hex), author or actor name; empty for the article count
+    key = Column(String(255), nullable=False, default='')
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(day, dimension, key, name='uq_daily_stat_counts_day_dimension_key'),
+    )
+
+    def __repr__(self):
+        return f'<DailyStatCount {self.day} {self.dimension}:{self.key}={self.count}>'
+
+def _render_stats(counts: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Render counts in the shape returned by ParsedContentService.get_content_stats."""
+    top_feeds = Counter(counts.get(FEED, {})).most_common(TOP_COUNT)
+    titles = dict(
+        db.session.query(RSSFeed.id, RSSFeed.title)
+        .filter(RSSFeed.id.in_([UUID(feed_id) for feed_id, _ in top_feeds]))
+        .all()
+    ) if top_feeds else {}
+    return {
+        'articles_today': counts.get(ARTICLES, {}).get('', 0),
+        'top_sites': [(titles.get(UUID(feed_id), UNKNOWN), count) for feed_id, count in top_feeds],
+        'top_authors': Counter(counts.get(AUTHOR, {})).most_common(TOP_COUNT),
+        'actor_occurrences': [
+            {'entity_name': name, 'occurrence_count': count}
+            for name, count in Counter(counts.get(ACTOR, {})).most_common()
+        ]
+    }
+
+def _collect_changes(session: Session, objects: Iterable, delta: int, deltas: Counter) -> None:
+    for obj in objects:
+        if isinstance(obj, ParsedContent):
+            if obj.pub_date is None:
+                continue
+            day = obj.pub_date.date()
+            deltas[(day, ARTICLES, '')] += delta
+            if obj.feed_id is not None:
+                deltas[(day, FEED, obj.feed_id.hex)] += delta
+            deltas[(day, AUTHOR, UNKNOWN if obj.creator is None else obj.creator)] += delta
+        elif isinstance(obj, ContentTag) and obj.entity_type == ACTOR_ENTITY_TYPE:
+            content = obj.parsed_content or session.get(ParsedContent, obj.parsed_content_id)
+            if content is not None and content.pub_date is not None:
+                deltas[(content.pub_date.date(), ACTOR, obj.entity_name)] += delta
+
+def _apply_deltas(session: Session, deltas: Counter) -> None:
+    """Add deltas to the stored counts of materialized days with atomic upserts."""
+    days = {day for day, _, _ in deltas}
+    # Days without a row are aggregated live until the scheduler stores them
+    stored = {day for (day,) in session.query(DailyStats.day).filter(DailyStats.day.in_(days))}
+    changes = [(key, delta) for key, delta in deltas.items() if delta and key[0] in stored]
+    if not changes:
+        return
+    table = DailyStatCount.__table__
+    dialect = session.get_bind().dialect.name
+    for (day, dimension, key), delta in changes:
+        if dialect in ('sqlite', 'postgresql'):
+            insert_stmt = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table).values(
+                id=uuid4(), day=day, dimension=dimension, key=key, count=delta
+            )
+            session.execute(insert_stmt.on_conflict_do_update(
+                index_elements=[table.c.day, table.c.dimension, table.c.key],
+                set_={'count': table.c.count + insert_stmt.excluded['count']},
+            ))
+        else:
+            matches = and_(table.c.day == day, table.c.dimension == dimension, table.c.key == key)
+            updated = session.execute(update(table).where(matches).values(count=table.c.count + delta)).rowcount
+            if not updated:
+                session.execute(insert(table).values(id=uuid4(), day=day, dimension=dimension, key=key, count=delta))
+    session.query(DailyStatCount).filter(
+        DailyStatCount.day.in_({day for (day, _, _), _ in changes}), DailyStatCount.count <= 0
+    ).delete(synchronize_session=False)
+
+@event.listens_for(Session, 'before_flush')
+def _track_daily_stats(session, flush_context, instances):
+    tracked = (ParsedContent, ContentTag)
+    new = [obj for obj in session.new if isinstance(obj, tracked)]
+    deleted = [obj for obj in session.deleted if isinstance(obj, tracked)]
+    if not (new or deleted):
+        return
+    deltas: Counter = Counter()
+    with session.no_autoflush:
+        _collect_changes(session, new, 1, deltas)
+        _collect_changes(session, deleted, -1, deltas)
+        _apply_deltas(session, deltas)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.extensions import db
+
+class JobCheckpoint(db.Model):
+    """Progress marker that lets a long-running chunked job resume after an interruption."""
+
+    __tablename__ = 'job_checkpoints'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    name = Column(String(100), nullable=False, unique=True)
+    value = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def load(cls, name: str) -> Optional[str]:
+        """Return the saved position of a job, or None if it has none."""
+        checkpoint = db.session.query(cls).filter_by(name=name).first()
+        return checkpoint.value if checkpoint else None
+
+    @classmethod
+    def save(cls, name: str, value: str) -> None:
+        """Record a job's position in the current transaction; the caller commits."""
+        checkpoint = db.session.query(cls).filter_by(name=name).first()
+        if checkpoint:
+            checkpoint.value = value
+        else:
+            db.session.add(cls(name=name, value=value))
+
+    @classmethod
+    def clear(cls, name: str) -> None:
+        """Forget a job's position so its next run starts from the beginning."""
+        db.session.query(cls).filter_by(name=name).delete()
+
+    def __repr__(self):
+        return f'<JobCheckpoint {self.name}={self.value}>'
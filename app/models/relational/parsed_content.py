@@ -2,17 +2,63 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import uuid4, UUID as PyUUID  # Import standard UUID with alias
 import hashlib
+import re
 from sqlalchemy.dialects.postgresql import UUID as SA_UUID  # Alias SQLAlchemy's UUID
 from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Table, func
 from app.extensions import db
-from flask import flash, current_app
+from app.utils.compressed_text import MIN_COMPRESS_BYTES, CompressedText, compress_text, decompress_text
+from flask import flash, current_app, has_request_context
 from .category import Category
-from typing import List, Dict, Any, Optional, Union
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Union
 from pydantic import BaseModel
-from sqlalchemy.orm import joinedload, relationship
+from sqlalchemy.orm import deferred, joinedload, relationship
 from sqlalchemy.types import TypeDecorator, TEXT
 import json
 
+# Duplicates deleted per transaction by ParsedContent.deduplicate().
+DEDUPLICATE_CHUNK_SIZE = 500
+# Articles hashed per transaction by ParsedContent.hash_existing_articles().
+HASH_CHUNK_SIZE = 1000
+HASH_JOB_NAME = 'hash_existing_articles'
+# Articles recompressed per transaction by ParsedContent.compress_existing_articles().
+COMPRESS_CHUNK_SIZE = 200
+COMPRESS_JOB_NAME = 'compress_existing_articles'
+# Shorter titles and teasers are too generic to identify an article.
+ART_HASH_MIN_WORDS = 8
+_MARKUP_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+
+# Rendered (text, tag set) pairs kept by render_tagged_text().
+TAGGED_TEXT_CACHE_SIZE = 256
+
+@lru_cache(maxsize=TAGGED_TEXT_CACHE_SIZE)
+def render_tagged_text(text: str, tags: Tuple[Tuple[int, int, str, str], ...]) -> str:
+    """
+    Wrap each tagged span of text in a tagged-entity <span> in a single pass.
+
+    Args:
+        text: The description or summary to tag.
+        tags: (start_char, end_char, entity_type, entity_id) tuples sorted by start_char.
+
+    Returns:
+        The text with entity markup; tags starting past the end of the text or
+        overlapping an earlier tag are skipped.
+    """
+    segments = []
+    position = 0
+    for start, end, entity_type, entity_id in tags:
+        if start >= len(text) or start < position:
+            continue
+        segments.append(text[position:start])
+        segments.append(
+            f'<span class="tagged-entity" data-entity-type="{entity_type}" '
+            f'data-entity-id="{entity_id}">{text[start:end]}</span>'
+        )
+        position = max(end, start)
+    segments.append(text[position:])
+    return ''.join(segments)
+
 parsed_content_categories = Table(
     'parsed_content_categories',
     db.Model.metadata,
@@ -37,6 +83,20 @@ class JSONEncodedDict(TypeDecorator):
                 pass
         return value
 
+class CompressedJSONEncodedDict(JSONEncodedDict):
+    """JSONEncodedDict whose serialized JSON is compressed like CompressedText."""
+
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        value = super().process_bind_param(value, dialect)
+        if value is not None and dialect.name == 'sqlite':
+            return compress_text(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return super().process_result_value(decompress_text(value), dialect)
+
 class ParsedContent(db.Model):
     """Model representing parsed content from RSS feeds."""
 
@@ -44,8 +104,10 @@ class ParsedContent(db.Model):
     title = Column(String(255), nullable=False)
     url = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    content = Column(Text, nullable=False)  # Jina summary from Ollama
-    summary = Column(JSONEncodedDict, nullable=True)  # Generated summary
+    # The article body and summary dominate row size; list views never read them,
+    # so they are only loaded on access or with undefer_group('body'/'summary').
+    content = deferred(Column(CompressedText, nullable=False), group='body')  # Jina summary from Ollama
+    summary = deferred(Column(CompressedJSONEncodedDict, nullable=True), group='summary')  # Generated summary
     feed_id = Column(SA_UUID(as_uuid=True), ForeignKey("rss_feed.id"), nullable=False)
     feed = db.relationship("RSSFeed", back_populates="parsed_items")
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -55,44 +117,113 @@ class ParsedContent(db.Model):
     art_hash = Column(String(64), nullable=True)
     tags = relationship('ContentTag', back_populates='parsed_content', cascade='all, delete-orphan')
 
-    __table_args__ = (db.UniqueConstraint('url', 'feed_id', name='uix_url_feed'),)
+    __table_args__ = (
+        db.UniqueConstraint('url', 'feed_id', name='uix_url_feed'),
+        db.Index('idx_parsed_content_pub_date_id', 'pub_date', 'id'),
+        db.Index('idx_parsed_content_url_created_at', 'url', 'created_at'),
+        db.Index('idx_parsed_content_art_hash', 'art_hash'),
+    )
 
     class Config:
         from_attributes = True
 
     @classmethod
-    def deduplicate(cls) -> int:
+    def bulk_delete_statements(cls, content_ids: List[PyUUID]) -> List[Any]:
+        """
+        Return the statements deleting articles and every row that references them.
+
+        Dependent rows come first so the foreign keys hold at each statement;
+        run them in one transaction, without session synchronization.
+        """
+        from .content_tag import ContentTag  # Import here to avoid circular import
+        from .content_fingerprint import ContentFingerprint, LSHBucket
+        from .summary_job import SummaryJob
+
+        return [
+            db.delete(ContentTag).where(ContentTag.parsed_content_id.in_(content_ids)),
+            parsed_content_categories.delete().where(parsed_content_categories.c.parsed_content_id.in_(content_ids)),
+            db.delete(LSHBucket).where(LSHBucket.parsed_content_id.in_(content_ids)),
+            db.delete(ContentFingerprint).where(ContentFingerprint.parsed_content_id.in_(content_ids)),
+            db.delete(SummaryJob).where(SummaryJob.parsed_content_id.in_(content_ids)),
+            db.delete(cls).where(cls.id.in_(content_ids)),
+        ]
+
+    @classmethod
+    def deduplicate(cls, chunk_size: int = DEDUPLICATE_CHUNK_SIZE) -> int:
         """
         Deduplicate parsed articles based on URL.
 
-        Keeps the earliest entry for each URL and deletes the rest.
+        Keeps the earliest entry for each URL (the lowest id breaks ties) and
+        deletes the rest. Duplicates are ranked with a single window-function
+        query; they and every row referencing them (see bulk_delete_statements)
+        are then deleted with bulk statements, committing every chunk_size
+        articles so the job can run against a large archive and be stopped
+        between chunks.
         Returns the number of deleted entries.
         """
-        url_earliest_dates = db.session.query(
-            cls.url,
-            db.func.min(cls.created_at).label('earliest_date')
-        ).group_by(cls.url).all()
+        from .daily_stats import DailyStats  # Import here to avoid circular import
+        from app.utils.search_cache import invalidate_search_caches
+
+        ranked = db.session.query(
+            cls.id,
+            func.row_number().over(
+                partition_by=cls.url,
+                order_by=(cls.created_at, cls.id),
+            ).label('url_rank'),
+        ).subquery()
+        duplicate_ids = [
+            row.id for row in db.session.query(ranked.c.id).filter(ranked.c.url_rank > 1)
+        ]
 
         deleted_count = 0
+        for start in range(0, len(duplicate_ids), chunk_size):
+            chunk = duplicate_ids[start:start + chunk_size]
+            deleted_days = {
+                pub_date.date() for (pub_date,) in db.session.query(cls.pub_date).filter(cls.id.in_(chunk)).distinct()
+            }
+            for statement in cls.bulk_delete_statements(chunk):
+                db.session.execute(statement, execution_options={'synchronize_session': False})
+            # The bulk deletes bypass the ORM hook that keeps the daily stats current
+            DailyStats.recount_days(deleted_days)
+            db.session.commit()
+            deleted_count += len(chunk)
+            current_app.logger.info(f"Deduplication removed {deleted_count}/{len(duplicate_ids)} duplicate items")
 
-        for url, earliest_date in url_earliest_dates:
-            duplicates = cls.query.filter(
-                cls.url == url,
-                cls.created_at > earliest_date
-            ).all()
+        if deleted_count > 0:
+            # Bulk deletes bypass the ORM events that normally expire cached searches
+            invalidate_search_caches()
 
-            for duplicate in duplicates:
-                db.session.delete(duplicate)
-                deleted_count += 1
+        if has_request_context():
+            if deleted_count > 0:
+                flash(f"Deduplication complete. {deleted_count} duplicate items removed.", "success")
+            else:
+                flash("No duplicate items found during deduplication.", "info")
 
-        db.session.commit()
+        return deleted_count
 
-        if deleted_count > 0:
-            flash(f"Deduplication complete. {deleted_count} duplicate items removed.", "success")
-        else:
-            flash("No duplicate items found during deduplication.", "info")
+    @staticmethod
+    def compute_art_hash(title: Optional[str], description: Optional[str]) -> Optional[str]:
+        """
+        Fingerprint an article by its normalized title and description.
 
-        return deleted_count
+        Markup, case, punctuation and whitespace are ignored, so syndicated copies
+        of the same RSS entry hash alike whatever feed or URL they come from.
+        Returns None when there is too little text to tell articles apart.
+        """
+        words = _WORD_RE.findall(_MARKUP_RE.sub(' ', f"{title or ''} {description or ''}").lower())
+        if len(words) < ART_HASH_MIN_WORDS:
+            return None
+        return hashlib.sha256(' '.join(words).encode()).hexdigest()
+
+    @classmethod
+    def find_by_art_hash(cls, session, art_hash: str) -> Optional[ParsedContent]:
+        """Return the earliest article with the given art_hash, if any."""
+        return (
+            session.query(cls)
+            .filter(cls.art_hash == art_hash)
+            .order_by(cls.created_at)
+            .first()
+        )
 
     @classmethod
     def get_by_id(cls, content_id: Union[str, PyUUID]) -> Optional[ParsedContent]:
@@ -115,29 +246,125 @@ class ParsedContent(db.Model):
         return cls.get_by_id(document_id)
 
     @classmethod
-    def hash_existing_articles(cls) -> int:
-        """Hash existing articles and return the count of hashed articles."""
-        articles = cls.query.all()
+    def hash_existing_articles(cls, chunk_size: int = HASH_CHUNK_SIZE, restart: bool = False) -> int:
+        """
+        Hash existing articles and return the count of hashed articles.
+
+        Hashes come from compute_art_hash(), as for newly ingested articles, so
+        rerun with restart=True after the fingerprint changes. Articles are
+        walked in id order, chunk_size at a time, loading only the columns the
+        hash needs. Each chunk is written with one bulk UPDATE and
+        committed together with a checkpoint of the last id, so an interrupted
+        run resumes after the last committed chunk unless restart is True.
+        """
+        from .job_checkpoint import JobCheckpoint  # Import here to avoid circular import
+
+        if restart:
+            JobCheckpoint.clear(HASH_JOB_NAME)
+            db.session.commit()
+        checkpoint = JobCheckpoint.load(HASH_JOB_NAME)
+        last_id = PyUUID(checkpoint) if checkpoint else None
+
         hashed_count = 0
-        for article in articles:
-            article.art_hash = hashlib.sha256(f"{article.url}{article.title}".encode()).hexdigest()
-            hashed_count += 1
+        while True:
+            query = db.session.query(cls.id, cls.title, cls.description)
+            if last_id is not None:
+                query = query.filter(cls.id > last_id)
+            rows = query.order_by(cls.id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            db.session.execute(
+                db.update(cls),
+                [{'id': row.id, 'art_hash': cls.compute_art_hash(row.title, row.description)}
+                 for row in rows],
+            )
+            last_id = rows[-1].id
+            JobCheckpoint.save(HASH_JOB_NAME, last_id.hex)
+            db.session.commit()
+            hashed_count += len(rows)
+            current_app.logger.info(f"Hashed {hashed_count} articles (up to id {last_id})")
+
+        JobCheckpoint.clear(HASH_JOB_NAME)
         db.session.commit()
         return hashed_count
 
+    @classmethod
+    def compress_existing_articles(cls, chunk_size: int = COMPRESS_CHUNK_SIZE, restart: bool = False) -> int:
+        """
+        Rewrite articles stored before compression so their body and summary are compressed.
+
+        Only SQLite stores compressed values; elsewhere this is a no-op. Rows are
+        walked in id order and only those still holding plain text are loaded.
+        Each chunk is rewritten with one bulk UPDATE and committed with a
+        checkpoint, like hash_existing_articles(). Returns the number of
+        rewritten articles; run VACUUM afterwards to return the space to disk,
+        then rebuild_full_text_index().
+        """
+        from .job_checkpoint import JobCheckpoint  # Import here to avoid circular import
+
+        if db.engine.dialect.name != 'sqlite':
+            return 0
+        if restart:
+            JobCheckpoint.clear(COMPRESS_JOB_NAME)
+            db.session.commit()
+        checkpoint = JobCheckpoint.load(COMPRESS_JOB_NAME)
+        last_id = PyUUID(checkpoint) if checkpoint else None
+
+        compressed_count = 0
+        while True:
+            # The chunk boundary comes from ids alone, so bodies are only read for rows to rewrite.
+            id_query = db.session.query(cls.id)
+            if last_id is not None:
+                id_query = id_query.filter(cls.id > last_id)
+            chunk_ids = [row.id for row in id_query.order_by(cls.id).limit(chunk_size)]
+            if not chunk_ids:
+                break
+
+            rows = db.session.query(cls.id, cls.content, cls.summary).filter(
+                cls.id.in_(chunk_ids),
+                db.or_(*(
+                    db.and_(func.typeof(column) == 'text',
+                            func.length(db.cast(column, db.LargeBinary)) >= MIN_COMPRESS_BYTES)
+                    for column in (cls.__table__.c.content, cls.__table__.c.summary)
+                )),
+            ).all()
+            if rows:
+                db.session.execute(
+                    db.update(cls),
+                    [{'id': row.id, 'content': row.content, 'summary': row.summary} for row in rows],
+                )
+            last_id = chunk_ids[-1]
+            JobCheckpoint.save(COMPRESS_JOB_NAME, last_id.hex)
+            db.session.commit()
+            compressed_count += len(rows)
+            current_app.logger.info(f"Compressed {compressed_count} articles (up to id {last_id})")
+
+        JobCheckpoint.clear(COMPRESS_JOB_NAME)
+        db.session.commit()
+        return compressed_count
+
     def set_summary(self, summary_data):
         self.summary = summary_data
 
     def get_summary(self):
         return self.summary
+
+    def to_dict(self) -> Dict[str, Any]:
         """Convert the ParsedContent instance to a dictionary."""
+        return {
+            **self.to_list_dict(),
+            'content': self.content,
+            'summary': self.summary,
+        }
+
+    def to_list_dict(self) -> Dict[str, Any]:
+        """Convert the ParsedContent instance to a dictionary without the deferred body and summary."""
         return {
             'id': str(self.id),
             'title': self.title,
             'url': self.url,
             'description': self.description,
-            'content': self.content,
-            'summary': self.summary,
             'feed_id': str(self.feed_id),
             'rss_feed_title': self.feed.title if self.feed else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -152,7 +379,12 @@ class ParsedContent(db.Model):
 
     def get_tagged_content(self):
         from .content_tag import ContentTag  # Import here to avoid circular import
-        self_with_tags = ParsedContent.query.options(joinedload(ParsedContent.tags)).get(self.id)
+        self_with_tags = (
+            ParsedContent.query
+            .options(joinedload(ParsedContent.tags), joinedload(ParsedContent.feed))
+            .filter(ParsedContent.id == self.id)
+            .one()
+        )
         
         description = self.description or ''
         summary = self.summary or ''
@@ -179,12 +411,8 @@ class ParsedContent(db.Model):
         }
 
     def _insert_tags(self, text, tags):
-        offset = 0
-        for tag in tags:
-            if tag.start_char < len(text):
-                start = tag.start_char + offset
-                end = tag.end_char + offset
-                link = f'<span class="tagged-entity" data-entity-type="{tag.entity_type}" data-entity-id="{tag.entity_id}">{text[start:end]}</span>'
-                text = text[:start] + link + text[end:]
-                offset += len(link) - (end - start)
-        return text
+        if not isinstance(text, str) or not tags:
+            return text
+        return render_tagged_text(text, tuple(
+            (tag.start_char, tag.end_char, tag.entity_type, str(tag.entity_id)) for tag in tags
+        ))
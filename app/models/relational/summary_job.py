@@ -0,0 +1,146 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import uuid4
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, and_, or_
+from sqlalchemy.dialects.postgresql import UUID
+from app.extensions import db
+
+# Lower values are claimed first: summaries a user is waiting for run before the backlog.
+INTERACTIVE_PRIORITY = 0
+BACKLOG_PRIORITY = 10
+# A failed article is not queued again by the backlog job until this much time has passed.
+FAILED_RETRY_DELAY = timedelta(hours=6)
+
+class SummaryJob(db.Model):
+    """A persistent request to generate the summary of one article."""
+
+    __tablename__ = 'summary_jobs'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    parsed_content_id = Column(UUID(as_uuid=True), ForeignKey('parsed_content.id'), nullable=False)
+    status = Column(String(16), nullable=False, default=QUEUED)
+    priority = Column(Integer, nullable=False, default=BACKLOG_PRIORITY)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_summary_jobs_status_priority_created_at', status, priority, created_at),
+        Index('idx_summary_jobs_parsed_content_id', parsed_content_id),
+    )
+
+    @classmethod
+    def blocking_job_filter(cls, now: datetime):
+        """Jobs that keep an article from being queued again: active ones and recent failures."""
+        return or_(
+            cls.status.in_(cls.ACTIVE_STATUSES),
+            and_(cls.status == cls.FAILED, cls.finished_at > now - FAILED_RETRY_DELAY),
+        )
+
+    @classmethod
+    def enqueue(cls, content_ids: Iterable, priority: int = BACKLOG_PRIORITY) -> List[SummaryJob]:
+        """
+        Queue summary jobs for articles that have no active job; the caller commits.
+
+        Returns:
+            List[SummaryJob]: The jobs added.
+        """
+        content_ids = list(content_ids)
+        if not content_ids:
+            return []
+        active = {
+            content_id for (content_id,) in db.session.query(cls.parsed_content_id).filter(
+                cls.parsed_content_id.in_(content_ids), cls.status.in_(cls.ACTIVE_STATUSES)
+            )
+        }
+        jobs = [cls(parsed_content_id=content_id, priority=priority) for content_id in content_ids if content_id not in active]
+        db.session.add_all(jobs)
+        return jobs
+
+    @classmethod
+    def submit(cls, content_id, priority: int = INTERACTIVE_PRIORITY) -> SummaryJob:
+        """
+        Return the active job of an article, raising it to priority, or queue a new one; the caller commits.
+        """
+        job = (
+            db.session.query(cls)
+            .filter(cls.parsed_content_id == content_id, cls.status.in_(cls.ACTIVE_STATUSES))
+            .order_by(cls.created_at)
+            .first()
+        )
+        if job is None:
+            job = cls(parsed_content_id=content_id, priority=priority)
+            db.session.add(job)
+        elif priority < job.priority:
+            job.priority = priority
+        return job
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.DONE, self.FAILED)
+
+    def queue_position(self) -> Optional[int]:
+        """Return how many queued jobs will be claimed before this one, or None if it is not queued."""
+        if self.status != self.QUEUED:
+            return None
+        cls = type(self)
+        return db.session.query(cls).filter(
+            cls.status == cls.QUEUED,
+            or_(
+                cls.priority < self.priority,
+                and_(cls.priority == self.priority, cls.created_at < self.created_at),
+            ),
+        ).count()
+
+    @classmethod
+    def requeue_expired(cls, lease: timedelta) -> int:
+        """
+        Put running jobs whose lease expired back in the queue; the caller commits.
+
+        A job is running for at most its lease, so one that started longer ago
+        than that was left behind by a worker that stopped.
+        """
+        return db.session.query(cls).filter(
+            cls.status == cls.RUNNING,
+            or_(cls.started_at.is_(None), cls.started_at < datetime.utcnow() - lease),
+        ).update({cls.status: cls.QUEUED, cls.started_at: None}, synchronize_session=False)
+
+    @classmethod
+    def prune(cls, older_than: timedelta) -> int:
+        """Delete finished jobs older than the given age; the caller commits."""
+        return db.session.query(cls).filter(
+            cls.status.in_((cls.DONE, cls.FAILED)),
+            cls.finished_at < datetime.utcnow() - older_than,
+        ).delete(synchronize_session=False)
+
+    @classmethod
+    def queue_depth(cls, max_priority: Optional[int] = None) -> int:
+        query = db.session.query(cls).filter_by(status=cls.QUEUED)
+        if max_priority is not None:
+            query = query.filter(cls.priority <= max_priority)
+        return query.count()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': str(self.id),
+            'parsed_content_id': str(self.parsed_content_id),
+            'status': self.status,
+            'priority': self.priority,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<SummaryJob {self.parsed_content_id} {self.status}>'
@@ -0,0 +1,159 @@
+"""
+EntityCounterService: incrementally maintained entity frequency counters.
+
+Every tagged parsed_content document contributes its content_tags to per-day,
+per-label counters in the entity_counters MongoDB collection, so dashboards can
+read entity frequencies for any time window without unwinding every document.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('entity_counter_service', 'entity_counter_service.log')
+
+COUNTERS_COLLECTION = 'entity_counters'
+
+
+class EntityCounterService:
+    """Maintain and query per-day entity counters derived from content_tags."""
+
+    @staticmethod
+    def day_key(document: Dict[str, Any]) -> str:
+        """Return the YYYY-MM-DD day a parsed_content document is counted under."""
+        for field in ('pub_date', 'created_at'):
+            value = document.get(field)
+            if isinstance(value, (datetime, date)):
+                return value.strftime('%Y-%m-%d')
+        return datetime.utcnow().strftime('%Y-%m-%d')
+
+    @staticmethod
+    def _count_tags(tags: Optional[Iterable[Dict[str, Any]]]) -> Counter:
+        return Counter(
+            (tag['label'], tag['text'])
+            for tag in tags or []
+            if tag.get('label') and tag.get('text')
+        )
+
+    @staticmethod
+    def record_document_tags(mongo_db, document: Dict[str, Any],
+                             new_tags: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        Apply the change from a document's previous content_tags to new_tags to the counters.
+
+        Args:
+            mongo_db: The MongoDB database holding the counters collection.
+            document: The parsed_content document as it was before tagging.
+            new_tags: The content_tags about to be stored on the document.
+        """
+        delta = EntityCounterService._count_tags(new_tags)
+        delta.subtract(EntityCounterService._count_tags(document.get('content_tags')))
+
+        day = EntityCounterService.day_key(document)
+        operations = [
+            UpdateOne(
+                {'_id': f"{day}|{label}|{text}"},
+                {
+                    '$inc': {'count': count},
+                    '$setOnInsert': {'day': day, 'label': label, 'text': text},
+                },
+                upsert=True
+            )
+            for (label, text), count in delta.items()
+            if count
+        ]
+        if operations:
+            mongo_db[COUNTERS_COLLECTION].bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def top_entities(mongo_db, label: Optional[str] = None, start_day: Optional[str] = None,
+                     end_day: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return the most frequent entities, optionally filtered by label and day range.
+
+        Args:
+            mongo_db: The MongoDB database holding the counters collection.
+            label: Only count entities with this label.
+            start_day: Inclusive lower bound as YYYY-MM-DD.
+            end_day: Inclusive upper bound as YYYY-MM-DD.
+            limit: Maximum number of entities to return.
+
+        Returns:
+            List[Dict[str, Any]]: Entities with their text, label and count, most frequent first.
+        """
+        match: Dict[str, Any] = {'count': {'$gt': 0}}
+        if label:
+            match['label'] = label
+        if start_day or end_day:
+            match['day'] = {}
+            if start_day:
+                match['day']['$gte'] = start_day
+            if end_day:
+                match['day']['$lte'] = end_day
+
+        pipeline = [
+            {'$match': match},
+            {
+                '$group': {
+                    '_id': '$text',
+                    'label': {'$first': '$label'},
+                    'count': {'$sum': '$count'}
+                }
+            },
+            {'$sort': {'count': -1}},
+            {'$limit': limit}
+        ]
+        results = mongo_db[COUNTERS_COLLECTION].aggregate(pipeline)
+        return [{'text': doc['_id'], 'label': doc['label'], 'count': doc['count']} for doc in results]
+
+    @staticmethod
+    def rebuild(mongo_db) -> int:
+        """
+        Recompute every counter from the content_tags stored in parsed_content.
+
+        This is a full scan and is only meant for backfilling or repairing the counters.
+
+        Returns:
+            int: The number of counter documents written.
+        """
+        day_expression = {
+            '$dateToString': {
+                'format': '%Y-%m-%d',
+                'date': {'$ifNull': ['$pub_date', '$created_at']}
+            }
+        }
+        pipeline = [
+            {'$match': {'content_tags.0': {'$exists': True}}},
+            {'$project': {'day': day_expression, 'content_tags': 1}},
+            {'$unwind': '$content_tags'},
+            {
+                '$group': {
+                    '_id': {
+                        'day': '$day',
+                        'label': '$content_tags.label',
+                        'text': '$content_tags.text'
+                    },
+                    'count': {'$sum': 1}
+                }
+            },
+            {
+                '$project': {
+                    '_id': {'$concat': ['$_id.day', '|', '$_id.label', '|', '$_id.text']},
+                    'day': '$_id.day',
+                    'label': '$_id.label',
+                    'text': '$_id.text',
+                    'count': 1
+                }
+            },
+            {'$out': COUNTERS_COLLECTION}
+        ]
+        mongo_db['parsed_content'].aggregate(pipeline, allowDiskUse=True)
+        written = mongo_db[COUNTERS_COLLECTION].count_documents({})
+        logger.info(f"Rebuilt {written} entity counters from parsed_content")
+        return written
@@ -22,6 +22,8 @@ from app.models import ParsedContent, RSSFeed, Category
 from app.utils.db_connection_manager import DBConnectionManager
 from app.utils.logging_config import setup_logger
 from app.utils.jina_api import parse_content
+from app.utils.vector_index import content_text, embed_text, get_vector_index
+from app.utils.near_duplicates import cluster_id_of, find_near_duplicate, minhash_signature, record_fingerprint
 
 import os
 import tempfile
@@ -120,6 +122,7 @@ async def fetch_and_parse_feed(feed_id: str, force_update: bool = False) -> int:
             total_entries = len(feed_data.entries)
 
             for entry in feed_data.entries:
+                embedding = None
                 try:
                     url = entry.link
                     title = entry.get("title", "")
@@ -142,19 +145,39 @@ async def fetch_and_parse_feed(feed_id: str, force_update: bool = False) -> int:
                     ).scalar_one_or_none()
 
                     if not existing_content:
-                        parsed_content = await parse_content(url)
+                        description = sanitize_html(entry.get("description", ""))
+                        # Exact syndicated copies, found by art_hash, reuse the first copy's
+                        # text and summary instead of another Jina fetch and LLM call.
+                        # Reworded copies, found by MinHash, may differ in substance, so
+                        # they are fetched and summarized and only join its cluster.
+                        art_hash = ParsedContent.compute_art_hash(title, description)
+                        signature = minhash_signature(content_text(title, description, None))
+                        original = ParsedContent.find_by_art_hash(session, art_hash) if art_hash else None
+                        near_duplicate = original
+                        if near_duplicate is None and signature is not None:
+                            near_duplicate = find_near_duplicate(session, signature)
+                        if original is not None:
+                            logger.info(f"{url} is a copy of {original.url}, reusing its content")
+                            parsed_content = original.content
+                        else:
+                            parsed_content = await parse_content(url)
                         if parsed_content is not None:
                             new_content = ParsedContent(
-                                content=sanitize_html(parsed_content),
+                                content=parsed_content if original is not None else sanitize_html(parsed_content),
+                                summary=original.summary if original is not None else None,
                                 feed_id=feed.id,
                                 url=url,
                                 title=sanitize_html(title),
-                                description=sanitize_html(entry.get("description", "")),
+                                description=description,
                                 pub_date=parsed_date,
                                 creator=sanitize_html(entry.get("author", "")),
+                                art_hash=art_hash,
                             )
                             session.add(new_content)
                             session.flush()  # This will assign the UUID to new_content
+                            if signature is not None:
+                                cluster_id = cluster_id_of(session, near_duplicate.id) if near_duplicate is not None else None
+                                record_fingerprint(session, new_content.id, signature, cluster_id=cluster_id)
 
                             # Handle categories
                             categories = entry.get("tags", [])
@@ -164,6 +187,8 @@ async def fetch_and_parse_feed(feed_id: str, force_update: bool = False) -> int:
                                     cat_obj = get_or_create_category(session, cat_name)
                                     new_content.categories.append(cat_obj)
                             new_entries_count += 1
+                            embedding = (new_content.id, embed_text(content_text(
+                                new_content.title, new_content.description, new_content.content)))
                         else:
                             logger.warning(f"Failed to parse content for URL: {url}")
                 except OperationalError as e:
@@ -182,6 +207,12 @@ async def fetch_and_parse_feed(feed_id: str, force_update: bool = False) -> int:
 
                 session.commit()  # Commit after each successful entry processing
 
+                if embedding is not None:
+                    try:
+                        get_vector_index().add([embedding])
+                    except Exception as index_error:
+                        logger.warning(f"Could not add {url} to the vector index: {index_error}")
+
             logger.info(f"Feed: {feed.url} - Added {new_entries_count} new entries to database")
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error occurred while fetching feed {feed.url}: {e}", exc_info=True)
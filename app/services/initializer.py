@@ -2,9 +2,12 @@ from app.extensions import db
 import logging
 from app.utils.ollama_client import OllamaAPI
 from app.services.scheduler_service import SchedulerService
+from app.services.summary_worker import init_summary_worker
 from app.services.apt_update_service import update_databases
 from app.services.awesome_threat_intel_service import AwesomeThreatIntelService
 from app.utils.threat_group_cards_updater import update_threat_group_cards
+from app.utils.mongodb_connection import get_mongo_client
+from app.utils.mongodb_indexes import ensure_mongo_indexes, backfill_needs_tagging
 
 logger = logging.getLogger('app')
 
@@ -15,6 +18,12 @@ def initialize_services(app):
         logger.info("All database tables created")
         app.ollama_api = OllamaAPI()
 
+        # Provision MongoDB indexes before any job queries the collections
+        provision_mongo_indexes(app)
+
+        # Start the summary worker before the scheduler queues any backlog
+        app.summary_worker = init_summary_worker(app)
+
         # Setup scheduler
         app.scheduler = SchedulerService(app)
         app.scheduler.setup_scheduler()
@@ -30,3 +39,18 @@ def initialize_services(app):
         # Update the Threat Group Cards JSON files
         update_threat_group_cards()
         logger.info("Threat Group Cards JSON files updated at application startup")
+
+def provision_mongo_indexes(app):
+    """Ensure MongoDB indexes exist, without blocking startup if MongoDB is unreachable."""
+    mongo_client = None
+    try:
+        mongo_client = get_mongo_client(serverSelectionTimeoutMS=5000)
+        mongo_db = mongo_client[app.config['MONGO_DB_NAME']]
+        ensure_mongo_indexes(mongo_db)
+        backfill_needs_tagging(mongo_db)
+        logger.info("MongoDB indexes ensured")
+    except Exception as e:
+        logger.error(f"Could not provision MongoDB indexes: {str(e)}")
+    finally:
+        if mongo_client:
+            mongo_client.close()
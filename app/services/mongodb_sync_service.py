@@ -1,16 +1,27 @@
 import os
-from pymongo import MongoClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from pymongo import MongoClient, UpdateOne
 from app.models.relational.parsed_content import ParsedContent
+from app.models.relational.content_fingerprint import ContentFingerprint
 from app.utils.db_connection_manager import DBConnectionManager
+from app.utils.mongodb_indexes import UNTAGGED_FILTER
 from logging import getLogger
 from app.models.relational.allgroups import AllGroups, AllGroupsValues, AllGroupsValuesNames
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, undefer_group
 from app.models.relational.alltools import AllTools
 from flask import current_app
 
 logger = getLogger(__name__)
 
 class MongoDBSyncService:
+    # Guards sync_all_to_mongodb so scheduled runs never overlap.
+    _sync_lock = threading.Lock()
+    # Per-collection statistics of the most recent coordinated sync run.
+    last_sync_stats: Dict[str, Dict[str, Any]] = {}
+
     @staticmethod
     def get_mongo_client():
         with current_app.app_context():
@@ -18,227 +29,295 @@ class MongoDBSyncService:
         return MongoClient(mongodb_uri)
 
     @staticmethod
-    def sync_parsed_content_to_mongodb():
-        """Synchronize parsed_content table to MongoDB."""
-        mongo_client = None
-        try:
-            mongo_client = MongoDBSyncService.get_mongo_client()
-            mongo_db = mongo_client[current_app.config['MONGO_DB_NAME']]
-            mongo_collection = mongo_db['parsed_content']
-            sync_meta_collection = mongo_db['sync_metadata']
+    def _get_last_sync_time(sync_meta_collection, meta_key: str):
+        """Return the timestamp stored under meta_key in sync_metadata, if any."""
+        sync_meta = sync_meta_collection.find_one({'_id': meta_key})
+        if sync_meta and 'timestamp' in sync_meta:
+            return sync_meta['timestamp']
+        return None
 
-            # Initialize last_sync_time to None
-            last_sync_time = None
+    @staticmethod
+    def _load_parsed_content(session, last_sync_time) -> Tuple[List[Dict[str, Any]], Any, int]:
+        """Build MongoDB documents for parsed_content rows created after last_sync_time."""
+        query = (
+            session.query(ParsedContent, ContentFingerprint.cluster_id)
+            .options(undefer_group('body'), undefer_group('summary'))
+            .outerjoin(ContentFingerprint, ContentFingerprint.parsed_content_id == ParsedContent.id)
+            .order_by(ParsedContent.created_at)
+        )
+        if last_sync_time is not None:
+            query = query.filter(ParsedContent.created_at > last_sync_time)
 
-            # Load last sync time from MongoDB
-            sync_meta = sync_meta_collection.find_one({'_id': 'last_sync_time'})
-            if sync_meta and 'timestamp' in sync_meta:
-                last_sync_time = sync_meta['timestamp']
+        rows = query.all()
+        parsed_contents = [content for content, _ in rows]
+        documents = [
+            {
+                '_id': str(content.id),
+                'title': content.title,
+                'url': content.url,
+                'description': content.description,
+                'content': content.content,
+                'summary': content.summary,
+                'feed_id': str(content.feed_id),
+                'created_at': content.created_at,
+                'pub_date': content.pub_date,
+                'creator': content.creator,
+                'art_hash': content.art_hash,
+                'cluster_id': str(cluster_id) if cluster_id else None,
+            }
+            for content, cluster_id in rows
+        ]
+        last_synced_time = parsed_contents[-1].created_at if parsed_contents else None
+        return documents, last_synced_time, len(parsed_contents)
 
-            # Access the parsed_content data
-            with DBConnectionManager.get_session() as session:
-                query = session.query(ParsedContent)
-                if last_sync_time is not None:
-                    query = query.filter(ParsedContent.created_at > last_sync_time)
-
-                parsed_contents = query.all()
-
-                # Prepare and upsert data
-                for content in parsed_contents:
-                    document = {
-                        '_id': str(content.id),
-                        'title': content.title,
-                        'url': content.url,
-                        'description': content.description,
-                        'content': content.content,
-                        'summary': content.summary,
-                        'feed_id': str(content.feed_id),
-                        'created_at': content.created_at,
-                        'pub_date': content.pub_date,
-                        'creator': content.creator,
-                        'art_hash': content.art_hash,
-                    }
+    @staticmethod
+    def _load_alltools(session, last_sync_time) -> Tuple[List[Dict[str, Any]], Any, int]:
+        """Build one MongoDB document per tool value for alltools changed after last_sync_time."""
+        query = session.query(AllTools).options(
+            joinedload(AllTools.values)
+        )
+        if last_sync_time:
+            query = query.filter(AllTools.last_db_change > last_sync_time)
 
-                    # Upsert the document into MongoDB
-                    mongo_collection.update_one(
-                        {'_id': document['_id']},
-                        {'$set': document},
-                        upsert=True
-                    )
-
-                # Update last sync time in MongoDB
-                if parsed_contents:
-                    last_synced_time = parsed_contents[-1].created_at
-                    sync_meta_collection.update_one(
-                        {'_id': 'last_sync_time'},
-                        {'$set': {'timestamp': last_synced_time}},
-                        upsert=True
-                    )
-                    logger.info(f"Incrementally synced {len(parsed_contents)} parsed_content records to MongoDB.")
-                else:
-                    logger.info("No new records to sync.")
+        alltools = query.all()
+        documents = []
+        for tool in alltools:
+            for value in tool.values:
+                documents.append({
+                    '_id': str(value.uuid),
+                    'tool_uuid': str(tool.uuid),
+                    'name': value.tool,
+                    'description': value.description,
+                    'category': value.category,
+                    'type': value.type,
+                    'information': value.information,
+                    'last_card_change': value.last_card_change,
+                    'authors': tool.authors,
+                    'source': tool.source,
+                    'tlp': tool.tlp,
+                    'license': tool.license,
+                    'last_db_change': tool.last_db_change
+                })
+        last_synced_time = max(tool.last_db_change for tool in alltools) if alltools else None
+        return documents, last_synced_time, len(alltools)
 
-        except Exception as e:
-            logger.error(f"Error syncing parsed_content to MongoDB: {str(e)}")
-        finally:
-            if mongo_client:
-                mongo_client.close()
     @staticmethod
-    def sync_alltools_to_mongodb():
-        """Synchronize alltools table to MongoDB, creating a separate document for each tool."""
+    def _load_allgroups(session, last_sync_time) -> Tuple[List[Dict[str, Any]], Any, int]:
+        """Build one MongoDB document per group for allgroups changed after last_sync_time."""
+        query = session.query(AllGroups).options(
+            joinedload(AllGroups.values).joinedload(AllGroupsValues.names)
+        )
+        if last_sync_time:
+            query = query.filter(AllGroups.last_db_change > last_sync_time)
+
+        allgroups = query.all()
+        documents = []
+        for group in allgroups:
+            document = {
+                '_id': str(group.uuid),
+                'authors': group.authors,
+                'category': group.category,
+                'name': group.name,
+                'type': group.type,
+                'source': group.source,
+                'description': group.description,
+                'tlp': group.tlp,
+                'license': group.license,
+                'last_db_change': group.last_db_change,
+                'values': []
+            }
+
+            for value in group.values:
+                value_doc = {
+                    'uuid': str(value.uuid),
+                    'actor': value.actor,
+                    'country': value.country,
+                    'description': value.description,
+                    'information': value.information,
+                    'last_card_change': value.last_card_change,
+                    'motivation': value.motivation,
+                    'first_seen': value.first_seen,
+                    'observed_sectors': value.observed_sectors,
+                    'observed_countries': value.observed_countries,
+                    'tools': value.tools,
+                    'operations': value.operations,
+                    'sponsor': value.sponsor,
+                    'counter_operations': value.counter_operations,
+                    'mitre_attack': value.mitre_attack,
+                    'playbook': value.playbook,
+                    'names': [
+                        {
+                            'uuid': str(name.uuid),
+                            'name': name.name,
+                            'name_giver': name.name_giver
+                        } for name in value.names
+                    ]
+                }
+                document['values'].append(value_doc)
+            documents.append(document)
+        last_synced_time = max(group.last_db_change for group in allgroups) if allgroups else None
+        return documents, last_synced_time, len(allgroups)
+
+    @staticmethod
+    def _write_documents(mongo_db, collection_name: str, meta_key: str,
+                         documents: List[Dict[str, Any]], last_synced_time) -> int:
+        """
+        Upsert documents into a MongoDB collection and advance its sync marker.
+
+        The sync marker is only moved once every document has been written, so a
+        failed write is retried in full on the next run.
+        """
+        if not documents:
+            return 0
+
+        update_template = {}
+        if collection_name in _INSERT_DEFAULTS:
+            update_template['$setOnInsert'] = _INSERT_DEFAULTS[collection_name]
+        result = mongo_db[collection_name].bulk_write(
+            [
+                UpdateOne({'_id': document['_id']}, {**update_template, '$set': document}, upsert=True)
+                for document in documents
+            ],
+            ordered=False
+        )
+        mongo_db['sync_metadata'].update_one(
+            {'_id': meta_key},
+            {'$set': {'timestamp': last_synced_time}},
+            upsert=True
+        )
+        logger.debug(
+            f"Wrote {len(documents)} documents to {collection_name}: matched={result.matched_count}, "
+            f"modified={result.modified_count}, upserted={result.upserted_count}"
+        )
+        return len(documents)
+
+    @staticmethod
+    def _sync_collection(collection_name: str) -> None:
+        """Run a standalone incremental sync for a single collection."""
+        meta_key, loader = _SYNC_TARGETS[collection_name]
         mongo_client = None
         try:
             mongo_client = MongoDBSyncService.get_mongo_client()
             mongo_db = mongo_client[current_app.config['MONGO_DB_NAME']]
-            mongo_collection = mongo_db['alltools']
-            sync_meta_collection = mongo_db['sync_metadata']
 
-            # Load last sync time from MongoDB
-            last_sync_time = sync_meta_collection.find_one({'_id': 'last_alltools_sync_time'})
-            last_sync_time = last_sync_time['timestamp'] if last_sync_time else None
-            logger.info(f"Last alltools sync time: {last_sync_time}")
+            last_sync_time = MongoDBSyncService._get_last_sync_time(mongo_db['sync_metadata'], meta_key)
+            logger.info(f"Last {collection_name} sync time: {last_sync_time}")
 
             with DBConnectionManager.get_session() as session:
-                query = session.query(AllTools).options(
-                    joinedload(AllTools.values)
-                )
-                if last_sync_time:
-                    query = query.filter(AllTools.last_db_change > last_sync_time)
-
-                alltools = query.all()
-                logger.info(f"Found {len(alltools)} alltools to sync")
-
-                synced_tools_count = 0
-                for tool in alltools:
-                    for value in tool.values:
-                        document = {
-                            '_id': str(value.uuid),
-                            'tool_uuid': str(tool.uuid),
-                            'name': value.tool,
-                            'description': value.description,
-                            'category': value.category,
-                            'type': value.type,
-                            'information': value.information,
-                            'last_card_change': value.last_card_change,
-                            'authors': tool.authors,
-                            'source': tool.source,
-                            'tlp': tool.tlp,
-                            'license': tool.license,
-                            'last_db_change': tool.last_db_change
-                        }
-
-                        # Insert or update the document for this tool
-                        result = mongo_collection.update_one(
-                            {'_id': document['_id']},
-                            {'$set': document},
-                            upsert=True
-                        )
-                        logger.debug(f"Updated tool {value.tool}: matched={result.matched_count}, modified={result.modified_count}, upserted={result.upserted_id}")
-                        synced_tools_count += 1
-
-                if alltools:
-                    last_synced_time = max(tool.last_db_change for tool in alltools)
-                    sync_meta_collection.update_one(
-                        {'_id': 'last_alltools_sync_time'},
-                        {'$set': {'timestamp': last_synced_time}},
-                        upsert=True
-                    )
-                    logger.info(f"Incrementally synced {synced_tools_count} individual tools from {len(alltools)} alltools records to MongoDB. Last sync time updated to {last_synced_time}")
-                else:
-                    logger.info("No new alltools records to sync.")
+                documents, last_synced_time, row_count = loader(session, last_sync_time)
+
+            if documents:
+                MongoDBSyncService._write_documents(mongo_db, collection_name, meta_key, documents, last_synced_time)
+                logger.info(f"Incrementally synced {len(documents)} documents from {row_count} {collection_name} records to MongoDB.")
+            else:
+                logger.info(f"No new {collection_name} records to sync.")
 
         except Exception as e:
-            logger.error(f"Error syncing alltools to MongoDB: {str(e)}", exc_info=True)
+            logger.error(f"Error syncing {collection_name} to MongoDB: {str(e)}", exc_info=True)
         finally:
             if mongo_client:
                 mongo_client.close()
 
+    @staticmethod
+    def sync_parsed_content_to_mongodb():
+        """Synchronize parsed_content table to MongoDB."""
+        MongoDBSyncService._sync_collection('parsed_content')
+
+    @staticmethod
+    def sync_alltools_to_mongodb():
+        """Synchronize alltools table to MongoDB, creating a separate document for each tool."""
+        MongoDBSyncService._sync_collection('alltools')
+
     @staticmethod
     def sync_allgroups_to_mongodb():
         """Synchronize allgroups, allgroups_values, and allgroups_values_names to MongoDB."""
+        MongoDBSyncService._sync_collection('allgroups')
+
+    @staticmethod
+    def sync_all_to_mongodb() -> Dict[str, Dict[str, Any]]:
+        """
+        Synchronize parsed_content, alltools and allgroups to MongoDB in one coordinated run.
+
+        All three tables are read inside a single snapshot session so the collections
+        stay consistent with each other, then written to MongoDB concurrently over a
+        shared client. If a previous run is still in progress the call is skipped.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per-collection row/document counts and durations.
+        """
+        if not MongoDBSyncService._sync_lock.acquire(blocking=False):
+            logger.warning("MongoDB sync already in progress, skipping this run.")
+            return {}
+
         mongo_client = None
+        stats: Dict[str, Dict[str, Any]] = {}
         try:
+            started = time.perf_counter()
             mongo_client = MongoDBSyncService.get_mongo_client()
             mongo_db = mongo_client[current_app.config['MONGO_DB_NAME']]
-            mongo_collection = mongo_db['allgroups']
             sync_meta_collection = mongo_db['sync_metadata']
 
-            # Load last sync time from MongoDB
-            last_sync_time = sync_meta_collection.find_one({'_id': 'last_allgroups_sync_time'})
-            last_sync_time = last_sync_time['timestamp'] if last_sync_time else None
+            snapshot = {}
+            with DBConnectionManager.get_snapshot_session() as session:
+                for collection_name, (meta_key, loader) in _SYNC_TARGETS.items():
+                    read_started = time.perf_counter()
+                    last_sync_time = MongoDBSyncService._get_last_sync_time(sync_meta_collection, meta_key)
+                    documents, last_synced_time, row_count = loader(session, last_sync_time)
+                    snapshot[collection_name] = (meta_key, documents, last_synced_time)
+                    stats[collection_name] = {
+                        'rows': row_count,
+                        'documents': len(documents),
+                        'read_seconds': round(time.perf_counter() - read_started, 3),
+                    }
 
-            with DBConnectionManager.get_session() as session:
-                query = session.query(AllGroups).options(
-                    joinedload(AllGroups.values).joinedload(AllGroupsValues.names)
+            def write(collection_name: str) -> Tuple[int, float]:
+                meta_key, documents, last_synced_time = snapshot[collection_name]
+                write_started = time.perf_counter()
+                written = MongoDBSyncService._write_documents(
+                    mongo_db, collection_name, meta_key, documents, last_synced_time
                 )
-                if last_sync_time:
-                    query = query.filter(AllGroups.last_db_change > last_sync_time)
-
-                allgroups = query.all()
-
-                for group in allgroups:
-                    document = {
-                        '_id': str(group.uuid),
-                        'authors': group.authors,
-                        'category': group.category,
-                        'name': group.name,
-                        'type': group.type,
-                        'source': group.source,
-                        'description': group.description,
-                        'tlp': group.tlp,
-                        'license': group.license,
-                        'last_db_change': group.last_db_change,
-                        'values': []
-                    }
+                return written, time.perf_counter() - write_started
 
-                    for value in group.values:
-                        value_doc = {
-                            'uuid': str(value.uuid),
-                            'actor': value.actor,
-                            'country': value.country,
-                            'description': value.description,
-                            'information': value.information,
-                            'last_card_change': value.last_card_change,
-                            'motivation': value.motivation,
-                            'first_seen': value.first_seen,
-                            'observed_sectors': value.observed_sectors,
-                            'observed_countries': value.observed_countries,
-                            'tools': value.tools,
-                            'operations': value.operations,
-                            'sponsor': value.sponsor,
-                            'counter_operations': value.counter_operations,
-                            'mitre_attack': value.mitre_attack,
-                            'playbook': value.playbook,
-                            'names': [
-                                {
-                                    'uuid': str(name.uuid),
-                                    'name': name.name,
-                                    'name_giver': name.name_giver
-                                } for name in value.names
-                            ]
-                        }
-                        document['values'].append(value_doc)
-
-                    # Upsert the document into MongoDB
-                    mongo_collection.update_one(
-                        {'_id': document['_id']},
-                        {'$set': document},
-                        upsert=True
-                    )
-
-                if allgroups:
-                    last_synced_time = max(group.last_db_change for group in allgroups)
-                    sync_meta_collection.update_one(
-                        {'_id': 'last_allgroups_sync_time'},
-                        {'$set': {'timestamp': last_synced_time}},
-                        upsert=True
-                    )
-                    logger.info(f"Incrementally synced {len(allgroups)} allgroups records to MongoDB.")
-                else:
-                    logger.info("No new allgroups records to sync.")
+            with ThreadPoolExecutor(max_workers=len(snapshot), thread_name_prefix='mongodb-sync') as executor:
+                futures = {name: executor.submit(write, name) for name in snapshot}
 
+            for collection_name, future in futures.items():
+                collection_stats = stats[collection_name]
+                try:
+                    written, write_seconds = future.result()
+                    collection_stats['written'] = written
+                    collection_stats['write_seconds'] = round(write_seconds, 3)
+                except Exception as e:
+                    collection_stats['error'] = str(e)
+                    logger.error(f"Error syncing {collection_name} to MongoDB: {str(e)}", exc_info=True)
+                collection_stats['duration_seconds'] = round(
+                    collection_stats['read_seconds'] + collection_stats.get('write_seconds', 0.0), 3
+                )
+                logger.info(
+                    f"Synced {collection_name}: {collection_stats['rows']} rows, "
+                    f"{collection_stats['documents']} documents in {collection_stats['duration_seconds']}s"
+                )
+
+            logger.info(f"MongoDB sync completed in {time.perf_counter() - started:.3f}s")
+            MongoDBSyncService.last_sync_stats = stats
         except Exception as e:
-            logger.error(f"Error syncing allgroups to MongoDB: {str(e)}")
+            logger.error(f"Error running MongoDB sync: {str(e)}", exc_info=True)
         finally:
             if mongo_client:
                 mongo_client.close()
+            MongoDBSyncService._sync_lock.release()
+        return stats
+
+
+# Fields only set when a document is first inserted; new parsed_content is
+# flagged so the tagger can find it through the partial needs_tagging index.
+_INSERT_DEFAULTS = {
+    'parsed_content': UNTAGGED_FILTER,
+}
+
+# Collection name -> (sync_metadata key, document loader) for every synced table.
+_SYNC_TARGETS = {
+    'parsed_content': ('last_sync_time', MongoDBSyncService._load_parsed_content),
+    'alltools': ('last_alltools_sync_time', MongoDBSyncService._load_alltools),
+    'allgroups': ('last_allgroups_sync_time', MongoDBSyncService._load_allgroups),
+}
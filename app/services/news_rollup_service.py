@@ -1,7 +1,8 @@
 import os
 from datetime import datetime, timedelta
-from typing import List, Dict, Union
+from typing import AsyncIterator, List, Dict, Union
 import json
+from contextlib import aclosing
 from app.models.relational.parsed_content import ParsedContent
 from app.models import Rollup
 from app.utils.experimental_ollama_client import ExperimentalOllamaAPI
@@ -10,10 +11,13 @@ from app.utils.elevenlabs_tts import ElevenLabsTTS
 from app.utils.logging_config import setup_logger
 from app.extensions import db
 from sqlalchemy import func
+from sqlalchemy.orm import undefer_group
 
 logger = setup_logger('news_rollup_service', 'news_rollup_service.log')
 
 class NewsRollupService:
+    ROLLUP_TYPES = ("morning", "midday", "end_of_day")
+
     def __init__(self):
         api_choice = os.getenv("SUMMARY_API_CHOICE", "ollama").lower()
         if api_choice == "ollama":
@@ -46,6 +50,25 @@ class NewsRollupService:
             logger.error(f"Error generating {rollup_type} rollup: {str(e)}")
             return {"error": f"Failed to generate {rollup_type} rollup"}
 
+    async def stream_rollup(self, rollup_type: str) -> AsyncIterator[str]:
+        """
+        Yield a rollup's JSON as the model generates it, then store the rollup.
+
+        Callers read the stored rollup afterwards to tell success from failure.
+        """
+        content = self._get_content_for_rollup(rollup_type)
+        formatted_content = self._format_content(content)
+        stream = self.api.stream_json(f"{rollup_type}_rollup_json", formatted_content)
+        async with aclosing(stream) as tokens:
+            async for token in tokens:
+                yield token
+
+        rollup_content = stream.result
+        if not isinstance(rollup_content, dict) or 'error' in rollup_content:
+            logger.error(f"Streamed {rollup_type} rollup is not valid JSON")
+            return
+        self.store_rollup(rollup_type, rollup_content)
+
     def generate_audio_rollup(self, rollup_content: Dict, rollup_type: str) -> str:
         try:
             text_to_speak = self._format_rollup_for_speech(rollup_content)
@@ -83,13 +106,14 @@ class NewsRollupService:
         else:
             raise ValueError(f"Invalid rollup_type: {rollup_type}")
 
-        content = ParsedContent.query.filter(
+        query = ParsedContent.query.options(undefer_group('summary'))
+        content = query.filter(
             ParsedContent.pub_date.between(start_time, end_time)
         ).order_by(ParsedContent.pub_date.desc()).limit(10).all()
 
         if not content:
             # If no content found for the specified time range, get the latest 10 entries
-            content = ParsedContent.query.order_by(ParsedContent.pub_date.desc()).limit(10).all()
+            content = query.order_by(ParsedContent.pub_date.desc()).limit(10).all()
 
         return content
 
@@ -119,6 +143,9 @@ class NewsRollupService:
 
     async def create_and_store_rollup(self, rollup_type: str):
         rollup_content = await self.generate_rollup(rollup_type)
+        self.store_rollup(rollup_type, rollup_content)
+
+    def store_rollup(self, rollup_type: str, rollup_content: Dict) -> None:
         audio_file = self.generate_audio_rollup(rollup_content, rollup_type)
         
         # Store the rollup in the database
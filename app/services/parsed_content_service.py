@@ -1,9 +1,13 @@
-from app.models.relational.parsed_content import ParsedContent, parsed_content_categories
+from app.models.relational.parsed_content import ParsedContent
+from app.models.relational.daily_stats import DailyStats
 from app.extensions import db
-from sqlalchemy import delete
+from sqlalchemy.orm import joinedload
 from typing import List, Dict, Any
 import uuid
 
+# Articles per bulk delete, keeping the IN lists under SQLite's variable limit
+DELETE_CHUNK_SIZE = 500
+
 class ParsedContentService:
     @staticmethod
     def get_latest_parsed_content(limit: int = 20) -> List[Dict[str, Any]]:
@@ -13,13 +17,13 @@ class ParsedContentService:
         :param limit: The maximum number of entries to retrieve
         :return: A list of dictionaries containing parsed content data
         """
-        latest_content = ParsedContent.query.order_by(ParsedContent.created_at.desc()).limit(limit).all()
-        return [content.to_dict() for content in latest_content]
+        latest_content = ParsedContent.query.options(joinedload(ParsedContent.feed)).order_by(ParsedContent.created_at.desc()).limit(limit).all()
+        return [content.to_list_dict() for content in latest_content]
 
     @staticmethod
     def delete_parsed_content_by_feed_id(feed_id: uuid.UUID, session=None) -> None:
         """
-        Delete all parsed content and associated category data for a specific RSS feed.
+        Delete all parsed content of a specific RSS feed and every row that references it.
 
         :param feed_id: The UUID of the RSS feed
         :param session: SQLAlchemy session to use (optional)
@@ -28,14 +32,13 @@ class ParsedContentService:
             session = db.session
 
         # Get all ParsedContent IDs associated with the feed
-        parsed_content_ids = session.query(ParsedContent.id).filter_by(feed_id=feed_id).all()
-        parsed_content_ids = [id for (id,) in parsed_content_ids]
-
-        if parsed_content_ids:
-            # Delete associated entries in the parsed_content_categories table
-            session.execute(delete(parsed_content_categories).where(
-                parsed_content_categories.c.parsed_content_id.in_(parsed_content_ids)
-            ))
+        rows = session.query(ParsedContent.id, ParsedContent.pub_date).filter_by(feed_id=feed_id).all()
+        parsed_content_ids = [id for id, _ in rows]
+        deleted_days = {pub_date.date() for _, pub_date in rows}
 
-        # Delete ParsedContent entries
-        session.query(ParsedContent).filter_by(feed_id=feed_id).delete(synchronize_session='fetch')
+        # Tags, category links, fingerprints and summary jobs go before the articles
+        for start in range(0, len(parsed_content_ids), DELETE_CHUNK_SIZE):
+            for statement in ParsedContent.bulk_delete_statements(parsed_content_ids[start:start + DELETE_CHUNK_SIZE]):
+                session.execute(statement, execution_options={'synchronize_session': False})
+        # The bulk delete bypasses the ORM hook that keeps daily stats current
+        DailyStats.recount_days(deleted_days, session)
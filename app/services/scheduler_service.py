@@ -3,17 +3,14 @@ import os
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.executors.pool import ThreadPoolExecutor
-from app.models.relational import ParsedContent, RSSFeed
+from app.models.relational import DailyStats, RSSFeed
 from app.services.feed_parser_service import fetch_and_parse_feed_sync
-from app.services.summary_service import SummaryService
 from app.services.news_rollup_service import NewsRollupService
 from app.services.mongodb_sync_service import MongoDBSyncService
 from flask import current_app
-from app.utils.db_connection_manager import DBConnectionManager
 from logging import getLogger
 from app.utils.auto_tagger import tag_untagged_content
 from app.utils.threat_group_cards_updater import update_threat_group_cards
-from app.models.relational.parsed_content import ParsedContent
 from app.extensions import db
 
 logger = getLogger(__name__)
@@ -92,6 +89,18 @@ class SchedulerService:
             minute=0
         )
 
+        # Materialize recent days' dashboard stats and finalize past ones
+        self.scheduler.add_job(
+            func=self.job_with_app_context(self.refresh_daily_stats),
+            trigger="interval",
+            hours=1,
+            next_run_time=datetime.now(),
+            id='refresh_daily_stats',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
         # Add the new auto-tagging job
         self.scheduler.add_job(
             func=self.job_with_app_context(self.auto_tag_untagged_content),
@@ -111,30 +120,16 @@ class SchedulerService:
         logger.info("Scheduled job added: update_threat_group_cards_job")
 
         self.scheduler.add_job(
-            func=self.job_with_app_context(MongoDBSyncService.sync_parsed_content_to_mongodb),
+            func=self.job_with_app_context(MongoDBSyncService.sync_all_to_mongodb),
             trigger="interval",
             minutes=sync_interval,
-            id='sync_parsed_content_to_mongodb',
-            replace_existing=True
-        )
-        
-        self.scheduler.add_job(
-            func=self.job_with_app_context(MongoDBSyncService.sync_alltools_to_mongodb),
-            trigger="interval",
-            minutes=sync_interval,
-            id='sync_alltools_to_mongodb',
-            replace_existing=True
-        )
-        
-        self.scheduler.add_job(
-            func=self.job_with_app_context(MongoDBSyncService.sync_allgroups_to_mongodb),
-            trigger="interval",
-            minutes=sync_interval,
-            id='sync_allgroups_to_mongodb',
-            replace_existing=True
+            id='sync_all_to_mongodb',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
         )
 
-        logger.info(f"Scheduled MongoDB sync jobs to run every {sync_interval} minutes.")
+        logger.info(f"Scheduled MongoDB sync job to run every {sync_interval} minutes.")
         self.scheduler.start()
         self.is_running = True
         logger.info(
@@ -195,48 +190,24 @@ class SchedulerService:
             scheduler_logger.info(
                 f"Finished processing {processed_feeds}/{total_feeds} RSS feeds, added {new_articles_count} new articles"
             )
-        asyncio.run(self._start_check_empty_summaries_async())
+        self.enqueue_empty_summaries()
 
     def start_check_empty_summaries(self):
-        asyncio.run(self._start_check_empty_summaries_async())
+        self.enqueue_empty_summaries()
 
-    async def _start_check_empty_summaries_async(self):
+    def enqueue_empty_summaries(self):
+        """Queue articles without a summary for the summary worker."""
         with self.app.app_context():
-            processed_count = 0
-            summary_service = SummaryService()
-
-            with DBConnectionManager.get_session() as session:
-                empty_summary_ids = (
-                    session.query(ParsedContent.id)
-                    .filter(ParsedContent.summary.is_(None))
-                    .limit(50)
-                    .all()
-                )
-
-            for (content_id,) in empty_summary_ids:
-                try:
-                    with DBConnectionManager.get_session() as session:
-                        content = session.query(ParsedContent).get(content_id)
-                        if content:
-                            success = await summary_service.enhance_summary(content.id.hex)
-                            if success:
-                                processed_count += 1
-                            else:
-                                scheduler_logger.warning(
-                                    f"Failed to generate summary for content {content.id}"
-                                )
-                        else:
-                            scheduler_logger.warning(
-                                f"Content with id {content_id} not found"
-                            )
-                except Exception as e:
-                    scheduler_logger.error(
-                        f"Error generating summary for content {content_id}: {str(e)}"
-                    )
-
-            scheduler_logger.info(
-                f"Processed {processed_count} out of {len(empty_summary_ids)} empty summaries"
-            )
+            worker = getattr(self.app, 'summary_worker', None)
+            if worker is None:
+                scheduler_logger.info("Summary worker is not running, not queuing empty summaries")
+                return
+            try:
+                queued = worker.enqueue_backlog(self.config['SUMMARY_BACKLOG_BATCH'])
+                scheduler_logger.info(f"Queued {queued} empty summaries, worker status: {worker.metrics()}")
+            except Exception as e:
+                db.session.rollback()
+                scheduler_logger.error(f"Error queuing empty summaries: {str(e)}", exc_info=True)
 
     def create_morning_rollup(self):
         with self.app.app_context():
@@ -262,6 +233,15 @@ class SchedulerService:
             except Exception as e:
                 logger.error(f"Error creating end of day rollup: {str(e)}")
 
+    def refresh_daily_stats(self):
+        try:
+            materialized = DailyStats.materialize_recent_days()
+            finalized = DailyStats.finalize_past_days()
+            logger.info(f"Materialized daily stats for {materialized} day(s), finalized {finalized} day(s)")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error refreshing daily stats: {str(e)}")
+
     def auto_tag_untagged_content(self):
         with self.app.app_context():
             tag_untagged_content()
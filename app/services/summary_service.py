@@ -12,9 +12,15 @@ from app.utils.db_connection_manager import DBConnectionManager
 import os
 import asyncio
 import json
-from typing import Optional
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
+from flask import current_app
 from app.utils.experimental_ollama_client import ExperimentalOllamaAPI
+from app.utils.text_chunker import split_for_summary
+
+# Upper bound in seconds on one chunk of a map-reduce summary.
+CHUNK_TIMEOUT = 180
 
 logger = setup_logger('summary_service', 'summary_service.log')
 
@@ -36,12 +42,109 @@ class SummaryService:
 
     async def generate_summary(self, content_id: str, text_to_summarize: str) -> Optional[str]:
         api = self._initialize_api()
-        json_summary = await api.generate_json("threat_intel_summary_json", text_to_summarize)
+        chunks = split_for_summary(text_to_summarize)
+        if len(chunks) == 1:
+            json_summary = await api.generate_json("threat_intel_summary_json", text_to_summarize)
+        else:
+            json_summary = await self._map_reduce_summary(api, content_id, chunks)
         
         # Convert the JSON summary to a string format
         summary_str = json.dumps(json_summary, indent=2)
         return summary_str
 
+    async def _map_reduce_summary(self, api: ExperimentalOllamaAPI, content_id: str, chunks: List[str]) -> dict:
+        """
+        Summarize a long article by extracting notes from each chunk in parallel
+        and merging them in a final prompt.
+        """
+        notes = await self._summarize_chunks(api, content_id, chunks)
+        if not notes:
+            return {"error": "Failed to summarize any chunk of the article"}
+
+        return await api.generate_json("threat_intel_reduce_json", json.dumps(notes, indent=1))
+
+    async def _summarize_chunks(self, api: ExperimentalOllamaAPI, content_id: str, chunks: List[str]) -> List[dict]:
+        """
+        Extract notes from each chunk of an article in parallel.
+
+        At most SUMMARY_CONCURRENCY chunks of the article are sent at once, the
+        number of requests the Ollama server runs in parallel. Each call is
+        bounded by CHUNK_TIMEOUT from the moment it holds a slot, so time spent
+        waiting behind the other chunks does not count, and chunks that fail
+        are left out: a single slow or malformed answer cannot stall the article.
+        """
+        semaphore = asyncio.Semaphore(current_app.config.get('SUMMARY_CONCURRENCY', 1))
+
+        async def summarize_chunk(index: int, chunk: str) -> Optional[dict]:
+            try:
+                async with semaphore:
+                    # Cancelling the async LLM call on timeout ends its request on the server
+                    notes = await asyncio.wait_for(api.generate_json("threat_intel_chunk_json", chunk), CHUNK_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"Chunk {index + 1}/{len(chunks)} of {content_id} timed out after {CHUNK_TIMEOUT}s")
+                return None
+            except Exception as e:
+                logger.warning(f"Chunk {index + 1}/{len(chunks)} of {content_id} failed: {str(e)}")
+                return None
+            if not isinstance(notes, dict) or 'error' in notes:
+                logger.warning(f"Chunk {index + 1}/{len(chunks)} of {content_id} returned no usable notes")
+                return None
+            return notes
+
+        logger.info(f"Summarizing {content_id} in {len(chunks)} chunks")
+        notes = await asyncio.gather(*(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+        return [note for note in notes if note is not None]
+
+    async def stream_summary(self, content_id: str) -> AsyncIterator[str]:
+        """
+        Yield the JSON summary of an article as the model generates it, then store it.
+
+        Long articles have their chunks summarized first, so only the merge
+        step streams. Nothing is yielded for an article that already has a
+        summary or has nothing to summarize; callers read the stored summary
+        afterwards to tell success from failure.
+        """
+        with DBConnectionManager.get_session() as session:
+            parsed_content = self._lock_content(session, content_id)
+            text_to_summarize = self._text_to_summarize(parsed_content) if parsed_content else None
+        if not text_to_summarize:
+            return
+
+        api = self._initialize_api()
+        chunks = split_for_summary(text_to_summarize)
+        if len(chunks) == 1:
+            prompt_type, prompt_input = "threat_intel_summary_json", text_to_summarize
+        else:
+            notes = await self._summarize_chunks(api, content_id, chunks)
+            if not notes:
+                logger.warning(f"Failed to summarize any chunk of {content_id}")
+                return
+            prompt_type, prompt_input = "threat_intel_reduce_json", json.dumps(notes, indent=1)
+
+        stream = api.stream_json(prompt_type, prompt_input)
+        async with aclosing(stream) as tokens:
+            async for token in tokens:
+                yield token
+
+        json_summary = stream.result
+        if not isinstance(json_summary, dict) or 'error' in json_summary:
+            logger.warning(f"Streamed summary of {content_id} is not valid JSON")
+            return
+        with DBConnectionManager.get_session() as session:
+            parsed_content = self._lock_content(session, content_id)
+            if parsed_content is not None:
+                parsed_content.summary = json.dumps(json_summary, indent=2)
+        logger.info(f"Updated summary for record {content_id} from a stream")
+
+    @staticmethod
+    def _text_to_summarize(parsed_content: ParsedContent) -> Optional[str]:
+        """Return the content of an article, or its description when the content is empty."""
+        if parsed_content.content and parsed_content.content.strip():
+            return parsed_content.content
+        if parsed_content.description and parsed_content.description.strip():
+            return parsed_content.description
+        return None
+
     def enhance_summary_sync(self, content_id: str) -> bool:
         return asyncio.run(self.enhance_summary(content_id))
 
@@ -63,22 +166,17 @@ class SummaryService:
         for attempt in range(self.max_retries):
             try:
                 with DBConnectionManager.get_session() as session:
-                    parsed_content = self._lock_content(session, content_id)
+                    # Not _lock_content: an article summarized meanwhile is a success, not a missing row
+                    parsed_content = session.get(ParsedContent, uuid_obj)
                     if not parsed_content:
-                        logger.warning(f"ParsedContent not found or locked for id {content_id}")
+                        logger.warning(f"ParsedContent not found for id {content_id}")
                         return False
 
                     if parsed_content.summary:
                         logger.info(f"Record {content_id} already has a summary. Skipping.")
                         return True
 
-                    # Check if content exists and is not empty, if empty check description
-                    text_to_summarize = None
-                    if parsed_content.content and parsed_content.content.strip():
-                        text_to_summarize = parsed_content.content
-                    elif parsed_content.description and parsed_content.description.strip():
-                        text_to_summarize = parsed_content.description
-                    
+                    text_to_summarize = self._text_to_summarize(parsed_content)
                     if not text_to_summarize:
                         logger.warning(f"Record {content_id} has no content or description. Skipping summary generation.")
                         return False
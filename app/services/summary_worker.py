@@ -0,0 +1,365 @@
+"""
+SummaryWorker: drains the summary_jobs queue at the capacity of the LLM server.
+
+The worker runs its own asyncio event loop in a daemon thread and keeps at
+most `concurrency` summaries in flight, which should match the number of
+requests the Ollama server processes in parallel (OLLAMA_NUM_PARALLEL).
+Summaries call the LLM through its async client, so a timed-out call is
+cancelled instead of holding a thread; the remaining blocking calls made with
+run_in_executor(None, ...) go to a dedicated thread pool of the same size
+instead of the process-wide default executor.
+
+Jobs are claimed in priority order, so summaries a user asked for run
+before the backlog; with more than one slot, one slot is kept free of
+backlog jobs so an interactive request never waits behind a full pool of
+long backlog summaries. Interactive jobs are generated as a token stream
+that web requests in the same process relay to the browser with job_tokens.
+
+Jobs live in the database, so a restart loses nothing. A claimed job holds
+a lease of JOB_LEASE: the worker gives up on a job that runs longer, and
+every worker periodically queues again the running jobs whose lease
+expired, which were left behind by a worker that stopped. Only the
+process serving the app runs a worker, not `flask` commands.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+import click
+from sqlalchemy import exists
+
+from app.extensions import db
+from app.models.relational.parsed_content import ParsedContent
+from app.models.relational.summary_job import BACKLOG_PRIORITY, INTERACTIVE_PRIORITY, SummaryJob
+from app.services.summary_service import SummaryService
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('summary_worker', 'summary_worker.log')
+
+# How often the queue is polled when nothing wakes the worker up.
+POLL_INTERVAL = 30
+# Throughput is reported over this trailing window.
+METRICS_WINDOW = 600
+# Finished jobs are kept this long for inspection.
+JOB_RETENTION = timedelta(days=7)
+# A job runs for at most this long; running jobs started longer ago are queued again.
+JOB_LEASE = timedelta(minutes=30)
+# How often running jobs are checked for an expired lease.
+LEASE_CHECK_INTERVAL = 300
+
+
+class SummaryWorker:
+    """A background worker that runs queued summary jobs with bounded concurrency."""
+
+    def __init__(self, app, concurrency: int = 1) -> None:
+        self.app = app
+        self.concurrency = max(concurrency, 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='summary-llm')
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = threading.Event()
+        # Notified whenever a job starts, streams a token or finishes, for clients waiting on a job
+        self._job_updates = threading.Condition()
+        # Tokens generated so far by the interactive jobs being streamed, by job id
+        self._token_streams: Dict[UUID, List[str]] = {}
+        self._metrics_lock = threading.Lock()
+        self._finished: Deque[Tuple[float, float, bool]] = deque()
+        self._running = 0
+        self._running_backlog = 0
+        self._succeeded = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='summary-worker', daemon=True)
+        self._thread.start()
+        logger.info(f"Summary worker started with concurrency {self.concurrency}")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs and wait for the ones in flight to finish."""
+        self._stopping.set()
+        self.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=False)
+
+    def notify(self) -> None:
+        """Wake the worker after jobs have been queued."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def submit(self, content_id: UUID, priority: int = INTERACTIVE_PRIORITY) -> SummaryJob:
+        """Queue (or reprioritize) the summary job of one article and wake the worker."""
+        job = SummaryJob.submit(content_id, priority)
+        db.session.commit()
+        self.notify()
+        return job
+
+    def wait_for_job_update(self, timeout: float) -> None:
+        """Block until some job starts or finishes in this process, or timeout seconds pass."""
+        with self._job_updates:
+            self._job_updates.wait(timeout)
+
+    def job_tokens(self, job_id: UUID, start: int, timeout: float) -> List[str]:
+        """
+        Return the tokens a running job streamed from index start on.
+
+        Blocks until there are new tokens, some job starts or finishes, or
+        timeout seconds pass; an empty list means there is nothing new to relay.
+        """
+        with self._job_updates:
+            tokens = self._token_streams.get(job_id)
+            if tokens is None or len(tokens) <= start:
+                self._job_updates.wait(timeout)
+                tokens = self._token_streams.get(job_id)
+            return tokens[start:] if tokens else []
+
+    def _job_updated(self) -> None:
+        with self._job_updates:
+            self._job_updates.notify_all()
+
+    def enqueue_backlog(self, limit: int) -> int:
+        """
+        Queue jobs for articles without a summary, oldest first.
+
+        Articles with an active job, or one that failed recently, are skipped.
+
+        Returns:
+            int: The number of jobs queued.
+        """
+        now = datetime.utcnow()
+        content_ids = [
+            content_id for (content_id,) in db.session.query(ParsedContent.id)
+            .filter(
+                ParsedContent.summary.is_(None),
+                ~exists().where(
+                    SummaryJob.parsed_content_id == ParsedContent.id,
+                    SummaryJob.blocking_job_filter(now),
+                ),
+            )
+            .order_by(ParsedContent.created_at)
+            .limit(limit)
+        ]
+        jobs = SummaryJob.enqueue(content_ids)
+        SummaryJob.prune(JOB_RETENTION)
+        db.session.commit()
+        if jobs:
+            self.notify()
+        return len(jobs)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return queue depth and throughput over the last METRICS_WINDOW seconds."""
+        now = time.monotonic()
+        with self._metrics_lock:
+            self._trim(now)
+            recent = list(self._finished)
+            running, succeeded, failed = self._running, self._succeeded, self._failed
+        recent_succeeded = [duration for _, duration, success in recent if success]
+        return {
+            'concurrency': self.concurrency,
+            'queue_depth': SummaryJob.queue_depth(),
+            'interactive_queue_depth': SummaryJob.queue_depth(max_priority=INTERACTIVE_PRIORITY),
+            'running': running,
+            'succeeded': succeeded,
+            'failed': failed,
+            'summaries_per_minute': round(len(recent_succeeded) * 60 / METRICS_WINDOW, 2),
+            'avg_seconds': round(sum(recent_succeeded) / len(recent_succeeded), 2) if recent_succeeded else None,
+            'window_seconds': METRICS_WINDOW,
+        }
+
+    def _trim(self, now: float) -> None:
+        while self._finished and self._finished[0][0] < now - METRICS_WINDOW:
+            self._finished.popleft()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.set_default_executor(self._executor)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._serve())
+        except Exception as e:
+            logger.error(f"Summary worker stopped unexpectedly: {str(e)}", exc_info=True)
+        finally:
+            loop.close()
+            self._loop = None
+
+    async def _serve(self) -> None:
+        self._wakeup = asyncio.Event()
+        tasks: Set[asyncio.Task] = set()
+        next_lease_check = 0.0
+        while not self._stopping.is_set():
+            if time.monotonic() >= next_lease_check:
+                self._requeue_expired()
+                next_lease_check = time.monotonic() + LEASE_CHECK_INTERVAL
+            free_slots = self.concurrency - len(tasks)
+            if free_slots > 0:
+                try:
+                    claimed = self._claim(free_slots, self._backlog_slots())
+                except Exception as e:
+                    logger.error(f"Could not claim summary jobs: {str(e)}", exc_info=True)
+                    claimed = []
+                if claimed:
+                    self._job_updated()
+                for job_id, content_id, priority in claimed:
+                    task = asyncio.create_task(self._process(job_id, content_id, priority >= BACKLOG_PRIORITY))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            # Sleep until a job finishes, new jobs are queued or the poll interval passes.
+            wakeup = asyncio.create_task(self._wakeup.wait())
+            await asyncio.wait(tasks | {wakeup}, timeout=POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+            wakeup.cancel()
+            self._wakeup.clear()
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _requeue_expired(self) -> None:
+        """Queue again the jobs left running by a worker that stopped."""
+        with self.app.app_context():
+            try:
+                requeued = SummaryJob.requeue_expired(JOB_LEASE)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Could not requeue expired summary jobs: {str(e)}", exc_info=True)
+                return
+        if requeued:
+            logger.info(f"Requeued {requeued} summary jobs whose lease expired")
+            self.notify()
+
+    def _backlog_slots(self) -> int:
+        """Return how many more backlog jobs may run, keeping one slot for interactive jobs."""
+        backlog_capacity = self.concurrency - 1 if self.concurrency > 1 else 1
+        return max(backlog_capacity - self._running_backlog, 0)
+
+    def _claim(self, limit: int, backlog_limit: int) -> List[Tuple[UUID, UUID, int]]:
+        """Mark up to limit queued jobs, at most backlog_limit of them backlog jobs, as running."""
+        with self.app.app_context():
+            query = db.session.query(SummaryJob.id, SummaryJob.parsed_content_id, SummaryJob.priority).filter(
+                SummaryJob.status == SummaryJob.QUEUED
+            )
+            if backlog_limit <= 0:
+                query = query.filter(SummaryJob.priority < BACKLOG_PRIORITY)
+            candidates = query.order_by(SummaryJob.priority, SummaryJob.created_at).limit(limit).all()
+            claimed = []
+            for job_id, content_id, priority in candidates:
+                if priority >= BACKLOG_PRIORITY:
+                    if backlog_limit <= 0:
+                        continue
+                    backlog_limit -= 1
+                # The status check makes the claim safe against another worker process.
+                updated = db.session.query(SummaryJob).filter(
+                    SummaryJob.id == job_id, SummaryJob.status == SummaryJob.QUEUED
+                ).update({
+                    SummaryJob.status: SummaryJob.RUNNING,
+                    SummaryJob.started_at: datetime.utcnow(),
+                    SummaryJob.attempts: SummaryJob.attempts + 1,
+                }, synchronize_session=False)
+                if updated:
+                    claimed.append((job_id, content_id, priority))
+            db.session.commit()
+            return claimed
+
+    async def _process(self, job_id: UUID, content_id: UUID, backlog: bool) -> None:
+        started = time.monotonic()
+        with self._metrics_lock:
+            self._running += 1
+            self._running_backlog += backlog
+        success, error = False, None
+        with self.app.app_context():
+            try:
+                if backlog:
+                    summary = SummaryService().enhance_summary(content_id.hex)
+                else:
+                    summary = self._stream_summary(job_id, content_id)
+                # Give up before the lease expires, so no other worker runs the job at the same time
+                success = await asyncio.wait_for(summary, JOB_LEASE.total_seconds())
+                if not success:
+                    error = "Summary generation failed"
+            except asyncio.TimeoutError:
+                logger.error(f"Summary job {job_id} did not finish within its lease")
+                error = "Summary generation timed out"
+            except Exception as e:
+                logger.error(f"Error running summary job {job_id}: {str(e)}", exc_info=True)
+                error = str(e)
+            try:
+                self._finish(job_id, success, error)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Could not record the result of summary job {job_id}: {str(e)}")
+
+        now = time.monotonic()
+        with self._metrics_lock:
+            self._running -= 1
+            self._running_backlog -= backlog
+            if success:
+                self._succeeded += 1
+            else:
+                self._failed += 1
+            self._finished.append((now, now - started, success))
+            self._trim(now)
+        self._job_updated()
+
+    async def _stream_summary(self, job_id: UUID, content_id: UUID) -> bool:
+        """Generate a summary as a token stream for job_tokens, falling back to enhance_summary."""
+        service = SummaryService()
+        with self._job_updates:
+            self._token_streams[job_id] = []
+        try:
+            async with aclosing(service.stream_summary(content_id.hex)) as tokens:
+                async for token in tokens:
+                    with self._job_updates:
+                        self._token_streams[job_id].append(token)
+                        self._job_updates.notify_all()
+        except Exception as e:
+            logger.warning(f"Streaming summary job {job_id} failed: {str(e)}")
+        finally:
+            with self._job_updates:
+                del self._token_streams[job_id]
+        # Succeeds at once if the stream stored the summary, and otherwise retries without streaming
+        return await service.enhance_summary(content_id.hex)
+
+    def _finish(self, job_id: UUID, success: bool, error: Optional[str]) -> None:
+        db.session.query(SummaryJob).filter(SummaryJob.id == job_id).update({
+            SummaryJob.status: SummaryJob.DONE if success else SummaryJob.FAILED,
+            SummaryJob.finished_at: datetime.utcnow(),
+            SummaryJob.error: error,
+        }, synchronize_session=False)
+        db.session.commit()
+
+
+def _running_flask_command() -> bool:
+    """Return whether the app was loaded by a `flask` command other than `flask run`."""
+    if os.environ.get('FLASK_RUN_FROM_CLI') != 'true':
+        return False
+    context = click.get_current_context(silent=True)
+    return context is None or context.command.name != 'run'
+
+
+def init_summary_worker(app) -> Optional[SummaryWorker]:
+    """
+    Create and start the summary worker of an app.
+
+    None is started under TESTING or in a `flask` command such as
+    `flask deduplicate-content`, which would otherwise claim jobs it never finishes.
+    """
+    if app.config.get('TESTING') or _running_flask_command():
+        return None
+    worker = SummaryWorker(app, concurrency=app.config['SUMMARY_CONCURRENCY'])
+    worker.start()
+    return worker
@@ -4,6 +4,8 @@ document.addEventListener('DOMContentLoaded', function() {
     const paginationContainer = document.getElementById('pagination-container');
     let currentPage = 1;
     const itemsPerPage = 10;
+    // How long to wait for a queued summary before giving up
+    const summaryWaitTimeoutMs = 15 * 60 * 1000;
 
     const dateForm = document.getElementById('date-form');
     const dateInput = document.getElementById('date');
@@ -223,6 +225,13 @@ document.addEventListener('DOMContentLoaded', function() {
             }
             return response.json();
         })
+        .then(data => {
+            if (data.job_id) {
+                // Queued ahead of the backlog; wait for the job to finish
+                return waitForSummaryJob(data, button);
+            }
+            return data;
+        })
         .then(data => {
             if (data.summary) {
                 alert('Content summarized successfully!');
@@ -242,6 +251,43 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    function waitForSummaryJob(job, button) {
+        logDebug(`Waiting for summary job ${job.job_id}`);
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(job.events_url);
+            // The server ends each connection after a short while and EventSource reconnects,
+            // so the overall wait is bounded here
+            const timer = setTimeout(() => {
+                source.close();
+                reject(new Error('Timed out waiting for the summary'));
+            }, summaryWaitTimeoutMs);
+            const showStatus = state => {
+                button.textContent = state.status === 'queued' && state.queue_position
+                    ? `Queued (${state.queue_position} ahead)...`
+                    : 'Summarizing...';
+            };
+            showStatus(job);
+            source.addEventListener('status', event => showStatus(JSON.parse(event.data)));
+            source.addEventListener('done', event => {
+                clearTimeout(timer);
+                source.close();
+                resolve(JSON.parse(event.data));
+            });
+            source.addEventListener('failed', event => {
+                clearTimeout(timer);
+                source.close();
+                reject(new Error(JSON.parse(event.data).error || 'Failed to summarize content'));
+            });
+            source.onerror = () => {
+                // A stream ended by the server is reconnected; only a closed source is a failure
+                if (source.readyState === EventSource.CLOSED) {
+                    clearTimeout(timer);
+                    reject(new Error('Lost connection while waiting for the summary'));
+                }
+            };
+        });
+    }
+
     const clearSummariesBtn = document.getElementById('clear-summaries-btn');
     if (clearSummariesBtn) {
         clearSummariesBtn.addEventListener('click', function() {
@@ -6,6 +6,8 @@ import logging
 from flask import current_app
 from app.utils.mongodb_connection import get_mongo_client
 from app.utils.logging_config import setup_logger
+from app.services.entity_counter_service import EntityCounterService
+from app.utils.mongodb_indexes import NEEDS_TAGGING_FIELD, UNTAGGED_FILTER
 
 # Spacy setup
 nlp = spacy.load("en_core_web_lg")
@@ -67,6 +69,26 @@ def tag_text_field(text):
 
 # Remove the tag_content function as it's redundant with tag_text_field
 
+def cluster_tag_updates(collection, document, fields):
+    """
+    Copy tags from the canonical document of a near-duplicate cluster.
+
+    Only fields whose text is identical to the canonical document's (typically
+    the reused content and summary) are copied; other fields still need tagging.
+    """
+    cluster_id = document.get('cluster_id')
+    if not cluster_id or cluster_id == document['_id']:
+        return {}
+    projection = {name: 1 for field in fields for name in (field, f"{field}_tags")}
+    canonical = collection.find_one({'_id': cluster_id}, projection)
+    if not canonical:
+        return {}
+    return {
+        f"{field}_tags": canonical[f"{field}_tags"]
+        for field in fields
+        if f"{field}_tags" in canonical and document.get(field) and canonical.get(field) == document.get(field)
+    }
+
 def process_and_update_documents():
     try:
         logger.info("Starting process_and_update_documents")
@@ -132,8 +154,10 @@ def process_and_update_documents():
             if updates:
                 parsed_content_collection.update_one(
                     {'_id': document['_id']},
-                    {'$set': updates}
+                    {'$set': updates, '$unset': {NEEDS_TAGGING_FIELD: ''}}
                 )
+                if 'content_tags' in updates:
+                    EntityCounterService.record_document_tags(db, document, updates['content_tags'])
 
             processed_count += 1
             if processed_count % 100 == 0:
@@ -209,20 +233,18 @@ def tag_all_content(force_all=True):
             documents_to_process = parsed_content_collection.find()
             logger.info("Processing all documents for tagging")
         else:
-            # Find documents without tags
-            documents_to_process = parsed_content_collection.find({
-                "$or": [{f"{field}_tags": {"$exists": False}} for field in fields_to_tag]
-            })
+            # Find documents flagged for tagging (served by a partial index)
+            documents_to_process = parsed_content_collection.find(UNTAGGED_FILTER)
             logger.info("Processing only untagged documents")
 
         processed_count = 0
         tagged_count = 0
         for document in documents_to_process:
             try:
-                updates = {}
+                updates = {} if force_all else cluster_tag_updates(parsed_content_collection, document, fields_to_tag)
                 for field in fields_to_tag:
                     text = document.get(field)
-                    if text:
+                    if text and f"{field}_tags" not in updates:
                         tags = tag_text_field(text)
                         updates[f"{field}_tags"] = tags
 
@@ -231,8 +253,10 @@ def tag_all_content(force_all=True):
                 if updates:
                     parsed_content_collection.update_one(
                         {'_id': document['_id']},
-                        {'$set': updates}
+                        {'$set': updates, '$unset': {NEEDS_TAGGING_FIELD: ''}}
                     )
+                    if 'content_tags' in updates:
+                        EntityCounterService.record_document_tags(db, document, updates['content_tags'])
 
                 processed_count += 1
                 if processed_count % 100 == 0:
@@ -282,23 +306,22 @@ def tag_untagged_content():
 
         fields_to_tag = ['content', 'description', 'summary', 'title']
 
-        # Find documents without tags
-        untagged_docs = parsed_content_collection.find({
-            "$or": [{f"{field}_tags": {"$exists": False}} for field in fields_to_tag]
-        })
+        # Find documents flagged for tagging (served by a partial index)
+        untagged_docs = parsed_content_collection.find(UNTAGGED_FILTER)
 
         for document in untagged_docs:
-            updates = {}
+            updates = cluster_tag_updates(parsed_content_collection, document, fields_to_tag)
             for field in fields_to_tag:
-                if f"{field}_tags" not in document:
+                if f"{field}_tags" not in document and f"{field}_tags" not in updates:
                     text = document.get(field)
                     tags = tag_text_field(text) if text else []
                     updates[f"{field}_tags"] = tags
+            update = {'$unset': {NEEDS_TAGGING_FIELD: ''}}
             if updates:
-                parsed_content_collection.update_one(
-                    {'_id': document['_id']},
-                    {'$set': updates}
-                )
+                update['$set'] = updates
+            parsed_content_collection.update_one({'_id': document['_id']}, update)
+            if 'content_tags' in updates:
+                EntityCounterService.record_document_tags(db, document, updates['content_tags'])
         
         logger.info("Completed tagging untagged documents in parsed_content collection")
     except Exception as e:
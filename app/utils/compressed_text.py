@@ -0,0 +1,70 @@
+"""
+Transparent zlib compression for large text columns.
+
+On SQLite, values of CompressedText columns are stored as zlib blobs tagged
+with a magic prefix; short values and rows written before compression was
+introduced stay plain text, and both read back as str. A decompress_text()
+SQL function is registered on every SQLite connection of the app so queries,
+such as the LIKE fallback of search, can still see the text. Other SQLite
+clients do not have it, so no trigger or view may call it. On PostgreSQL
+values are stored as plain text, since TOAST already compresses large values.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy import Text, event, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeDecorator
+
+MAGIC = b'\x00zl1'
+COMPRESSION_LEVEL = 6
+# Below this size zlib's header and dictionary overhead outweigh the savings.
+MIN_COMPRESS_BYTES = 256
+
+
+def compress_text(value: str) -> Union[bytes, str]:
+    """Compress text for storage, leaving short values as they are."""
+    encoded = value.encode('utf-8')
+    if len(encoded) < MIN_COMPRESS_BYTES:
+        return value
+    return MAGIC + zlib.compress(encoded, COMPRESSION_LEVEL)
+
+
+def decompress_text(value: Union[bytes, str, None]) -> Optional[str]:
+    """Return the text of a stored value, whether compressed or plain."""
+    if isinstance(value, (bytes, memoryview)):
+        value = bytes(value)
+        if value.startswith(MAGIC):
+            return zlib.decompress(value[len(MAGIC):]).decode('utf-8')
+        return value.decode('utf-8')
+    return value
+
+
+class CompressedText(TypeDecorator):
+    """Text column that is zlib-compressed at rest on SQLite."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == 'sqlite':
+            return compress_text(value)
+        return value
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
+
+
+def sql_text(column, dialect_name: str):
+    """Wrap a CompressedText column so SQL expressions such as LIKE see its text."""
+    return func.decompress_text(column, type_=Text) if dialect_name == 'sqlite' else column
+
+
+@event.listens_for(Engine, 'connect')
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function('decompress_text', 1, decompress_text, deterministic=True)
@@ -25,5 +25,22 @@ class DBConnectionManager:
         finally:
             session.close()
 
+    @classmethod
+    @contextmanager
+    def get_snapshot_session(cls):
+        """Yield a read-only session whose queries all see one consistent database snapshot."""
+        session = cls._session_factory()
+        try:
+            if cls._engine.dialect.name == 'sqlite':
+                # pysqlite only opens a transaction before DML, so start the read
+                # transaction explicitly to pin the snapshot for every SELECT.
+                session.connection().exec_driver_sql("BEGIN")
+            else:
+                session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+            yield session
+        finally:
+            session.rollback()
+            session.close()
+
 def init_db_connection_manager(app):
     DBConnectionManager.initialize(app)
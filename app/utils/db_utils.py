@@ -11,3 +11,10 @@ def setup_db_pool():
         pool_pre_ping=True,
         pool_use_lifo=True
     )
+
+def ensure_indexes():
+    """Create model indexes that create_all() skipped because their table already existed."""
+    engine = db.engine
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -1,10 +1,18 @@
+from __future__ import annotations
 import os
 import yaml
 import asyncio
+import threading
+from collections import Counter
+from contextlib import aclosing
 import dirtyjson as json
+from json import dumps
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 from dotenv import load_dotenv
 from langchain_community.llms import Ollama
 from app.utils.logging_config import setup_logger
+from app.utils.json_repair import JSONRepairError, repair_json
+from app.utils.llm_cache import cached_generation, cached_response, store_response
 from functools import partial
 from flask import current_app
 
@@ -12,6 +20,81 @@ logger = setup_logger('experimental_ollama_api', 'experimental_ollama_api.log')
 
 load_dotenv()
 
+# Re-prompting is the last resort after the local repair pass, so one retry is enough
+MAX_JSON_ATTEMPTS = 2
+
+# Process-wide counts of how model answers were parsed
+_json_stats: Counter = Counter()
+_json_stats_lock = threading.Lock()
+
+def _count(key: str) -> None:
+    with _json_stats_lock:
+        _json_stats[key] += 1
+
+def json_generation_stats() -> Dict[str, Any]:
+    """
+    Report how JSON answers were parsed since startup.
+
+    Answers are parsed as they are, repaired locally, or fail; a failure leads
+    to a retry of the prompt until MAX_JSON_ATTEMPTS is reached.
+    """
+    with _json_stats_lock:
+        stats = {key: _json_stats[key] for key in ('generations', 'answers', 'parsed', 'repaired', 'parse_failures', 'retries')}
+    stats['parse_failure_rate'] = round(stats['parse_failures'] / stats['answers'], 3) if stats['answers'] else None
+    stats['repair_rate'] = round(stats['repaired'] / stats['answers'], 3) if stats['answers'] else None
+    stats['retry_rate'] = round(stats['retries'] / stats['generations'], 3) if stats['generations'] else None
+    return stats
+
+def _to_builtin(value):
+    """Convert dirtyjson's attributed containers, which cannot be unpickled, to plain dicts and lists."""
+    if isinstance(value, dict):
+        return {key: _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_builtin(item) for item in value]
+    return value
+
+def parse_json_answer(output: str) -> Optional[dict]:
+    """Parse a JSON answer of any LLM client, repairing it locally and counting the outcome."""
+    _count('answers')
+    try:
+        result = json.loads(output)
+        _count('parsed')
+    except ValueError:
+        try:
+            result = repair_json(output)
+            _count('repaired')
+            logger.info("Repaired a malformed JSON answer")
+        except JSONRepairError as e:
+            _count('parse_failures')
+            logger.warning(f"Failed to parse JSON: {e}")
+            return None
+    return _to_builtin(result)
+
+def count_json_generation(retry: bool = False) -> None:
+    """Count a JSON prompt sent to any LLM client, or a retry of one."""
+    _count('retries' if retry else 'generations')
+
+class JSONStream:
+    """
+    The tokens of a streamed JSON answer, as an async iterator.
+
+    Once the tokens are exhausted, result holds the parsed answer, or None if
+    it could not be parsed, so callers need not parse the joined text again.
+    """
+
+    def __init__(self, generate: Callable[[JSONStream], AsyncIterator[str]]) -> None:
+        self.result: Optional[dict] = None
+        self._tokens = generate(self)
+
+    def __aiter__(self) -> JSONStream:
+        return self
+
+    async def __anext__(self) -> str:
+        return await self._tokens.__anext__()
+
+    async def aclose(self) -> None:
+        await self._tokens.aclose()
+
 class ExperimentalOllamaAPI:
     def __init__(self):
         self.base_url = os.getenv("OLLAMA_BASE_URL")
@@ -24,7 +107,8 @@ class ExperimentalOllamaAPI:
         if not self.model:
             logger.error("OLLAMA_MODEL must be set in the .env file")
             raise ValueError("OLLAMA_MODEL must be set in the .env file")
-        self.llm = Ollama(base_url=self.base_url, model=self.model, num_ctx=8200)
+        # format="json" makes Ollama constrain decoding to valid JSON
+        self.llm = Ollama(base_url=self.base_url, model=self.model, num_ctx=8200, format="json")
         self.prompts = None
         logger.info(f"Initialized ExperimentalOllamaAPI with base_url: {self.base_url} and model: {self.model}")
 
@@ -35,30 +119,42 @@ class ExperimentalOllamaAPI:
                 self.prompts = yaml.safe_load(file)
         return self.prompts
 
-    async def _generate_json_with_retry(self, prompt_type: str, article: str, max_retries: int = 3) -> dict:
-        prompts = self.load_prompts()
-        prompt_data = prompts.get(prompt_type, {})
-        system_prompt = prompt_data.get("system_prompt", "")
-        full_prompt = f"Human: {system_prompt}\n\nArticle: {article}\n\nRespond with a valid JSON object."
+    def _build_prompt(self, prompt_type: str, article: str) -> str:
+        system_prompt = self.load_prompts().get(prompt_type, {}).get("system_prompt", "")
+        return f"Human: {system_prompt}\n\nArticle: {article}\n\nRespond with a valid JSON object."
+
+    @staticmethod
+    def _is_cacheable(result) -> bool:
+        return isinstance(result, dict) and 'error' not in result
+
+    @staticmethod
+    def parse_json(output: str) -> Optional[dict]:
+        """
+        Parse a complete JSON answer of the model, repairing it locally if needed.
+
+        Returns None if the answer cannot be repaired.
+        """
+        return parse_json_answer(output)
+
+    async def _generate_json_with_retry(self, prompt_type: str, article: str, max_retries: int = MAX_JSON_ATTEMPTS) -> dict:
+        full_prompt = self._build_prompt(prompt_type, article)
+        _count('generations')
 
         for attempt in range(max_retries):
+            if attempt > 0:
+                _count('retries')
             try:
-                output = await asyncio.get_event_loop().run_in_executor(
-                    None, partial(self.llm.invoke, full_prompt)
-                )
+                # The async client, unlike invoke in an executor thread, closes the HTTP
+                # request when a caller such as asyncio.wait_for cancels the call
+                output = await self.llm.ainvoke(full_prompt)
 
                 if current_app.debug:
                     logger.debug(f"Generated response (attempt {attempt + 1}): {output}")
 
-                # Use dirtyjson to parse the entire output
-                try:
-                    json_output = json.loads(output)
+                json_output = self.parse_json(output)
+                if json_output is not None:
                     return json_output
-                except json.Error as e:
-                    logger.warning(f"Failed to parse JSON (attempt {attempt + 1}): {e}")
-
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(1)  # Wait for 1 second before retrying
+                logger.warning(f"Unrepairable JSON answer (attempt {attempt + 1}/{max_retries})")
             except Exception as exc:
                 logger.error(f"Error occurred while generating response (attempt {attempt + 1}): {exc}")
                 if attempt < max_retries - 1:
@@ -67,13 +163,51 @@ class ExperimentalOllamaAPI:
         return {"error": "Failed to generate valid JSON after multiple attempts"}
 
     async def generate_json(self, prompt_type: str, article: str) -> dict:
-        """Generate a JSON response based on the prompt type and article."""
+        """Generate a JSON response based on the prompt type and article, reusing cached answers."""
         try:
-            return await self._generate_json_with_retry(prompt_type, article)
+            prompt_data = self.load_prompts().get(prompt_type, {})
+            return await cached_generation(
+                prompt_type, prompt_data, self.model, article,
+                lambda: self._generate_json_with_retry(prompt_type, article),
+                cacheable=self._is_cacheable,
+            )
         except Exception as exc:
             logger.error(f"Error occurred while generating response: {exc}")
             raise RuntimeError(f"Error occurred while generating response: {exc}")
 
+    def stream_json(self, prompt_type: str, article: str) -> JSONStream:
+        """
+        Stream the JSON response to a prompt token by token as the model generates it.
+
+        A cached answer is yielded whole. The parsed answer is left in the
+        stream's result; valid answers are cached for generate_json as well.
+        There is no retry: a malformed stream is the caller's to report.
+        """
+        return JSONStream(lambda stream: self._stream_json_tokens(prompt_type, article, stream))
+
+    async def _stream_json_tokens(self, prompt_type: str, article: str, stream: JSONStream) -> AsyncIterator[str]:
+        prompt_data = self.load_prompts().get(prompt_type, {})
+        cached = cached_response(prompt_type, prompt_data, self.model, article)
+        if cached is not None:
+            stream.result = cached
+            yield dumps(cached)
+            return
+
+        _count('generations')
+        parts = []
+        # Closing the stream early, as a disconnected client does, ends the HTTP request
+        async with aclosing(self.llm.astream(self._build_prompt(prompt_type, article))) as tokens:
+            async for token in tokens:
+                parts.append(token)
+                yield token
+
+        output = ''.join(parts)
+        if current_app.debug:
+            logger.debug(f"Streamed response: {output}")
+        stream.result = self.parse_json(output)
+        if self._is_cacheable(stream.result):
+            store_response(prompt_type, prompt_data, self.model, article, stream.result)
+
     async def check_connection(self) -> bool:
         try:
             test_prompt = "Respond with a JSON object containing the key 'status' and value 'ok'."
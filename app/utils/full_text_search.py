@@ -0,0 +1,292 @@
+"""
+Full-text search over ParsedContent titles and bodies.
+
+SQLite databases get an FTS5 table holding a plain-text copy of every title
+and body, since the bodies are stored compressed (see compressed_text). ORM
+flushes index inserted and updated articles, and a trigger that needs no
+application function drops deleted ones, so other SQLite clients can still
+write parsed_content; rows they insert or update are indexed on the next
+rebuild_full_text_index(). PostgreSQL databases get a generated, GIN-indexed tsvector column. Both are
+created idempotently by init_full_text_search() at startup, per engine, so
+apps in the same process do not share the state. When neither is available,
+is_enabled() returns False and callers fall back to ILIKE scans.
+
+The SQLite index is keyed on the implicit rowid of parsed_content, which
+VACUUM may renumber since the table has no INTEGER PRIMARY KEY: run
+rebuild_full_text_index() (`flask rebuild-search-index`) after every VACUUM.
+`flask compress-content --vacuum` does so itself.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from weakref import WeakKeyDictionary
+
+from markupsafe import Markup, escape
+from sqlalchemy import Column, Integer, MetaData, Table, Text, event, func, inspect, literal_column, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.models.relational.parsed_content import ParsedContent
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('full_text_search', 'full_text_search.log')
+
+FTS_TABLE = 'parsed_content_fts'
+# Title matches weigh more than body matches when ranking with bm25().
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+SNIPPET_WORDS = 24
+# Articles read per batch when the SQLite index is rebuilt.
+REBUILD_CHUNK_SIZE = 500
+# Markers FTS engines wrap around matched terms; replaced by <mark> after escaping.
+_HIGHLIGHT_START = '\x02'
+_HIGHLIGHT_END = '\x03'
+
+# Kept out of db.Model.metadata so create_all() never tries to create it.
+fts_table = Table(
+    FTS_TABLE,
+    MetaData(),
+    Column('rowid', Integer),
+    Column('title', Text),
+    Column('content', Text),
+)
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content,
+        tokenize='porter unicode61',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON parsed_content BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+    END""",
+]
+
+# Earlier indexes read parsed_content as external content, kept in sync by these triggers.
+_LEGACY_SOURCE_VIEW = 'parsed_content_fts_source'
+_LEGACY_TRIGGERS = [f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+
+_POSTGRES_DDL = [
+    """ALTER TABLE parsed_content ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_parsed_content_search_vector ON parsed_content USING GIN (search_vector)",
+]
+
+# Dialect of every engine whose full-text index was initialized.
+_engine_dialects: 'WeakKeyDictionary[Engine, str]' = WeakKeyDictionary()
+
+
+def _dialect() -> Optional[str]:
+    """Return the full-text dialect of the current app's engine, or None if it was not initialized."""
+    return _engine_dialects.get(db.engine)
+
+
+def init_full_text_search(engine) -> bool:
+    """
+    Create the full-text index for the engine's dialect if it does not exist yet.
+
+    Args:
+        engine: The SQLAlchemy engine of the application database.
+
+    Returns:
+        bool: True if full-text search is available.
+    """
+    dialect = engine.dialect.name
+    try:
+        if dialect == 'sqlite':
+            with engine.begin() as connection:
+                existing = connection.exec_driver_sql(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+                ).first()
+                exists = existing is not None
+                if exists and 'content=' in existing[0]:
+                    # External-content indexes relied on triggers calling decompress_text().
+                    for trigger in _LEGACY_TRIGGERS:
+                        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+                    connection.exec_driver_sql(f"DROP VIEW IF EXISTS {_LEGACY_SOURCE_VIEW}")
+                    connection.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+                    exists = False
+                for statement in _SQLITE_DDL:
+                    connection.exec_driver_sql(statement)
+                if not exists:
+                    # Index the rows that were stored before the FTS table existed.
+                    _rebuild_sqlite_index(connection)
+        elif dialect == 'postgresql':
+            with engine.begin() as connection:
+                for statement in _POSTGRES_DDL:
+                    connection.exec_driver_sql(statement)
+        else:
+            logger.warning(f"Full-text search is not supported on {dialect}; falling back to ILIKE")
+            return False
+    except OperationalError as e:
+        logger.error(f"Could not initialize full-text search on {dialect}: {str(e)}")
+        return False
+
+    _engine_dialects[engine] = dialect
+    logger.info(f"Full-text search initialized for {dialect}")
+    return True
+
+
+def rebuild_full_text_index(engine) -> None:
+    """
+    Rebuild the SQLite full-text index from parsed_content.
+
+    Needed after VACUUM, which may renumber the rowids the index is keyed on,
+    and after other clients inserted or updated articles; PostgreSQL's
+    generated column needs no rebuild.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as connection:
+        _rebuild_sqlite_index(connection)
+
+
+def _rebuild_sqlite_index(connection) -> None:
+    connection.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+    rowid = literal_column('parsed_content.rowid', Integer).label('rowid')
+    table = ParsedContent.__table__
+    last_rowid, indexed = 0, 0
+    while True:
+        # Reading the body through its column type decompresses it.
+        rows = connection.execute(
+            select(rowid, table.c.title, table.c.content)
+            .where(rowid > last_rowid)
+            .order_by(rowid)
+            .limit(REBUILD_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(fts_table.insert(), [
+            {'rowid': row.rowid, 'title': row.title, 'content': row.content} for row in rows
+        ])
+        last_rowid = rows[-1].rowid
+        indexed += len(rows)
+    logger.info(f"Rebuilt {FTS_TABLE} from {indexed} parsed_content rows")
+
+
+def _index_article(connection, content_id) -> None:
+    """Replace the SQLite index entry of one article with its current title and body."""
+    table = ParsedContent.__table__
+    row = connection.execute(
+        select(literal_column('rowid', Integer).label('rowid'), table.c.title, table.c.content)
+        .where(table.c.id == content_id)
+    ).first()
+    if row is None:
+        return
+    connection.execute(fts_table.delete().where(fts_table.c.rowid == row.rowid))
+    connection.execute(fts_table.insert(), {'rowid': row.rowid, 'title': row.title, 'content': row.content})
+
+
+@event.listens_for(ParsedContent, 'after_insert')
+def _index_inserted_article(mapper, connection, target) -> None:
+    if _engine_dialects.get(connection.engine) == 'sqlite':
+        _index_article(connection, target.id)
+
+
+@event.listens_for(ParsedContent, 'after_update')
+def _index_updated_article(mapper, connection, target) -> None:
+    if _engine_dialects.get(connection.engine) != 'sqlite':
+        return
+    attributes = inspect(target).attrs
+    if attributes.title.history.has_changes() or attributes.content.history.has_changes():
+        _index_article(connection, target.id)
+
+
+def is_enabled() -> bool:
+    """Return True once init_full_text_search() succeeded for the current app's engine."""
+    return _dialect() is not None
+
+
+def build_match_text(query: str, keywords: Optional[Iterable[str]] = None) -> str:
+    """
+    Turn free text and keywords into a query string for the active engine.
+
+    Every whitespace-separated term (and every keyword) must match. On SQLite
+    each term becomes a quoted FTS5 phrase with prefix matching, so user input
+    never reaches the FTS5 query syntax unescaped; terms like CVE-2024-1234 are
+    matched as token sequences.
+    """
+    terms = [term for term in (query or '').split() if re.search(r'\w', term)]
+    phrases = [keyword.strip() for keyword in keywords or [] if re.search(r'\w', keyword or '')]
+
+    if _dialect() == 'postgresql':
+        return ' '.join(terms + [f'"{phrase}"' for phrase in phrases])
+
+    quoted = [f'"{term.replace(chr(34), chr(34) * 2)}"*' for term in terms]
+    quoted += [f'"{phrase.replace(chr(34), chr(34) * 2)}"' for phrase in phrases]
+    return ' '.join(quoted)
+
+
+def apply_match(query, match_text: str) -> Tuple[object, object]:
+    """
+    Restrict a ParsedContent query to full-text matches.
+
+    Returns:
+        Tuple: The filtered query and a rank expression where lower sorts as more relevant.
+    """
+    if _dialect() == 'postgresql':
+        ts_query = func.websearch_to_tsquery('english', match_text)
+        search_vector = literal_column('parsed_content.search_vector')
+        query = query.filter(search_vector.op('@@')(ts_query))
+        return query, -func.ts_rank_cd(search_vector, ts_query)
+
+    hits = (
+        select(
+            fts_table.c.rowid.label('rowid'),
+            func.bm25(literal_column(FTS_TABLE), TITLE_WEIGHT, CONTENT_WEIGHT).label('rank'),
+        )
+        .where(literal_column(FTS_TABLE).op('MATCH')(match_text))
+        .subquery('fts_hits')
+    )
+    query = query.join(hits, hits.c.rowid == literal_column('parsed_content.rowid'))
+    return query, hits.c.rank
+
+
+def snippets(content_ids: List[UUID], match_text: str) -> Dict[UUID, Markup]:
+    """
+    Return highlighted body excerpts for the given ParsedContent ids.
+
+    Only the ids passed in are highlighted, so callers should pass the current
+    page of results rather than the whole hit set.
+    """
+    if not content_ids or not match_text or not is_enabled():
+        return {}
+
+    if _dialect() == 'postgresql':
+        options = f'StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_END}, MaxFragments=1, MaxWords={SNIPPET_WORDS}'
+        statement = select(
+            ParsedContent.id,
+            func.ts_headline('english', ParsedContent.content,
+                             func.websearch_to_tsquery('english', match_text), options),
+        ).where(ParsedContent.id.in_(content_ids))
+    else:
+        statement = (
+            select(
+                ParsedContent.id,
+                func.snippet(literal_column(FTS_TABLE), 1, _HIGHLIGHT_START, _HIGHLIGHT_END,
+                             '…', SNIPPET_WORDS),
+            )
+            .select_from(fts_table)
+            .join(ParsedContent.__table__, literal_column('parsed_content.rowid') == fts_table.c.rowid)
+            .where(literal_column(FTS_TABLE).op('MATCH')(match_text))
+            .where(ParsedContent.id.in_(content_ids))
+        )
+
+    return {
+        content_id: _highlight(snippet)
+        for content_id, snippet in db.session.execute(statement)
+        if snippet
+    }
+
+
+def _highlight(snippet: str) -> Markup:
+    """Escape a raw snippet and turn the engine's match markers into <mark> tags."""
+    escaped = str(escape(snippet))
+    return Markup(escaped.replace(_HIGHLIGHT_START, '<mark>').replace(_HIGHLIGHT_END, '</mark>'))
@@ -6,6 +6,12 @@ It requires a GROQ_API_KEY to be set in the .env file.
 
 Methods:
     generate(prompt_type: str, article: str) -> str: Generates a summary based on the provided prompt type and article.
+    generate_json(prompt_type: str, article: str) -> dict: Generates a JSON answer, like ExperimentalOllamaAPI.
+    stream_json(prompt_type: str, article: str) -> JSONStream: Streams a JSON answer token by token.
+    parse_json(output: str) -> Optional[dict]: Parses a JSON answer, repairing it if needed.
+
+The JSON methods use the *_json prompts of experimental_prompts.yaml, so
+services can use either client through the same interface.
 
 This class uses the langchain-groq library to make API calls to Groq.
 It requires a GROQ_API_KEY to be set in the .env file.
@@ -13,8 +19,14 @@ It requires a GROQ_API_KEY to be set in the .env file.
 
 import os
 import yaml
+import asyncio
+from contextlib import aclosing
+from json import dumps
+from typing import AsyncIterator, Optional
 from flask import current_app
 from app.utils.logging_config import setup_logger
+from app.utils.experimental_ollama_client import MAX_JSON_ATTEMPTS, JSONStream, count_json_generation, parse_json_answer
+from app.utils.llm_cache import cached_generation, cached_response, store_response
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage
 
@@ -29,24 +41,106 @@ class GroqAPI:
         
         self.model = "llama-3.2-3b-preview"  # You can change this to the desired Groq model
         self.chat_model = ChatGroq(groq_api_key=self.api_key, model_name=self.model)
+        # JSON mode makes Groq return a single valid JSON object
+        self.json_model = self.chat_model.bind(response_format={"type": "json_object"})
         self.prompts = self.load_prompts()
+        self.json_prompts = self.load_prompts('experimental_prompts.yaml')
 
     @staticmethod
-    def load_prompts():
-        prompts_path = os.path.join(current_app.root_path, 'static', 'yaml', 'prompts.yaml')
+    def load_prompts(filename: str = 'prompts.yaml'):
+        prompts_path = os.path.join(current_app.root_path, 'static', 'yaml', filename)
         with open(prompts_path, "r") as file:
             return yaml.safe_load(file)
 
+    def _build_prompt(self, prompt_type: str, article: str) -> str:
+        system_prompt = self.prompts.get(prompt_type, {}).get("system_prompt", "")
+        return f"Human: {system_prompt}\n\n Article: {article}"
+
+    def _build_json_prompt(self, prompt_type: str, article: str) -> str:
+        system_prompt = self.json_prompts.get(prompt_type, {}).get("system_prompt", "")
+        return f"Human: {system_prompt}\n\nArticle: {article}\n\nRespond with a valid JSON object."
+
+    @staticmethod
+    def _is_cacheable(result) -> bool:
+        return isinstance(result, dict) and 'error' not in result
+
+    @staticmethod
+    def parse_json(output: str) -> Optional[dict]:
+        """Parse a complete JSON answer, repairing it locally if needed; None if it cannot be repaired."""
+        return parse_json_answer(output)
+
     async def generate(self, prompt_type: str, article: str) -> str:
         try:
             prompt_data = self.prompts.get(prompt_type, {})
-            system_prompt = prompt_data.get("system_prompt", "")
-            full_prompt = f"Human: {system_prompt}\n\n Article: {article}"
+            full_prompt = self._build_prompt(prompt_type, article)
 
-            messages = [HumanMessage(content=full_prompt)]
-            response = await self.chat_model.ainvoke(messages)
-            return response.content.strip()
+            async def invoke() -> str:
+                response = await self.chat_model.ainvoke([HumanMessage(content=full_prompt)])
+                return response.content.strip()
+
+            return await cached_generation(prompt_type, prompt_data, self.model, article, invoke)
 
         except Exception as e:
             logger.error(f"Error generating summary with Groq: {str(e)}", exc_info=True)
             raise
+
+    async def _generate_json_with_retry(self, prompt_type: str, article: str) -> dict:
+        messages = [HumanMessage(content=self._build_json_prompt(prompt_type, article))]
+        count_json_generation()
+        for attempt in range(MAX_JSON_ATTEMPTS):
+            if attempt > 0:
+                count_json_generation(retry=True)
+            try:
+                response = await self.json_model.ainvoke(messages)
+                json_output = self.parse_json(response.content)
+                if json_output is not None:
+                    return json_output
+                logger.warning(f"Unrepairable JSON answer from Groq (attempt {attempt + 1}/{MAX_JSON_ATTEMPTS})")
+            except Exception as e:
+                logger.error(f"Error generating JSON with Groq (attempt {attempt + 1}): {str(e)}")
+                if attempt < MAX_JSON_ATTEMPTS - 1:
+                    await asyncio.sleep(1)
+        return {"error": "Failed to generate valid JSON after multiple attempts"}
+
+    async def generate_json(self, prompt_type: str, article: str) -> dict:
+        """Generate a JSON answer to a prompt, reusing cached answers."""
+        prompt_data = self.json_prompts.get(prompt_type, {})
+        return await cached_generation(
+            prompt_type, prompt_data, self.model, article,
+            lambda: self._generate_json_with_retry(prompt_type, article),
+            cacheable=self._is_cacheable,
+        )
+
+    def stream_json(self, prompt_type: str, article: str) -> JSONStream:
+        """
+        Stream the JSON answer to a prompt token by token; a cached answer is yielded whole.
+
+        The parsed answer is left in the stream's result; valid answers are
+        cached for generate_json as well.
+        """
+        return JSONStream(lambda stream: self._stream_json_tokens(prompt_type, article, stream))
+
+    async def _stream_json_tokens(self, prompt_type: str, article: str, stream: JSONStream) -> AsyncIterator[str]:
+        prompt_data = self.json_prompts.get(prompt_type, {})
+        cached = cached_response(prompt_type, prompt_data, self.model, article)
+        if cached is not None:
+            stream.result = cached
+            yield dumps(cached)
+            return
+
+        count_json_generation()
+        parts = []
+        try:
+            messages = [HumanMessage(content=self._build_json_prompt(prompt_type, article))]
+            async with aclosing(self.json_model.astream(messages)) as chunks:
+                async for chunk in chunks:
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+        except Exception as e:
+            logger.error(f"Error streaming JSON with Groq: {str(e)}", exc_info=True)
+            raise
+
+        stream.result = self.parse_json(''.join(parts))
+        if self._is_cacheable(stream.result):
+            store_response(prompt_type, prompt_data, self.model, article, stream.result)
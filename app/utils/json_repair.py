@@ -0,0 +1,174 @@
+"""
+Local repair of malformed JSON answers from the LLM.
+
+Models asked for JSON mostly fail in a few mechanical ways: the object is
+wrapped in a Markdown fence or prose, a trailing comma is left before a
+closing bracket, or the answer is cut off by the token limit, leaving
+strings and brackets open. repair_json fixes these without another round
+trip to the model, which is far cheaper than re-running the prompt.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, List, Optional
+
+import dirtyjson
+
+# Only the opening fence is matched: close_json ignores anything after the value,
+# including the closing fence, which may also occur inside a string of the value.
+FENCE_PATTERN = re.compile(r"```(?:json)?", re.IGNORECASE)
+CLOSERS = {'{': '}', '[': ']'}
+
+
+class JSONRepairError(ValueError):
+    """Raised when a text cannot be repaired into JSON."""
+
+
+def extract_json_text(text: str) -> str:
+    """Strip a Markdown fence and any prose before the first object or array."""
+    start = _first_value_index(text)
+    fenced = FENCE_PATTERN.search(text, 0, len(text) if start is None else start)
+    if fenced:
+        text = text[fenced.end():]
+        start = _first_value_index(text)
+    if start is None:
+        raise JSONRepairError("No JSON object or array found")
+    return text[start:]
+
+
+def _first_value_index(text: str) -> Optional[int]:
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    return min(starts) if starts else None
+
+
+def close_json(text: str, drop_incomplete: bool = False) -> str:
+    """
+    Rewrite the first JSON value in text into a complete one.
+
+    Trailing commas are dropped and anything after the value is ignored. A
+    value cut off mid-way has its string closed, a dangling key given a null
+    value and its open arrays and objects closed; with drop_incomplete, the
+    cut-off member is dropped instead, back to the last comma.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # What the innermost container expects next: key, colon, value or comma
+    expecting: List[str] = []
+    in_string = escaped = False
+    complete = True
+    # Output length and open containers at the last comma between members
+    last_comma = None
+
+    def value_done() -> None:
+        if expecting:
+            expecting[-1] = 'comma'
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+                if expecting and expecting[-1] == 'key':
+                    expecting[-1] = 'colon'
+                else:
+                    value_done()
+            continue
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in CLOSERS:
+            stack.append(char)
+            expecting.append('key' if char == '{' else 'value')
+            out.append(char)
+        elif char in '}]':
+            if not stack:
+                break
+            _drop_trailing_comma(out)
+            out.append(CLOSERS[stack.pop()])
+            expecting.pop()
+            value_done()
+            if not stack:
+                break
+        elif char == ',':
+            if stack:
+                last_comma = (len(out), list(stack))
+                expecting[-1] = 'key' if stack[-1] == '{' else 'value'
+            out.append(char)
+        elif char == ':':
+            if expecting:
+                expecting[-1] = 'value'
+            out.append(char)
+        else:
+            if not char.isspace():
+                value_done()
+            out.append(char)
+    else:
+        complete = not stack
+
+    if not complete and drop_incomplete and last_comma is not None:
+        length, stack = last_comma
+        del out[length:]
+        in_string = False
+        expecting = []
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+        if expecting and expecting[-1] == 'key':
+            expecting[-1] = 'colon'
+        else:
+            value_done()
+    if expecting:
+        if expecting[-1] == 'colon':
+            out.append(': null')
+        elif expecting[-1] == 'value' and stack[-1] == '{':
+            out.append(' null')
+    while stack:
+        _drop_trailing_comma(out)
+        out.append(CLOSERS[stack.pop()])
+    return ''.join(out)
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    index = len(out) - 1
+    while index >= 0 and out[index].isspace():
+        index -= 1
+    if index >= 0 and out[index] == ',':
+        del out[index:]
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        # dirtyjson.Error is a ValueError too
+        return dirtyjson.loads(text)
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parse an LLM answer as JSON, repairing it where needed.
+
+    Raises:
+        JSONRepairError: If the answer cannot be repaired.
+    """
+    candidate = extract_json_text(text)
+    try:
+        return _loads(candidate)
+    except ValueError:
+        pass
+    try:
+        return _loads(close_json(candidate))
+    except ValueError:
+        pass
+    try:
+        return _loads(close_json(candidate, drop_incomplete=True))
+    except ValueError as e:
+        raise JSONRepairError(f"Could not repair JSON: {e}") from e
@@ -0,0 +1,141 @@
+"""
+Persistent cache of LLM responses.
+
+Responses are keyed on (prompt type, prompt version, model, sha256 of the
+input), so a syndicated article or an unchanged rollup input is answered
+from disk instead of the model. The prompt version is the prompt's explicit
+`version` entry in the YAML file, or else a hash of its system prompt, so
+editing a prompt retires its cached answers automatically.
+
+The cache lives in <instance>/llm_cache and is bounded by LLM_CACHE_SIZE_LIMIT
+bytes, evicting the least recently used entries first. A limit of 0 turns it off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from diskcache import Cache
+
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('llm_cache', 'llm_cache.log')
+
+CACHE_DIRNAME = 'llm_cache'
+
+T = TypeVar('T')
+
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def prompt_version(prompt_data: Dict[str, Any]) -> str:
+    """Return the version of a prompt definition from prompts.yaml."""
+    version = prompt_data.get('version')
+    if version is not None:
+        return str(version)
+    return hashlib.sha256(prompt_data.get('system_prompt', '').encode('utf-8')).hexdigest()[:12]
+
+
+def llm_cache_key(prompt_type: str, prompt_data: Dict[str, Any], model: str, text: str) -> str:
+    """Build the cache key of one generation."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"{prompt_type}:{prompt_version(prompt_data)}:{model}:{digest}"
+
+
+def get_llm_cache() -> Optional[Cache]:
+    """Return the LLM cache of the current app, or None if it is disabled."""
+    from flask import current_app
+
+    size_limit = current_app.config.get('LLM_CACHE_SIZE_LIMIT', 0)
+    if not size_limit:
+        return None
+    path = os.path.join(current_app.instance_path, CACHE_DIRNAME)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = Cache(path, size_limit=size_limit, eviction_policy='least-recently-used', statistics=True)
+        return _caches[path]
+
+
+def _cache_or_none() -> Optional[Cache]:
+    try:
+        return get_llm_cache()
+    except Exception as e:
+        logger.warning(f"LLM cache unavailable: {str(e)}")
+        return None
+
+
+def cached_response(prompt_type: str, prompt_data: Dict[str, Any], model: str, text: str) -> Optional[Any]:
+    """Return the cached response of a generation, or None on a miss."""
+    cache = _cache_or_none()
+    if cache is None:
+        return None
+    try:
+        cached = cache.get(llm_cache_key(prompt_type, prompt_data, model, text))
+    except Exception as e:
+        logger.warning(f"Could not read the LLM cache: {str(e)}")
+        return None
+    if cached is not None:
+        logger.debug(f"LLM cache hit for {prompt_type}")
+    return cached
+
+
+def store_response(prompt_type: str, prompt_data: Dict[str, Any], model: str, text: str, result: Any) -> None:
+    """Cache the response of a generation."""
+    cache = _cache_or_none()
+    if cache is None:
+        return
+    try:
+        cache.set(llm_cache_key(prompt_type, prompt_data, model, text), result)
+    except Exception as e:
+        logger.warning(f"Could not write the LLM cache: {str(e)}")
+
+
+async def cached_generation(prompt_type: str, prompt_data: Dict[str, Any], model: str, text: str,
+                            generate: Callable[[], Awaitable[T]],
+                            cacheable: Callable[[T], bool] = bool) -> T:
+    """
+    Return the cached response of a generation, or run generate() and cache its result.
+
+    Args:
+        prompt_type: Name of the prompt in the prompts YAML file.
+        prompt_data: The prompt's definition, used for its version.
+        model: The model that answers the prompt.
+        text: The input the prompt is applied to.
+        generate: Coroutine function producing the response on a miss.
+        cacheable: Whether a response may be stored; failures should not be.
+    """
+    cached = cached_response(prompt_type, prompt_data, model, text)
+    if cached is not None:
+        return cached
+
+    result = await generate()
+    if cacheable(result):
+        store_response(prompt_type, prompt_data, model, text, result)
+    return result
+
+
+def llm_cache_stats() -> Optional[Dict[str, Any]]:
+    """Return hit and miss counts and the size of the LLM cache, or None if it is disabled."""
+    cache = get_llm_cache()
+    if cache is None:
+        return None
+    hits, misses = cache.stats()
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else None,
+        'entries': len(cache),
+        'size_bytes': cache.volume(),
+        'size_limit_bytes': cache.size_limit,
+    }
+
+
+def clear_llm_cache() -> int:
+    """Drop every cached response. Returns the number of entries removed."""
+    cache = get_llm_cache()
+    return cache.clear() if cache is not None else 0
@@ -1,6 +1,6 @@
 from pymongo import MongoClient
 from flask import current_app
 
-def get_mongo_client():
+def get_mongo_client(**kwargs):
     mongodb_uri = current_app.config['MONGODB_URI']
-    return MongoClient(mongodb_uri)
+    return MongoClient(mongodb_uri, **kwargs)
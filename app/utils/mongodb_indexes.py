@@ -0,0 +1,98 @@
+"""
+Declarations and provisioning of the MongoDB indexes used by the application.
+
+Every query the tagger, dashboard and sync jobs run against MongoDB should be
+backed by an index declared here. ensure_mongo_indexes() is called at startup
+and is idempotent, so adding an IndexModel to MONGO_INDEXES is all it takes to
+roll a new index out.
+
+sync_metadata needs no entry: it is only ever read and written by _id, which
+MongoDB always indexes.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('mongodb_indexes', 'mongodb_indexes.log')
+
+# Set on parsed_content documents when they are first synced and removed by the
+# tagger. The partial index below only contains flagged documents, so finding
+# untagged content reads a handful of index entries rather than the collection.
+NEEDS_TAGGING_FIELD = 'needs_tagging'
+UNTAGGED_FILTER = {NEEDS_TAGGING_FIELD: True}
+
+MONGO_INDEXES: Dict[str, List[IndexModel]] = {
+    'parsed_content': [
+        IndexModel(
+            [(NEEDS_TAGGING_FIELD, ASCENDING)],
+            name='idx_parsed_content_needs_tagging',
+            partialFilterExpression=UNTAGGED_FILTER,
+        ),
+    ],
+    'entity_counters': [
+        IndexModel(
+            [('label', ASCENDING), ('day', ASCENDING)],
+            name='idx_entity_counters_label_day',
+        ),
+        IndexModel(
+            [('day', ASCENDING)],
+            name='idx_entity_counters_day',
+        ),
+    ],
+}
+
+TAG_FIELDS = ['content', 'description', 'summary', 'title']
+NEEDS_TAGGING_BACKFILL_KEY = 'needs_tagging_backfill'
+
+
+def ensure_mongo_indexes(mongo_db) -> Dict[str, List[str]]:
+    """
+    Create every declared index that does not exist yet.
+
+    Args:
+        mongo_db: The MongoDB database to provision.
+
+    Returns:
+        Dict[str, List[str]]: The index names ensured per collection.
+    """
+    ensured = {}
+    for collection_name, indexes in MONGO_INDEXES.items():
+        try:
+            ensured[collection_name] = mongo_db[collection_name].create_indexes(indexes)
+            logger.info(f"Ensured indexes on {collection_name}: {ensured[collection_name]}")
+        except PyMongoError as e:
+            logger.error(f"Failed to ensure indexes on {collection_name}: {str(e)}")
+    return ensured
+
+
+def backfill_needs_tagging(mongo_db) -> int:
+    """
+    Flag documents synced before the needs_tagging marker existed.
+
+    Runs once per database; completion is recorded in sync_metadata so later
+    startups skip the collection scan.
+
+    Returns:
+        int: The number of documents flagged.
+    """
+    sync_meta_collection = mongo_db['sync_metadata']
+    if sync_meta_collection.find_one({'_id': NEEDS_TAGGING_BACKFILL_KEY}):
+        return 0
+
+    result = mongo_db['parsed_content'].update_many(
+        {"$or": [{f"{field}_tags": {"$exists": False}} for field in TAG_FIELDS]},
+        {'$set': UNTAGGED_FILTER}
+    )
+    sync_meta_collection.update_one(
+        {'_id': NEEDS_TAGGING_BACKFILL_KEY},
+        {'$set': {'flagged': result.modified_count}},
+        upsert=True
+    )
+    logger.info(f"Flagged {result.modified_count} previously synced documents for tagging")
+    return result.modified_count
@@ -0,0 +1,137 @@
+"""
+Near-duplicate detection for syndicated articles.
+
+Each article gets a MinHash signature over word shingles of its RSS title and
+description, so it can be fingerprinted before the full text is fetched. The
+signature is split into bands that are stored in the lsh_buckets table; any
+article sharing a band with an earlier one is a candidate, and candidates
+whose estimated Jaccard similarity clears DUPLICATE_THRESHOLD are treated as
+the same story. A lookup is one indexed query over a fixed number of band
+keys, no matter how many articles have been fingerprinted.
+
+Only the first article of each cluster is written to the LSH buckets, so
+heavily syndicated stories do not grow the candidate lists.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import List, Optional, Set
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.relational.content_fingerprint import ContentFingerprint, LSHBucket
+from app.models.relational.parsed_content import ParsedContent
+
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows put the LSH threshold near a Jaccard similarity of 0.7.
+NUM_BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // NUM_BANDS
+SHINGLE_WORDS = 3
+# Titles and teasers shorter than this are too generic to fingerprint reliably.
+MIN_SHINGLES = 8
+DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_WORDS) -> Set[int]:
+    """Hash the word n-grams of text, ignoring markup and case, to 32-bit integers."""
+    words = _WORD_RE.findall(_TAG_RE.sub(' ', text).lower())
+    return {
+        int.from_bytes(hashlib.blake2b(' '.join(words[i:i + size]).encode(), digest_size=4).digest(), 'little')
+        for i in range(max(len(words) - size + 1, 0))
+    }
+
+
+def minhash_signature(text: str) -> Optional[np.ndarray]:
+    """Return the MinHash signature of text, or None if it has too few shingles."""
+    hashes = shingle_hashes(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    # Universal hashing h(x) = (a*x + b) mod p for every permutation at once.
+    permuted = (np.outer(values, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> List[str]:
+    """Hash each band of a signature into an 'NN:hex' bucket key."""
+    return [
+        f"{band:02d}:" + hashlib.blake2b(
+            signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes(), digest_size=8
+        ).hexdigest()
+        for band in range(NUM_BANDS)
+    ]
+
+
+def estimate_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two shingle sets from their signatures."""
+    return float(np.count_nonzero(signature == other)) / NUM_PERMUTATIONS
+
+
+def find_near_duplicate(session: Session, signature: np.ndarray) -> Optional[ParsedContent]:
+    """
+    Return the earliest article of the cluster most similar to signature, if any.
+
+    Args:
+        session: The SQLAlchemy session.
+        signature: MinHash signature from minhash_signature().
+
+    Returns:
+        The canonical ParsedContent of the matching cluster, or None when no
+        candidate reaches DUPLICATE_THRESHOLD.
+    """
+    candidates = (
+        session.query(ContentFingerprint)
+        .join(LSHBucket, LSHBucket.parsed_content_id == ContentFingerprint.parsed_content_id)
+        .filter(LSHBucket.band_key.in_(band_keys(signature)))
+        .distinct()
+        .all()
+    )
+    best, best_similarity = None, DUPLICATE_THRESHOLD
+    for candidate in candidates:
+        similarity = estimate_similarity(signature, np.frombuffer(candidate.signature, dtype=np.uint32))
+        if similarity >= best_similarity:
+            best, best_similarity = candidate, similarity
+    if best is None:
+        return None
+    return session.get(ParsedContent, best.cluster_id)
+
+
+def record_fingerprint(session: Session, parsed_content_id: UUID, signature: np.ndarray,
+                       cluster_id: Optional[UUID] = None) -> ContentFingerprint:
+    """
+    Store an article's fingerprint, indexing its bands if it starts a new cluster.
+
+    Args:
+        session: The SQLAlchemy session; the caller commits.
+        parsed_content_id: Id of the fingerprinted article.
+        signature: MinHash signature from minhash_signature().
+        cluster_id: Id of the canonical article this one duplicates, if any.
+    """
+    fingerprint = ContentFingerprint(
+        parsed_content_id=parsed_content_id,
+        cluster_id=cluster_id or parsed_content_id,
+        signature=signature.tobytes(),
+    )
+    session.add(fingerprint)
+    if not fingerprint.is_duplicate:
+        session.add_all(LSHBucket(band_key=key, parsed_content_id=parsed_content_id) for key in band_keys(signature))
+    return fingerprint
+
+
+def cluster_id_of(session: Session, parsed_content_id: UUID) -> UUID:
+    """Return the cluster an article belongs to; unfingerprinted articles are their own cluster."""
+    fingerprint = session.get(ContentFingerprint, parsed_content_id)
+    return fingerprint.cluster_id if fingerprint else parsed_content_id
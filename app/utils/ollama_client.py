@@ -5,6 +5,7 @@ import asyncio
 from dotenv import load_dotenv
 from langchain_community.llms import Ollama
 from app.utils.logging_config import setup_logger
+from app.utils.llm_cache import cached_generation
 from functools import partial
 
 # Create a separate logger for Ollama API
@@ -44,15 +45,16 @@ class OllamaAPI:
         return self.prompts
 
     async def generate(self, prompt_type: str, article: str) -> str:
-        """Generate a response based on the prompt type and article."""
+        """Generate a response based on the prompt type and article, reusing cached answers."""
         try:
             prompts = self.load_prompts()
             prompt_data = prompts.get(prompt_type, {})
             system_prompt = prompt_data.get("system_prompt", "")
             full_prompt = f"Human: {system_prompt}\n\n Article: {article}"
 
-            output = await asyncio.get_event_loop().run_in_executor(
-                None, partial(self.llm.invoke, full_prompt)
+            output = await cached_generation(
+                prompt_type, prompt_data, self.model, article,
+                lambda: asyncio.get_event_loop().run_in_executor(None, partial(self.llm.invoke, full_prompt)),
             )
 
             if current_app.debug:
@@ -0,0 +1,165 @@
+"""
+Keyset (seek) pagination for ParsedContent listings.
+
+Pages are ordered by (pub_date DESC, id DESC) and addressed by opaque cursors
+that encode the boundary row, so fetching any page is an index range scan on
+idx_parsed_content_pub_date_id no matter how deep the reader has paged.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+
+from app.models.relational.parsed_content import ParsedContent
+
+
+@dataclass
+class KeysetPage:
+    """One page of keyset-paginated results."""
+
+    items: List[Any]
+    per_page: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        return self.prev_cursor is not None
+
+
+@dataclass
+class OffsetPage:
+    """One page of offset-paginated results, for orderings without a seek key."""
+
+    items: List[Any]
+    per_page: int
+    page: int = 1
+    total: int = 0
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page * self.per_page < self.total
+
+    @property
+    def prev_num(self) -> Optional[int]:
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self) -> Optional[int]:
+        return self.page + 1 if self.has_next else None
+
+
+def offset_paginate(query, page: int, per_page: int, total: int) -> OffsetPage:
+    """Fetch one page of an already ordered query using LIMIT/OFFSET."""
+    page = max(page, 1)
+    items = query.limit(per_page).offset((page - 1) * per_page).all()
+    return OffsetPage(items=items, per_page=per_page, page=page, total=total)
+
+
+def encode_cursor(item: ParsedContent) -> str:
+    """Encode the (pub_date, id) position of an item as an opaque URL-safe cursor."""
+    payload = json.dumps([item.pub_date.isoformat(), item.id.hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        pub_date, content_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(pub_date), UUID(content_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+
+def after_cursor_clause(cursor: str):
+    """
+    Filter for the rows that follow a cursor in (pub_date DESC, id DESC) order.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    pub_date, content_id = decode_cursor(cursor)
+    return or_(
+        ParsedContent.pub_date < pub_date,
+        and_(ParsedContent.pub_date == pub_date, ParsedContent.id < content_id),
+    )
+
+
+def before_cursor_clause(cursor: str):
+    """
+    Filter for the rows that precede a cursor in (pub_date DESC, id DESC) order.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    pub_date, content_id = decode_cursor(cursor)
+    return or_(
+        ParsedContent.pub_date > pub_date,
+        and_(ParsedContent.pub_date == pub_date, ParsedContent.id > content_id),
+    )
+
+
+def keyset_paginate(query, per_page: int, after: Optional[str] = None,
+                    before: Optional[str] = None) -> KeysetPage:
+    """
+    Fetch one page of a ParsedContent query ordered newest first.
+
+    Args:
+        query: An unordered ParsedContent query with all filters applied.
+        per_page: The page size.
+        after: Cursor of the last item on the previous page; returns the items that follow it.
+        before: Cursor of the first item on the next page; returns the items that precede it.
+
+    Returns:
+        KeysetPage: The page items and cursors for the neighbouring pages.
+
+    Raises:
+        ValueError: If a cursor is malformed.
+    """
+    if before:
+        rows = (
+            query.filter(before_cursor_clause(before))
+            .order_by(ParsedContent.pub_date.asc(), ParsedContent.id.asc())
+            .limit(per_page + 1)
+            .all()
+        )
+        items = list(reversed(rows[:per_page]))
+        has_prev, has_next = len(rows) > per_page, True
+    else:
+        if after:
+            query = query.filter(after_cursor_clause(after))
+        rows = (
+            query.order_by(ParsedContent.pub_date.desc(), ParsedContent.id.desc())
+            .limit(per_page + 1)
+            .all()
+        )
+        items = rows[:per_page]
+        has_prev, has_next = after is not None, len(rows) > per_page
+
+    return KeysetPage(
+        items=items,
+        per_page=per_page,
+        next_cursor=encode_cursor(items[-1]) if has_next and items else None,
+        prev_cursor=encode_cursor(items[0]) if has_prev and items else None,
+    )
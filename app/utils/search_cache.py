@@ -0,0 +1,103 @@
+"""
+Caches for search results and hit counts.
+
+Both caches are short-lived TTL caches keyed on normalized search parameters.
+They are cleared whenever a transaction that inserted or deleted ParsedContent
+commits, so a cached search never hides newly ingested articles for longer
+than it takes the ingesting session to commit.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.relational.parsed_content import ParsedContent
+
+SEARCH_RESULT_TTL = 300
+SEARCH_COUNT_TTL = 60
+
+_MISSING = object()
+_STALE_FLAG = 'search_cache_stale'
+
+
+class SearchCache:
+    """A thread-safe TTL cache that keeps hit and miss counters."""
+
+    def __init__(self, name: str, maxsize: int, ttl: int) -> None:
+        self.name = name
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        with self._lock:
+            value = self._cache.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._cache[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self._cache),
+                'ttl': self.ttl,
+                'invalidations': self.invalidations,
+            }
+
+
+result_cache = SearchCache('search_results', maxsize=512, ttl=SEARCH_RESULT_TTL)
+count_cache = SearchCache('search_counts', maxsize=1024, ttl=SEARCH_COUNT_TTL)
+_caches: List[SearchCache] = [result_cache, count_cache]
+
+
+def invalidate_search_caches() -> None:
+    """Drop every cached search result and count."""
+    for cache in _caches:
+        cache.clear()
+
+
+def search_cache_stats() -> List[Dict[str, Any]]:
+    """Return hit-rate statistics for every search cache."""
+    return [cache.stats() for cache in _caches]
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_parsed_content_changes(session, flush_context):
+    if any(isinstance(obj, ParsedContent) for obj in list(session.new) + list(session.deleted)):
+        session.info[_STALE_FLAG] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(_STALE_FLAG, False):
+        invalidate_search_caches()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_STALE_FLAG, None)
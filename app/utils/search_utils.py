@@ -1,9 +1,17 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
-from sqlalchemy import or_
-from app.models.relational import ParsedContent, db
+from sqlalchemy import String, cast, distinct, func, literal, null, or_, select, union_all
+from sqlalchemy.orm import undefer_group
 import bleach
+from app.models.relational import Category, ContentTag, ParsedContent, RSSFeed, db
+from app.models.relational.parsed_content import parsed_content_categories
+from app.utils import full_text_search
+from app.utils.compressed_text import sql_text
+from app.utils.pagination import keyset_paginate, offset_paginate
+from app.utils.search_cache import count_cache, result_cache
+from dataclasses import replace
+from flask import current_app
 
 @dataclass
 class SearchParams:
@@ -34,15 +42,16 @@ def get_search_params(form):
         ),
     )
 
-def build_search_query(search_params: SearchParams):
+def build_search_query(search_params: SearchParams, order_by_relevance: bool = False):
     query = db.session.query(ParsedContent)
 
-    query = query.filter(
-        or_(
-            ParsedContent.title.ilike(f"%{bleach.clean(search_params.query)}%"),
-            ParsedContent.content.ilike(f"%{bleach.clean(search_params.query)}%"),
-        )
-    )
+    match_text = search_match_text(search_params)
+    if match_text:
+        query, rank = full_text_search.apply_match(query, match_text)
+        if order_by_relevance:
+            query = query.order_by(rank)
+    else:
+        query = _apply_ilike_filters(query, search_params)
 
     if search_params.start_date:
         query = query.filter(ParsedContent.created_at >= search_params.start_date)
@@ -57,27 +66,164 @@ def build_search_query(search_params: SearchParams):
             )
         )
 
+    return query
+
+def search_match_text(search_params: SearchParams) -> str:
+    """Return the full-text query for the search, or '' when the index can't serve it."""
+    if not full_text_search.is_enabled():
+        return ""
+    return full_text_search.build_match_text(search_params.query, search_params.keywords)
+
+def _apply_ilike_filters(query, search_params: SearchParams):
+    """Substring-match the query and keywords; used when no full-text index is available."""
+    content = sql_text(ParsedContent.content, db.engine.dialect.name)
+    query = query.filter(
+        or_(
+            ParsedContent.title.ilike(f"%{bleach.clean(search_params.query)}%"),
+            content.ilike(f"%{bleach.clean(search_params.query)}%"),
+        )
+    )
+
     if search_params.keywords:
         for keyword in search_params.keywords:
             query = query.filter(
                 or_(
                     ParsedContent.title.ilike(f"%{bleach.clean(keyword)}%"),
-                    ParsedContent.content.ilike(f"%{bleach.clean(keyword)}%"),
+                    content.ilike(f"%{bleach.clean(keyword)}%"),
                 )
             )
 
     return query
 
-def perform_search(search_params: SearchParams, page: int = 1, per_page: int = 10, order_by=None):
-    query = build_search_query(search_params)
+def normalize_search_params(search_params: SearchParams) -> tuple:
+    """Return a hashable key that is equal for searches matching the same rows."""
+    return (
+        " ".join((search_params.query or "").lower().split()),
+        str(search_params.start_date or ""),
+        str(search_params.end_date or ""),
+        tuple(sorted(search_params.source_types or [])),
+        tuple(sorted({k.strip().lower() for k in search_params.keywords or [] if k.strip()})),
+    )
+
+def count_search_results(search_params: SearchParams) -> int:
+    """Count matching rows, reusing counts cached for the same normalized search."""
+    return count_cache.get_or_compute(
+        normalize_search_params(search_params),
+        lambda: build_search_query(search_params).order_by(None).count(),
+    )
 
-    if order_by is not None:
-        query = query.order_by(order_by)
+def perform_search(search_params: SearchParams, page: int = 1, per_page: int = 10,
+                   after: Optional[str] = None, before: Optional[str] = None,
+                   order_by_relevance: bool = False):
+    """
+    Run a search and return one page of results with the total hit count.
 
+    Results are newest first and paged with keyset cursors (after/before), so
+    deep pages cost the same as the first one. Relevance-ordered searches have
+    no stable key to seek on and use offset pagination through page instead.
+
+    Pages are cached by normalized parameters and position as lists of ids; a
+    cache hit only loads those rows by primary key.
+    """
     try:
-        paginated_results = query.paginate(page=page, per_page=per_page, error_out=False)
-        total_results = query.count()
-        return paginated_results, total_results
+        key = normalize_search_params(search_params) + (order_by_relevance, page, per_page, after, before)
+        cached_page, snippets, total_results = result_cache.get_or_compute(
+            key,
+            lambda: _search_page(search_params, page, per_page, after, before, order_by_relevance),
+        )
+        results = replace(cached_page, items=_load_items(cached_page.items))
+        for item in results.items:
+            item.search_snippet = snippets.get(item.id)
+        return results, total_results
     except Exception as e:
-        # Log the error here
+        current_app.logger.error(f"Error performing search: {str(e)}")
         return None, 0
+
+def _search_page(search_params: SearchParams, page: int, per_page: int,
+                 after: Optional[str], before: Optional[str], order_by_relevance: bool):
+    """Execute a search and return (page of ids, snippets by id, total hits) for caching."""
+    total_results = count_search_results(search_params)
+    if order_by_relevance:
+        query = build_search_query(search_params, order_by_relevance=True)
+        results = offset_paginate(query, page, per_page, total_results)
+    else:
+        try:
+            results = keyset_paginate(build_search_query(search_params), per_page, after=after, before=before)
+        except ValueError:
+            # Stale or tampered cursor: start again from the first page
+            results = keyset_paginate(build_search_query(search_params), per_page)
+
+    content_ids = [item.id for item in results.items]
+    snippets = full_text_search.snippets(content_ids, search_match_text(search_params))
+    return replace(results, items=content_ids), snippets, total_results
+
+def _load_items(content_ids):
+    """Load ParsedContent rows by id, preserving the given order and skipping deleted rows."""
+    if not content_ids:
+        return []
+    # Result rows show the summary; the body is only read when a row has none.
+    query = ParsedContent.query.options(undefer_group('summary')).filter(ParsedContent.id.in_(content_ids))
+    rows = {row.id: row for row in query}
+    return [rows[content_id] for content_id in content_ids if content_id in rows]
+
+FACET_LIMIT = 10
+
+def compute_search_facets(search_params: SearchParams, limit: int = FACET_LIMIT) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Count search hits by feed, category, tagged entity and publication day.
+
+    The hit set is defined once as a CTE over the full-text index and every
+    facet is aggregated from it in a single UNION ALL statement, so faceting
+    costs one extra round trip rather than one scan per facet.
+    """
+    return result_cache.get_or_compute(
+        normalize_search_params(search_params) + ('facets', limit),
+        lambda: _compute_search_facets(search_params, limit),
+    )
+
+def _compute_search_facets(search_params: SearchParams, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+    hits = (
+        build_search_query(search_params)
+        .order_by(None)
+        .with_entities(ParsedContent.id.label('id'), ParsedContent.feed_id.label('feed_id'),
+                       ParsedContent.pub_date.label('pub_date'))
+        .cte('search_hits')
+    )
+    # Tags hold one row per mention, so count distinct hits rather than joined rows
+    hit_count = func.count(distinct(hits.c.id)).label('hit_count')
+
+    def facet(name, value, detail, *joins, top=True):
+        statement = select(literal(name, String).label('facet'), cast(value, String).label('value'),
+                           (detail if detail is not None else cast(null(), String)).label('detail'),
+                           hit_count).select_from(hits)
+        for target, onclause in joins:
+            statement = statement.join(target, onclause)
+        statement = statement.group_by(value) if detail is None else statement.group_by(value, detail)
+        if top:
+            statement = statement.order_by(hit_count.desc()).limit(limit)
+        subquery = statement.subquery()
+        return select(subquery.c.facet, subquery.c.value, subquery.c.detail, subquery.c.hit_count)
+
+    pub_day = cast(func.date(hits.c.pub_date), String)
+    statement = union_all(
+        facet('feeds', RSSFeed.title, None,
+              (RSSFeed, RSSFeed.id == hits.c.feed_id)),
+        facet('categories', Category.name, None,
+              (parsed_content_categories, parsed_content_categories.c.parsed_content_id == hits.c.id),
+              (Category, Category.id == parsed_content_categories.c.category_id)),
+        facet('entities', ContentTag.entity_name, ContentTag.entity_type,
+              (ContentTag, ContentTag.parsed_content_id == hits.c.id)),
+        facet('pub_dates', pub_day, None, top=False),
+    )
+
+    facets: Dict[str, List[Dict[str, Any]]] = {'feeds': [], 'categories': [], 'entities': [], 'pub_dates': []}
+    for name, value, detail, count in db.session.execute(statement):
+        bucket = {'value': value, 'count': count}
+        if name == 'entities':
+            bucket['type'] = detail
+        facets[name].append(bucket)
+
+    for name in ('feeds', 'categories', 'entities'):
+        facets[name].sort(key=lambda bucket: bucket['count'], reverse=True)
+    facets['pub_dates'].sort(key=lambda bucket: bucket['value'] or '')
+    return facets
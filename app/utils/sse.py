@@ -0,0 +1,55 @@
+"""
+Helpers for Server-Sent-Events responses.
+
+Flask streams responses from plain generators after the view has returned,
+so LLM token streams, which are async generators, are driven by
+iterate_async on an event loop of their own in the response thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Iterator, TypeVar
+
+from flask import Response, stream_with_context
+
+T = TypeVar('T')
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one event; data is sent as JSON."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events: Iterator[str]) -> Response:
+    """Stream events as a text/event-stream response, keeping the request context."""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        # Stop proxies such as nginx from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+def iterate_async(agen: AsyncIterator[T]) -> Iterator[T]:
+    """
+    Iterate an async generator from synchronous code.
+
+    Closing the returned generator, as Flask does when the client disconnects,
+    closes the async generator too, which cancels the LLM request behind it.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        try:
+            loop.run_until_complete(agen.aclose())
+            # Finalize the generators it was iterating, such as the HTTP stream
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
@@ -0,0 +1,90 @@
+"""
+Token-aware splitting of long articles for map-reduce summarization.
+
+Lengths are measured with tiktoken's cl100k_base encoding, which tracks the
+Llama tokenizers closely enough to size prompts for the Ollama context
+window. When the encoding cannot be loaded (it is downloaded on first use),
+lengths fall back to an estimate of CHARS_PER_TOKEN characters per token.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, List, Optional
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('text_chunker', 'text_chunker.log')
+
+ENCODING_NAME = 'cl100k_base'
+CHARS_PER_TOKEN = 4
+# Articles up to this many tokens are summarized in one prompt; with the system
+# prompt and the JSON answer this stays inside the model's 8200-token context.
+SINGLE_PASS_MAX_TOKENS = 5000
+CHUNK_TOKENS = 2500
+CHUNK_OVERLAP_TOKENS = 150
+# At most this many chunks are summarized per article, which bounds the
+# number of LLM calls and so the latency of very long reports.
+MAX_CHUNKS = 8
+
+_length_function: Optional[Callable[[str], int]] = None
+_length_lock = threading.Lock()
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _get_length_function() -> Callable[[str], int]:
+    global _length_function
+    with _length_lock:
+        if _length_function is None:
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding(ENCODING_NAME)
+                _length_function = lambda text: len(encoding.encode(text, disallowed_special=()))
+            except Exception as e:
+                logger.warning(f"Could not load the {ENCODING_NAME} encoding, estimating token counts: {str(e)}")
+                _length_function = _estimate_tokens
+        return _length_function
+
+
+def count_tokens(text: str) -> int:
+    """Return the (approximate) number of tokens in text."""
+    return _get_length_function()(text)
+
+
+def select_evenly(chunks: List[str], limit: int) -> List[str]:
+    """Keep at most limit chunks spread evenly over the text, always keeping the first and last."""
+    if len(chunks) <= limit:
+        return chunks
+    if limit == 1:
+        return chunks[:1]
+    step = (len(chunks) - 1) / (limit - 1)
+    return [chunks[round(i * step)] for i in range(limit)]
+
+
+def split_for_summary(text: str, max_chunks: int = MAX_CHUNKS) -> List[str]:
+    """
+    Split text into chunks that each fit one summarization prompt.
+
+    Returns:
+        List[str]: [text] when it fits a single prompt; otherwise up to
+        max_chunks overlapping chunks of about CHUNK_TOKENS tokens, split on
+        paragraph, line and sentence boundaries where possible.
+    """
+    length_function = _get_length_function()
+    if length_function(text) <= SINGLE_PASS_MAX_TOKENS:
+        return [text]
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_TOKENS,
+        chunk_overlap=CHUNK_OVERLAP_TOKENS,
+        length_function=length_function,
+        separators=["\n\n", "\n", ". ", " ", ""],
+    )
+    chunks = splitter.split_text(text)
+    if len(chunks) > max_chunks:
+        logger.info(f"Summarizing {max_chunks} of {len(chunks)} chunks of a {length_function(text)}-token article")
+    return select_evenly(chunks, max_chunks)
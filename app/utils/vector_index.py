@@ -0,0 +1,225 @@
+"""
+File-backed vector index of ParsedContent embeddings for "related articles".
+
+Embeddings are the mean of the spaCy en_core_web_lg word vectors already
+loaded by the auto tagger, so no extra model or external service is needed.
+Vectors are L2-normalised and stored in a memory-mapped float32 matrix next
+to a matching matrix of raw UUID bytes under <instance>/vector_index/; a
+nearest-neighbour query is a single matrix-vector product over that matrix.
+
+The index is process-local: the web app and the scheduler share one instance,
+and the backfill command should be run while the app is stopped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.utils.logging_config import setup_logger
+
+logger = setup_logger('vector_index', 'vector_index.log')
+
+INDEX_DIRNAME = 'vector_index'
+EMBEDDING_MODEL = 'en_core_web_lg'
+EMBEDDING_DIM = 300
+# Only the opening of long articles is embedded; it carries the topic.
+EMBED_MAX_CHARS = 4000
+INITIAL_CAPACITY = 1024
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 50
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    Embed text as the normalised mean of its content-word vectors.
+
+    Only the tokenizer runs, so embedding costs a vocabulary lookup per token
+    rather than a full pipeline pass. Returns a zero vector when no token has
+    a vector.
+    """
+    from app.utils.auto_tagger import nlp
+
+    doc = nlp.make_doc(text[:EMBED_MAX_CHARS])
+    vectors = [token.vector for token in doc if token.has_vector and not (token.is_stop or token.is_punct)]
+    if not vectors:
+        return np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vector = np.mean(vectors, axis=0).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def content_text(title: Optional[str], description: Optional[str], content: Optional[str]) -> str:
+    """Build the text embedded for an article: title, description, then body."""
+    return '\n'.join(part for part in (title, description, content) if part)
+
+
+class VectorIndex:
+    """An append-mostly matrix of unit vectors keyed by ParsedContent id."""
+
+    def __init__(self, path: str, dim: int = EMBEDDING_DIM) -> None:
+        self.path = path
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._positions: Dict[UUID, int] = {}
+        self._count = 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, 'meta.json')
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, 'vectors.f32')
+
+    @property
+    def _ids_path(self) -> str:
+        return os.path.join(self.path, 'ids.bin')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, content_id: UUID) -> bool:
+        return content_id in self._positions
+
+    def _load(self) -> None:
+        meta = {}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+        if meta.get('dim') != self.dim or meta.get('model') != EMBEDDING_MODEL:
+            if meta:
+                logger.warning(f"Discarding vector index built with {meta.get('model')}/{meta.get('dim')}")
+            self._open(INITIAL_CAPACITY, mode='w+')
+            self._count = 0
+            self._write_meta()
+            return
+
+        self._open(meta['capacity'], mode='r+')
+        self._count = meta['count']
+        for position in range(self._count):
+            self._positions[UUID(bytes=self._ids[position].tobytes())] = position
+        logger.info(f"Loaded vector index with {self._count} vectors from {self.path}")
+
+    def _open(self, capacity: int, mode: str) -> None:
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+        self._ids = np.memmap(self._ids_path, dtype=np.uint8, mode=mode, shape=(capacity, 16))
+        self._capacity = capacity
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._vectors.flush()
+        self._ids.flush()
+        # Extending the files in place keeps existing rows where they are.
+        for file_path, row_bytes in ((self._vectors_path, self.dim * 4), (self._ids_path, 16)):
+            with open(file_path, 'r+b') as f:
+                f.truncate(capacity * row_bytes)
+        self._open(capacity, mode='r+')
+
+    def _write_meta(self) -> None:
+        meta = {'model': EMBEDDING_MODEL, 'dim': self.dim, 'count': self._count, 'capacity': self._capacity}
+        tmp_path = self._meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def add(self, items: Iterable[Tuple[UUID, np.ndarray]]) -> int:
+        """Insert or replace vectors and persist them. Returns the number written."""
+        written = 0
+        with self._lock:
+            for content_id, vector in items:
+                position = self._positions.get(content_id)
+                if position is None:
+                    if self._count >= self._capacity:
+                        self._grow(self._count + 1)
+                    position = self._count
+                    self._count += 1
+                    self._positions[content_id] = position
+                    self._ids[position] = np.frombuffer(content_id.bytes, dtype=np.uint8)
+                self._vectors[position] = vector
+                written += 1
+            if written:
+                self._vectors.flush()
+                self._ids.flush()
+                self._write_meta()
+        return written
+
+    def vector(self, content_id: UUID) -> Optional[np.ndarray]:
+        position = self._positions.get(content_id)
+        return None if position is None else np.array(self._vectors[position])
+
+    def search(self, vector: np.ndarray, k: int, exclude: Sequence[UUID] = ()) -> List[Tuple[UUID, float]]:
+        """Return up to k (id, cosine similarity) pairs, most similar first."""
+        with self._lock:
+            if not self._count:
+                return []
+            scores = np.asarray(self._vectors[:self._count]) @ vector
+            for content_id in exclude:
+                position = self._positions.get(content_id)
+                if position is not None:
+                    scores[position] = -np.inf
+            k = min(k, self._count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (UUID(bytes=self._ids[position].tobytes()), float(scores[position]))
+                for position in top
+                if np.isfinite(scores[position])
+            ]
+
+    def reset(self) -> None:
+        """Drop every vector, e.g. before a full rebuild."""
+        with self._lock:
+            self._positions.clear()
+            self._count = 0
+            self._open(INITIAL_CAPACITY, mode='w+')
+            self._write_meta()
+
+
+_indexes: Dict[str, VectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    """Return the vector index of the current app, opening it on first use."""
+    from flask import current_app
+
+    path = os.path.join(current_app.instance_path, INDEX_DIRNAME)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = VectorIndex(path)
+        return _indexes[path]
+
+
+def index_content(items: Iterable) -> int:
+    """Embed ParsedContent-like rows (id, title, description, content) and add them."""
+    return get_vector_index().add(
+        (item.id, embed_text(content_text(item.title, item.description, item.content)))
+        for item in items
+    )
+
+
+def similar_content_ids(item, k: int = DEFAULT_TOP_K) -> List[Tuple[UUID, float]]:
+    """
+    Find the k nearest neighbours of a ParsedContent row.
+
+    Rows that are not indexed yet are embedded and added on the fly.
+    """
+    index = get_vector_index()
+    vector = index.vector(item.id)
+    if vector is None:
+        vector = embed_text(content_text(item.title, item.description, item.content))
+        index.add([(item.id, vector)])
+    return index.search(vector, k, exclude=[item.id])
@@ -10,6 +10,12 @@ class Config:
     RSS_CHECK_INTERVAL = int(os.getenv('RSS_CHECK_INTERVAL', 30))
     SUMMARY_CHECK_INTERVAL = int(os.getenv('SUMMARY_CHECK_INTERVAL', 60))
     SUMMARY_API_CHOICE = os.getenv('SUMMARY_API_CHOICE', 'groq')
+    # Summaries generated at once; match the Ollama server's parallel request slots
+    SUMMARY_CONCURRENCY = int(os.getenv('OLLAMA_NUM_PARALLEL', 1))
+    # Articles without a summary queued per backlog run
+    SUMMARY_BACKLOG_BATCH = int(os.getenv('SUMMARY_BACKLOG_BATCH', 200))
+    # Disk space for cached LLM responses; 0 disables the cache
+    LLM_CACHE_SIZE_LIMIT = int(os.getenv('LLM_CACHE_SIZE_MB', 256)) * 1024 * 1024
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', '5000'))
     ELEVEN_API_KEY = os.getenv('ELEVEN_API_KEY')
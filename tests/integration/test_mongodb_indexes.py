@@ -0,0 +1,102 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+
+pymongo = pytest.importorskip('pymongo')
+from pymongo.errors import PyMongoError
+
+from app.utils.mongodb_indexes import (
+    MONGO_INDEXES,
+    UNTAGGED_FILTER,
+    backfill_needs_tagging,
+    ensure_mongo_indexes,
+)
+
+@pytest.fixture
+def mongo_db():
+    """A throwaway database on the local mongod (override with MONGODB_TEST_URI)."""
+    uri = os.getenv('MONGODB_TEST_URI', 'mongodb://localhost:27017')
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"No MongoDB server reachable at {uri}")
+
+    db = client['ironmonkey_index_test']
+    client.drop_database(db.name)
+    yield db
+    client.drop_database(db.name)
+    client.close()
+
+def _index_names(plan):
+    """Collect the names of all indexes scanned anywhere in an explain plan."""
+    names = set()
+    if isinstance(plan, dict):
+        if 'indexName' in plan:
+            names.add(plan['indexName'])
+        for value in plan.values():
+            names |= _index_names(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            names |= _index_names(value)
+    return names
+
+def _winning_plan(explain):
+    return explain['queryPlanner']['winningPlan']
+
+def test_ensure_mongo_indexes_is_idempotent(mongo_db):
+    ensure_mongo_indexes(mongo_db)
+    ensure_mongo_indexes(mongo_db)
+
+    for collection_name, indexes in MONGO_INDEXES.items():
+        existing = mongo_db[collection_name].index_information()
+        for index in indexes:
+            assert index.document['name'] in existing
+
+def test_untagged_query_uses_partial_index(mongo_db):
+    ensure_mongo_indexes(mongo_db)
+    collection = mongo_db['parsed_content']
+    collection.insert_many([
+        {'_id': f'tagged-{i}', 'title': 'Tagged', 'content_tags': []} for i in range(200)
+    ])
+    collection.insert_many([
+        {'_id': f'untagged-{i}', 'title': 'Untagged', **UNTAGGED_FILTER} for i in range(5)
+    ])
+
+    explain = collection.find(UNTAGGED_FILTER).explain()
+
+    assert 'idx_parsed_content_needs_tagging' in _index_names(_winning_plan(explain))
+    assert collection.count_documents(UNTAGGED_FILTER) == 5
+
+def test_backfill_flags_legacy_documents_once(mongo_db):
+    collection = mongo_db['parsed_content']
+    collection.insert_one({'_id': 'legacy', 'title': 'Legacy'})
+    collection.insert_one({
+        '_id': 'done', 'title': 'Done',
+        'content_tags': [], 'description_tags': [], 'summary_tags': [], 'title_tags': []
+    })
+
+    assert backfill_needs_tagging(mongo_db) == 1
+    assert backfill_needs_tagging(mongo_db) == 0
+    assert [doc['_id'] for doc in collection.find(UNTAGGED_FILTER)] == ['legacy']
+
+def test_entity_counter_window_query_uses_index(mongo_db):
+    ensure_mongo_indexes(mongo_db)
+    collection = mongo_db['entity_counters']
+    collection.insert_many([
+        {'_id': f'2024-01-{day:02d}|GROUP_NAME|APT{day}', 'day': f'2024-01-{day:02d}',
+         'label': 'GROUP_NAME', 'text': f'APT{day}', 'count': day}
+        for day in range(1, 29)
+    ])
+
+    explain = collection.find({
+        'label': 'GROUP_NAME',
+        'day': {'$gte': '2024-01-10', '$lte': '2024-01-20'},
+    }).explain()
+
+    assert _index_names(_winning_plan(explain)) & {
+        'idx_entity_counters_label_day', 'idx_entity_counters_day'
+    }
@@ -0,0 +1,100 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import uuid
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from app.models.relational import db, ParsedContent, RSSFeed
+from app.models.relational.job_checkpoint import JobCheckpoint
+from app.models.relational.parsed_content import COMPRESS_JOB_NAME
+from app.utils.compressed_text import MAGIC, MIN_COMPRESS_BYTES, compress_text, decompress_text
+
+LONG_TEXT = 'Indicators of compromise: 203.0.113.7, evil.example, é ' * 20
+SUMMARY = {'summary': 'LockBit ' * 50, 'threat_actors': ['LockBit']}
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _article(content, summary=None):
+    feed = db.session.query(RSSFeed).one()
+    article = ParsedContent(id=uuid.uuid4(), title='Article', url=f'https://news.example/{uuid.uuid4().hex}',
+                            content=content, summary=summary, feed_id=feed.id, pub_date=datetime(2024, 1, 2, 9))
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+def _stored_types(article):
+    return tuple(db.session.execute(
+        text('SELECT typeof(content), typeof(summary) FROM parsed_content WHERE id = :id'), {'id': article.id.hex}
+    ).one())
+
+def _read_back(article):
+    db.session.expire_all()
+    stored = db.session.get(ParsedContent, article.id)
+    return stored.content, stored.summary
+
+def test_compress_text_round_trip():
+    compressed = compress_text(LONG_TEXT)
+    assert isinstance(compressed, bytes) and compressed.startswith(MAGIC)
+    assert len(compressed) < len(LONG_TEXT.encode('utf-8'))
+    assert decompress_text(compressed) == LONG_TEXT
+    assert decompress_text(memoryview(compressed)) == LONG_TEXT
+
+def test_short_and_plain_values_are_left_alone():
+    short = 'x' * (MIN_COMPRESS_BYTES - 1)
+    assert compress_text(short) == short
+    assert decompress_text(short) == short
+    assert decompress_text(LONG_TEXT.encode('utf-8')) == LONG_TEXT
+    assert decompress_text(None) is None
+
+def test_columns_are_stored_compressed_and_read_back_as_written(app):
+    article = _article(LONG_TEXT, SUMMARY)
+    assert _stored_types(article) == ('blob', 'blob')
+    assert _read_back(article) == (LONG_TEXT, SUMMARY)
+
+    short = _article('Short body', {'summary': 'S'})
+    assert _stored_types(short) == ('text', 'text')
+    assert _read_back(short) == ('Short body', {'summary': 'S'})
+
+def test_compress_existing_articles(app):
+    articles = [_article(LONG_TEXT, SUMMARY) for _ in range(3)]
+    short = _article('Short body')
+    # Store the bodies and summaries as plain text, as they were before compression
+    db.session.execute(text('UPDATE parsed_content SET content = decompress_text(content), '
+                            'summary = decompress_text(summary)'))
+    db.session.commit()
+    assert {_stored_types(article) for article in articles} == {('text', 'text')}
+
+    assert ParsedContent.compress_existing_articles(chunk_size=2) == 3
+
+    assert {_stored_types(article) for article in articles} == {('blob', 'blob')}
+    assert _stored_types(short) == ('text', 'null')
+    assert [_read_back(article) for article in articles] == [(LONG_TEXT, SUMMARY)] * 3
+    assert _read_back(short) == ('Short body', None)
+    assert JobCheckpoint.load(COMPRESS_JOB_NAME) is None
+    assert ParsedContent.compress_existing_articles() == 0
+
+def test_compress_existing_articles_resumes_from_its_checkpoint(app):
+    articles = sorted((_article(LONG_TEXT) for _ in range(3)), key=lambda article: article.id)
+    db.session.execute(text('UPDATE parsed_content SET content = decompress_text(content)'))
+    JobCheckpoint.save(COMPRESS_JOB_NAME, articles[0].id.hex)
+    db.session.commit()
+
+    assert ParsedContent.compress_existing_articles() == 2
+    assert [_stored_types(article)[0] for article in articles] == ['text', 'blob', 'blob']
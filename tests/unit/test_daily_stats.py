@@ -0,0 +1,99 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+
+from app.models.relational import db, ContentTag, DailyStatCount, DailyStats, ParsedContent, RSSFeed
+
+DAY = date(2024, 1, 2)
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        feed = RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news')
+        db.session.add(feed)
+        db.session.add_all(_article(feed, creator='alice') for _ in range(3))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _article(feed, creator=None):
+    return ParsedContent(id=uuid.uuid4(), title='Article', url=f'https://news.example/{uuid.uuid4().hex}',
+                         content='body', feed_id=feed.id, creator=creator, pub_date=datetime(2024, 1, 2, 9))
+
+def test_reading_an_unstored_day_writes_nothing(app):
+    stats = DailyStats.stats_for_day(DAY)
+    assert stats['articles_today'] == 3
+    assert stats['top_sites'] == [('Feed A', 3)]
+    assert db.session.query(DailyStats).count() == 0
+    assert db.session.query(DailyStatCount).count() == 0
+
+def test_stored_day_is_kept_current_by_increments(app):
+    DailyStats.materialize(DAY)
+    db.session.commit()
+    feed = db.session.query(RSSFeed).one()
+
+    article = _article(feed)
+    db.session.add(article)
+    db.session.flush()
+    db.session.add(ContentTag(parsed_content_id=article.id, entity_type='actor', entity_id=uuid.uuid4(),
+                              entity_name='APT29', start_char=0, end_char=4))
+    db.session.commit()
+    stats = DailyStats.stats_for_day(DAY)
+    assert stats['articles_today'] == 4
+    assert stats['top_authors'] == [('alice', 3), ('Unknown', 1)]
+    assert stats['actor_occurrences'] == [{'entity_name': 'APT29', 'occurrence_count': 1}]
+
+    db.session.delete(db.session.query(ContentTag).one())
+    db.session.delete(article)
+    db.session.commit()
+    stats = DailyStats.stats_for_day(DAY)
+    assert stats['articles_today'] == 3
+    assert stats['top_authors'] == [('alice', 3)]
+    assert stats['actor_occurrences'] == []
+    # Counts that drop to zero are removed
+    assert db.session.query(DailyStatCount).filter_by(dimension='author', key='Unknown').count() == 0
+
+def test_finalize_recounts_past_days(app):
+    DailyStats.materialize(DAY)
+    db.session.commit()
+    db.session.query(DailyStatCount).filter_by(dimension='articles').update({DailyStatCount.count: 99})
+    db.session.commit()
+    assert DailyStats.finalize_past_days() == 1
+    assert DailyStats.stats_for_day(DAY)['articles_today'] == 3
+    assert db.session.query(DailyStats).filter_by(day=DAY).one().finalized
+
+def test_feed_deletion_recounts_only_its_days(app):
+    from app.services.parsed_content_service import ParsedContentService
+
+    other_day = date(2023, 12, 1)
+    other_feed = RSSFeed(id=uuid.uuid4(), url='https://other.example/rss', title='Feed B', category='news')
+    db.session.add(other_feed)
+    db.session.add(_article(other_feed))
+    old_article = _article(db.session.query(RSSFeed).filter_by(title='Feed A').one())
+    old_article.pub_date = datetime(2023, 12, 1, 9)
+    db.session.add(old_article)
+    db.session.commit()
+    DailyStats.materialize(DAY, finalized=True)
+    DailyStats.materialize(other_day, finalized=True)
+    db.session.commit()
+
+    ParsedContentService.delete_parsed_content_by_feed_id(other_feed.id)
+    db.session.commit()
+
+    assert DailyStats.stats_for_day(DAY)['articles_today'] == 3
+    assert DailyStats.stats_for_day(DAY)['top_sites'] == [('Feed A', 3)]
+    assert DailyStats.stats_for_day(other_day)['articles_today'] == 1
+    # Both days stay stored and finalized
+    assert {(stats.day, stats.finalized) for stats in db.session.query(DailyStats)} == {(DAY, True), (other_day, True)}
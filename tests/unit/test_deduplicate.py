@@ -0,0 +1,101 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from app.models.relational import db, Category, ContentTag, ParsedContent, RSSFeed
+from app.models.relational.content_fingerprint import ContentFingerprint, LSHBucket
+from app.models.relational.summary_job import SummaryJob
+from app.services.parsed_content_service import ParsedContentService
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        # Enforce foreign keys as PostgreSQL does, so a missed dependent table fails the delete
+        db.session.execute(text('PRAGMA foreign_keys = ON'))
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _feed(title):
+    feed = RSSFeed(id=uuid.uuid4(), url=f'https://{title}.example/rss', title=title, category='news')
+    db.session.add(feed)
+    return feed
+
+def _article(feed, url, created_at, category):
+    """Add an article with a row in every table that references parsed_content."""
+    article = ParsedContent(id=uuid.uuid4(), title='Article', url=url, content='body', feed_id=feed.id,
+                            pub_date=datetime(2024, 1, 2, 9), created_at=created_at)
+    article.categories.append(category)
+    db.session.add(article)
+    db.session.flush()
+    db.session.add_all([
+        ContentTag(parsed_content_id=article.id, entity_type='actor', entity_id=uuid.uuid4(),
+                   entity_name='APT29', start_char=0, end_char=5),
+        ContentFingerprint(parsed_content_id=article.id, cluster_id=article.id, signature=b'\x00' * 8),
+        LSHBucket(band_key=f'0:{article.id.hex[:8]}', parsed_content_id=article.id),
+        SummaryJob(parsed_content_id=article.id),
+    ])
+    return article
+
+def _orphans():
+    counts = {}
+    for table, column in (
+        ('content_tags', 'parsed_content_id'),
+        ('parsed_content_categories', 'parsed_content_id'),
+        ('content_fingerprints', 'parsed_content_id'),
+        ('lsh_buckets', 'parsed_content_id'),
+        ('summary_jobs', 'parsed_content_id'),
+    ):
+        counts[table] = db.session.execute(text(
+            f'SELECT COUNT(*) FROM {table} WHERE {column} NOT IN (SELECT id FROM parsed_content)'
+        )).scalar()
+    return counts
+
+NO_ORPHANS = {table: 0 for table in
+              ('content_tags', 'parsed_content_categories', 'content_fingerprints', 'lsh_buckets', 'summary_jobs')}
+
+def test_deduplicate_keeps_the_earliest_article_of_each_url(app):
+    feed_a, feed_b, feed_c = _feed('a'), _feed('b'), _feed('c')
+    category = Category(name='Ransomware')
+    start = datetime(2024, 1, 2, 10)
+    earliest = _article(feed_b, 'https://news.example/1', start, category)
+    for feed, hours in ((feed_a, 1), (feed_c, 2)):
+        _article(feed, 'https://news.example/1', start + timedelta(hours=hours), category)
+    unique = _article(feed_a, 'https://news.example/2', start + timedelta(hours=3), category)
+    db.session.commit()
+
+    assert ParsedContent.deduplicate(chunk_size=1) == 2
+
+    db.session.expire_all()
+    assert {id for (id,) in db.session.query(ParsedContent.id)} == {earliest.id, unique.id}
+    assert db.session.query(SummaryJob).count() == 2
+    assert db.session.query(ContentTag).count() == 2
+    assert _orphans() == NO_ORPHANS
+    assert ParsedContent.deduplicate() == 0
+
+def test_deleting_a_feeds_content_removes_its_dependent_rows(app):
+    feed_a, feed_b = _feed('a'), _feed('b')
+    category = Category(name='Ransomware')
+    kept = _article(feed_a, 'https://news.example/1', datetime(2024, 1, 2, 10), category)
+    for i in range(3):
+        _article(feed_b, f'https://news.example/b{i}', datetime(2024, 1, 2, 11), category)
+    db.session.commit()
+
+    ParsedContentService.delete_parsed_content_by_feed_id(feed_b.id)
+    db.session.commit()
+
+    assert [id for (id,) in db.session.query(ParsedContent.id)] == [kept.id]
+    assert db.session.query(LSHBucket).count() == 1
+    assert _orphans() == NO_ORPHANS
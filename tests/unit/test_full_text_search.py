@@ -0,0 +1,152 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import sqlite3
+import uuid
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import delete, text
+
+from app.models.relational import db, ParsedContent, RSSFeed
+from app.utils.full_text_search import (apply_match, build_match_text, init_full_text_search, is_enabled,
+                                        rebuild_full_text_index)
+
+def _app(uri='sqlite://'):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = uri
+    app.config['TESTING'] = True
+    db.init_app(app)
+    return app
+
+@pytest.fixture
+def app():
+    app = _app()
+    with app.app_context():
+        db.create_all()
+        assert init_full_text_search(db.engine)
+        db.session.add(RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _article(title, content):
+    feed = db.session.query(RSSFeed).one()
+    article = ParsedContent(id=uuid.uuid4(), title=title, url=f'https://news.example/{uuid.uuid4().hex}',
+                            content=content, feed_id=feed.id, pub_date=datetime(2024, 1, 2, 9))
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+def _search(text):
+    query, _ = apply_match(db.session.query(ParsedContent.title), build_match_text(text))
+    return sorted(title for (title,) in query)
+
+def test_index_follows_inserts_updates_and_deletes(app):
+    article = _article('LockBit returns', 'The ransomware gang is back.')
+    assert _search('ransomware') == ['LockBit returns']
+
+    article.title = 'Cl0p returns'
+    article.content = 'The extortion gang is back.'
+    db.session.commit()
+    assert _search('ransomware') == []
+    assert _search('lockbit') == []
+    assert _search('extortion') == ['Cl0p returns']
+
+    # The body is deferred, so a title-only update reads it back from the database
+    db.session.expire_all()
+    article = db.session.get(ParsedContent, article.id)
+    article.title = 'Cl0p strikes again'
+    db.session.commit()
+    assert _search('extortion strikes') == ['Cl0p strikes again']
+
+    db.session.delete(article)
+    db.session.commit()
+    assert _search('extortion') == []
+
+def test_bulk_deletes_leave_the_index(app):
+    articles = [_article(f'Report {i}', 'Ransomware ' * 100) for i in range(3)]
+    db.session.execute(delete(ParsedContent).where(ParsedContent.id.in_([articles[0].id, articles[1].id])))
+    db.session.commit()
+    assert _search('ransomware') == ['Report 2']
+
+def test_other_sqlite_clients_can_write_articles(tmp_path):
+    path = tmp_path / 'threats.db'
+    app = _app(f'sqlite:///{path}')
+    with app.app_context():
+        db.create_all()
+        init_full_text_search(db.engine)
+        db.session.add(RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news'))
+        db.session.commit()
+        kept = _article('LockBit returns', 'Ransomware ' * 100)
+        deleted = _article('Cl0p returns', 'Extortion ' * 100)
+
+        # A client without the app's decompress_text() function
+        connection = sqlite3.connect(path)
+        connection.execute("UPDATE parsed_content SET title = 'LockBit is back' WHERE id = ?", (kept.id.hex,))
+        connection.execute('DELETE FROM parsed_content WHERE id = ?', (deleted.id.hex,))
+        connection.commit()
+        connection.close()
+
+        assert _search('extortion') == []
+        rebuild_full_text_index(db.engine)
+        assert _search('ransomware back') == ['LockBit is back']
+        db.session.remove()
+
+def test_external_content_index_is_replaced(tmp_path):
+    app = _app(f'sqlite:///{tmp_path / "threats.db"}')
+    with app.app_context():
+        db.create_all()
+        db.session.add(RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news'))
+        db.session.commit()
+        _article('LockBit returns', 'Ransomware ' * 100)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("""CREATE VIEW parsed_content_fts_source AS
+                SELECT rowid AS doc_id, title, decompress_text(content) AS content FROM parsed_content""")
+            connection.exec_driver_sql("""CREATE VIRTUAL TABLE parsed_content_fts USING fts5(
+                title, content, content='parsed_content_fts_source', content_rowid='doc_id')""")
+            connection.exec_driver_sql("""CREATE TRIGGER parsed_content_fts_ai AFTER INSERT ON parsed_content BEGIN
+                INSERT INTO parsed_content_fts(rowid, title, content)
+                    VALUES (new.rowid, new.title, decompress_text(new.content));
+            END""")
+
+        assert init_full_text_search(db.engine)
+        objects = db.session.execute(text("SELECT type, name FROM sqlite_master WHERE name LIKE 'parsed_content_fts%'"
+                                          " AND type IN ('view', 'trigger')")).all()
+        assert objects == [('trigger', 'parsed_content_fts_delete')]
+        assert _search('ransomware') == ['LockBit returns']
+        db.session.remove()
+
+def test_every_term_must_match_as_a_prefix(app):
+    _article('LockBit affiliate arrested', 'Police seized ransomware infrastructure.')
+    _article('Ransomware trends', 'Payments fell this quarter.')
+
+    assert _search('ransom') == ['LockBit affiliate arrested', 'Ransomware trends']
+    assert _search('ransom lock') == ['LockBit affiliate arrested']
+    assert _search('ransom lock payments') == []
+    assert build_match_text('CVE-2024-1234 "x', ['Cobalt Strike']) == '"CVE-2024-1234"* """x"* "Cobalt Strike"'
+
+def test_rebuild_after_rowids_change(app):
+    articles = [_article(f'Report {i}', f'Indicator set number{i}') for i in range(3)]
+    db.session.delete(articles[0])
+    db.session.commit()
+
+    # VACUUM may renumber the rowids of parsed_content, which has no INTEGER PRIMARY KEY
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql('UPDATE parsed_content SET rowid = -rowid')
+        connection.exec_driver_sql('UPDATE parsed_content SET rowid = 5 + rowid')
+    assert _search('number1') == ['Report 2']
+
+    rebuild_full_text_index(db.engine)
+    assert _search('number1') == ['Report 1']
+    assert _search('number2') == ['Report 2']
+    assert _search('report') == ['Report 1', 'Report 2']
+
+def test_state_is_kept_per_engine(app):
+    other = _app()
+    with other.app_context():
+        assert not is_enabled()
+    assert is_enabled()
@@ -0,0 +1,28 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+
+from app.utils.json_repair import JSONRepairError, repair_json
+
+@pytest.mark.parametrize('text, expected', [
+    ('{"a": 1}', {'a': 1}),
+    ('```json\n{"a": [1, 2,],}\n```', {'a': [1, 2]}),
+    ('Here is the JSON:\n{"a": "x"}\nHope this helps!', {'a': 'x'}),
+    ('{"a": "cut off', {'a': 'cut off'}),
+    ('{"a": 1, "b', {'a': 1, 'b': None}),
+    ('{"a": 1, "b":', {'a': 1, 'b': None}),
+    ('{"a": [1, 2, {"c": "d', {'a': [1, 2, {'c': 'd'}]}),
+    ('{"k": "has } and ] inside", "n": tru', {'k': 'has } and ] inside'}),
+    ('{"a": 1} ```', {'a': 1}),
+    ('{"code": "wrap it in ```json fences```"}', {'code': 'wrap it in ```json fences```'}),
+    ('Sure:\n```json\n{"a": "```"}\n```', {'a': '```'}),
+    ('```\n[1, 2]\n```', [1, 2]),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+def test_repair_json_without_json():
+    with pytest.raises(JSONRepairError):
+        repair_json('I cannot summarize this article.')
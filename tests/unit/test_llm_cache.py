@@ -0,0 +1,102 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import asyncio
+
+import pytest
+from flask import Flask
+
+from app.utils import llm_cache
+from app.utils.llm_cache import cached_generation, clear_llm_cache, llm_cache_key, llm_cache_stats, prompt_version
+
+PROMPT = {'system_prompt': 'Summarize the article as JSON.'}
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path))
+    app.config['LLM_CACHE_SIZE_LIMIT'] = 10 * 1024 * 1024
+    with app.app_context():
+        yield app
+        clear_llm_cache()
+
+class Generator:
+    """A generate() callable that counts its calls."""
+
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.result
+
+def _generate(generator, prompt_data=PROMPT, model='llama3', text='article', **kwargs):
+    return asyncio.run(cached_generation('summary_json', prompt_data, model, text, generator, **kwargs))
+
+def test_key_composition():
+    key = llm_cache_key('summary_json', PROMPT, 'llama3', 'article')
+    prompt_type, version, model, digest = key.split(':')
+    assert (prompt_type, version, model) == ('summary_json', prompt_version(PROMPT), 'llama3')
+    assert len(digest) == 64
+    assert llm_cache_key('summary_json', PROMPT, 'llama3', 'other article') != key
+    assert llm_cache_key('summary_json', PROMPT, 'mistral', 'article') != key
+    assert llm_cache_key('rollup_json', PROMPT, 'llama3', 'article') != key
+
+def test_prompt_version():
+    assert prompt_version({'version': 3, 'system_prompt': 'a'}) == '3'
+    assert prompt_version({'version': 3, 'system_prompt': 'b'}) == '3'
+    assert prompt_version({'system_prompt': 'a'}) != prompt_version({'system_prompt': 'b'})
+
+def test_second_generation_is_served_from_the_cache(app):
+    generator = Generator({'summary': 'S'})
+    assert _generate(generator) == {'summary': 'S'}
+    assert _generate(generator) == {'summary': 'S'}
+    assert generator.calls == 1
+    assert llm_cache_stats()['entries'] == 1
+
+def test_editing_the_prompt_invalidates_its_answers(app):
+    generator = Generator({'summary': 'S'})
+    _generate(generator)
+    _generate(generator, prompt_data={'system_prompt': 'Summarize the article as JSON, briefly.'})
+    _generate(generator, prompt_data={**PROMPT, 'version': 2})
+    assert generator.calls == 3
+
+def test_error_results_are_not_cached(app):
+    generator = Generator({'error': 'Failed to generate valid JSON'})
+    cacheable = lambda result: 'error' not in result
+    _generate(generator, cacheable=cacheable)
+    _generate(generator, cacheable=cacheable)
+    assert generator.calls == 2
+    assert llm_cache_stats()['entries'] == 0
+
+def test_disabled_cache_always_generates(app):
+    app.config['LLM_CACHE_SIZE_LIMIT'] = 0
+    generator = Generator('answer')
+    _generate(generator)
+    _generate(generator)
+    assert generator.calls == 2
+    assert llm_cache_stats() is None
+
+def test_failing_cache_falls_back_to_generation(app, monkeypatch):
+    class BrokenCache:
+        def get(self, key):
+            raise OSError('disk I/O error')
+
+        def set(self, key, value):
+            raise OSError('disk I/O error')
+
+    monkeypatch.setattr(llm_cache, 'get_llm_cache', lambda: BrokenCache())
+    generator = Generator('answer')
+    assert _generate(generator) == 'answer'
+    assert _generate(generator) == 'answer'
+    assert generator.calls == 2
+
+def test_unavailable_cache_falls_back_to_generation(app, monkeypatch):
+    def unavailable():
+        raise OSError('read-only file system')
+
+    monkeypatch.setattr(llm_cache, 'get_llm_cache', unavailable)
+    generator = Generator('answer')
+    assert _generate(generator) == 'answer'
+    assert generator.calls == 1
@@ -0,0 +1,145 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import asyncio
+import uuid
+from datetime import datetime
+
+import httpx
+import pytest
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.models.relational import db, ParsedContent, RSSFeed
+from app.models.relational.content_fingerprint import ContentFingerprint, LSHBucket
+from app.services import feed_parser_service
+from app.utils.db_connection_manager import DBConnectionManager
+from app.utils.vector_index import content_text
+from app.utils.near_duplicates import (NUM_BANDS, band_keys, cluster_id_of, estimate_similarity, find_near_duplicate,
+                                       minhash_signature, record_fingerprint)
+
+STORY = ('LockBit affiliates exploited a critical vulnerability in a popular file transfer appliance to deploy '
+         'ransomware across hospitals, schools and logistics firms in three countries, according to a joint '
+         'advisory that lists indicators of compromise and urges administrators to patch exposed servers '
+         'immediately and to review remote access logs for signs of lateral movement')
+REWORDED = STORY.replace('three countries', 'four countries')
+OTHER_STORY = ('A new phishing kit impersonates payroll providers and steals session cookies to bypass multi-factor '
+               'authentication, researchers warned after tracking thousands of lures sent to finance teams during '
+               'the quarterly tax filing period')
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news'))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _article(description, content='body'):
+    feed = db.session.query(RSSFeed).one()
+    article = ParsedContent(id=uuid.uuid4(), title='Article', url=f'https://news.example/{uuid.uuid4().hex}',
+                            description=description, content=content, feed_id=feed.id, pub_date=datetime(2024, 1, 2, 9))
+    db.session.add(article)
+    db.session.flush()
+    return article
+
+def _fingerprint(article):
+    """Fingerprint an article the way feed ingestion does."""
+    signature = minhash_signature(content_text(article.title, article.description, None))
+    original = find_near_duplicate(db.session, signature)
+    record_fingerprint(db.session, article.id, signature,
+                       cluster_id=cluster_id_of(db.session, original.id) if original is not None else None)
+    db.session.commit()
+    return original
+
+def test_signatures():
+    signature = minhash_signature(STORY)
+    assert (signature == minhash_signature(STORY.upper())).all()
+    assert estimate_similarity(signature, minhash_signature(REWORDED)) >= 0.8
+    assert estimate_similarity(signature, minhash_signature(OTHER_STORY)) < 0.2
+    assert minhash_signature('LockBit strikes again') is None
+
+    keys = band_keys(signature)
+    assert len(set(keys)) == NUM_BANDS
+    assert [key.split(':')[0] for key in keys] == [f'{band:02d}' for band in range(NUM_BANDS)]
+
+def test_clusters_point_at_their_first_article(app):
+    original, reworded, copy, other = (_article(text) for text in (STORY, REWORDED, REWORDED, OTHER_STORY))
+
+    assert _fingerprint(original) is None
+    assert _fingerprint(reworded).id == original.id
+    assert _fingerprint(copy).id == original.id
+    assert _fingerprint(other) is None
+
+    assert [cluster_id_of(db.session, article.id) for article in (original, reworded, copy, other)] == \
+        [original.id, original.id, original.id, other.id]
+    assert not db.session.get(ContentFingerprint, original.id).is_duplicate
+    assert db.session.get(ContentFingerprint, copy.id).is_duplicate
+    # Only the first article of a cluster is written to the buckets
+    assert {bucket.parsed_content_id for bucket in db.session.query(LSHBucket)} == {original.id, other.id}
+    assert db.session.query(LSHBucket).count() == 2 * NUM_BANDS
+
+def test_a_band_is_stored_once_per_article(app):
+    article = _article(STORY)
+    db.session.add(LSHBucket(band_key='00:0123456789abcdef', parsed_content_id=article.id))
+    db.session.commit()
+    db.session.add(LSHBucket(band_key='00:0123456789abcdef', parsed_content_id=article.id))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+def _rss(*entries):
+    items = ''.join(
+        f'<item><title>{title}</title><link>{link}</link><description>{description}</description>'
+        f'<pubDate>Tue, 02 Jan 2024 09:00:00 GMT</pubDate></item>'
+        for title, link, description in entries
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed A</title>{items}</channel></rss>'
+
+class VectorIndex:
+    def add(self, items):
+        pass
+
+def test_only_exact_copies_reuse_content_and_summary(app, monkeypatch):
+    feed = db.session.query(RSSFeed).one()
+    original = _article(STORY, content='Full text of the original report')
+    original.title = 'LockBit hits hospitals'
+    original.art_hash = ParsedContent.compute_art_hash(original.title, STORY)
+    original.summary = {'summary': 'Original summary'}
+    db.session.commit()
+    _fingerprint(original)
+
+    feed_xml = _rss(('LockBit hits hospitals', 'https://mirror.example/copy', STORY),
+                    ('LockBit hits hospitals', 'https://mirror.example/reworded', REWORDED))
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, text=feed_xml))
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(feed_parser_service.httpx, 'AsyncClient',
+                        lambda **kwargs: real_client(transport=transport, **kwargs))
+    fetched = []
+
+    async def parse_content(url):
+        fetched.append(url)
+        return f'Full text fetched from {url}'
+
+    monkeypatch.setattr(feed_parser_service, 'parse_content', parse_content)
+    monkeypatch.setattr(feed_parser_service, 'embed_text', lambda text: None)
+    monkeypatch.setattr(feed_parser_service, 'get_vector_index', lambda: VectorIndex())
+    monkeypatch.setattr(DBConnectionManager, '_session_factory', sessionmaker(bind=db.engine))
+
+    assert asyncio.run(feed_parser_service.fetch_and_parse_feed(feed.id)) == 2
+
+    db.session.expire_all()
+    copy = db.session.query(ParsedContent).filter_by(url='https://mirror.example/copy').one()
+    reworded = db.session.query(ParsedContent).filter_by(url='https://mirror.example/reworded').one()
+    assert (copy.content, copy.summary) == ('Full text of the original report', {'summary': 'Original summary'})
+    assert (reworded.content, reworded.summary) == ('Full text fetched from https://mirror.example/reworded', None)
+    assert fetched == ['https://mirror.example/reworded']
+    assert cluster_id_of(db.session, copy.id) == cluster_id_of(db.session, reworded.id) == original.id
@@ -0,0 +1,45 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+
+from app.models.relational.parsed_content import render_tagged_text
+
+TEXT = 'APT29 used Cobalt Strike against NATO members.'
+
+def _span(entity_type, entity_id, text):
+    return f'<span class="tagged-entity" data-entity-type="{entity_type}" data-entity-id="{entity_id}">{text}</span>'
+
+def _legacy_insert_tags(text, tags):
+    """The splice-per-tag implementation render_tagged_text replaced."""
+    offset = 0
+    for start_char, end_char, entity_type, entity_id in tags:
+        if start_char < len(text):
+            start = start_char + offset
+            end = end_char + offset
+            link = _span(entity_type, entity_id, text[start:end])
+            text = text[:start] + link + text[end:]
+            offset += len(link) - (end - start)
+    return text
+
+@pytest.mark.parametrize('tags', [
+    (),
+    ((0, 5, 'actor', 'a1'),),
+    ((0, 5, 'actor', 'a1'), (11, 24, 'tool', 't1')),
+    ((0, 5, 'actor', 'a1'), (11, 24, 'tool', 't1'), (33, 37, 'org', 'o1')),
+    ((5, 11, 'misc', 'm1'), (11, 24, 'tool', 't1')),
+])
+def test_matches_legacy_output_without_overlaps(tags):
+    assert render_tagged_text(TEXT, tags) == _legacy_insert_tags(TEXT, tags)
+
+def test_overlapping_tag_is_skipped():
+    tags = ((11, 24, 'tool', 't1'), (18, 24, 'tool', 't2'), (33, 37, 'org', 'o1'))
+    assert render_tagged_text(TEXT, tags) == (
+        'APT29 used ' + _span('tool', 't1', 'Cobalt Strike') + ' against '
+        + _span('org', 'o1', 'NATO') + ' members.'
+    )
+
+def test_tags_past_the_end_of_the_text():
+    tags = ((33, 80, 'org', 'o1'), (len(TEXT), len(TEXT) + 4, 'actor', 'a1'), (100, 104, 'actor', 'a2'))
+    assert render_tagged_text(TEXT, tags) == 'APT29 used Cobalt Strike against ' + _span('org', 'o1', 'NATO members.')
@@ -0,0 +1,61 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import uuid
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from app.models.relational import db, Category, ContentTag, ParsedContent, RSSFeed
+from app.utils.full_text_search import init_full_text_search
+from app.utils.search_utils import SearchParams, _compute_search_facets
+
+MENTIONS_PER_ARTICLE = 10
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        # Search goes through the full-text index, as it does in the app
+        init_full_text_search(db.engine)
+        _seed()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _seed():
+    """Add three ransomware articles that each mention LockBit many times."""
+    feed = RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news')
+    category = Category(id=uuid.uuid4(), name='Ransomware')
+    db.session.add_all([feed, category])
+    actor_id = uuid.uuid4()
+    for i in range(3):
+        content = ParsedContent(
+            id=uuid.uuid4(),
+            title=f'Ransomware report {i}',
+            url=f'https://news.example/{i}',
+            content='LockBit ' * MENTIONS_PER_ARTICLE,
+            feed_id=feed.id,
+            pub_date=datetime(2024, 1, 1, 12, i),
+        )
+        content.categories.append(category)
+        db.session.add(content)
+        db.session.add_all(
+            ContentTag(parsed_content_id=content.id, entity_type='actor', entity_id=actor_id,
+                       entity_name='LockBit', start_char=8 * m, end_char=8 * m + 7)
+            for m in range(MENTIONS_PER_ARTICLE)
+        )
+    db.session.commit()
+
+def test_facets_count_articles_not_mentions(app):
+    facets = _compute_search_facets(SearchParams(query='Ransomware'), limit=10)
+    assert facets['feeds'] == [{'value': 'Feed A', 'count': 3}]
+    assert facets['categories'] == [{'value': 'Ransomware', 'count': 3}]
+    assert facets['entities'] == [{'value': 'LockBit', 'count': 3, 'type': 'actor'}]
+    assert facets['pub_dates'] == [{'value': '2024-01-01', 'count': 3}]
@@ -0,0 +1,102 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from app.blueprints.parsed_content import bp as parsed_content_bp
+from app.models.relational import db, ParsedContent, RSSFeed
+from app.services.parsed_content_service import ParsedContentService
+
+SMALL_DAY = datetime(2024, 1, 1)
+LARGE_DAY = datetime(2024, 1, 2)
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    app.register_blueprint(parsed_content_bp, url_prefix='/parsed_content')
+    with app.app_context():
+        db.create_all()
+        _seed(SMALL_DAY, 5)
+        _seed(LARGE_DAY, 500)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _seed(day, count, feeds=25):
+    """Add count articles published on day, spread over several feeds."""
+    feed_rows = [
+        RSSFeed(id=uuid.uuid4(), url=f'https://feed.example/{uuid.uuid4().hex}', title=f'Feed {i}', category='news')
+        for i in range(feeds)
+    ]
+    db.session.add_all(feed_rows)
+    db.session.add_all(
+        ParsedContent(
+            id=uuid.uuid4(),
+            title=f'Article {i}',
+            url=f'https://news.example/{uuid.uuid4().hex}',
+            description='An article',
+            content='Article body',
+            feed_id=feed_rows[i % feeds].id,
+            pub_date=day + timedelta(minutes=i),
+        )
+        for i in range(count)
+    )
+    db.session.commit()
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed on the engine inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def test_latest_parsed_content_query_count_is_constant(app):
+    db.session.expunge_all()
+    with count_queries() as small:
+        assert len(ParsedContentService.get_latest_parsed_content(limit=5)) == 5
+    db.session.expunge_all()
+    with count_queries() as large:
+        items = ParsedContentService.get_latest_parsed_content(limit=500)
+    assert len(items) == 500
+    assert all(item['rss_feed_title'] for item in items)
+    assert len(large) == len(small)
+
+@pytest.mark.parametrize('query_string', ['', '&limit=500'])
+def test_list_content_query_count_is_constant(app, query_string):
+    client = app.test_client()
+    counts = []
+    for day, expected in ((SMALL_DAY, 5), (LARGE_DAY, 500)):
+        db.session.expunge_all()
+        with count_queries() as statements:
+            response = client.get(f'/parsed_content/list?date={day.date().isoformat()}{query_string}')
+        assert response.status_code == 200
+        assert len(response.get_json()['content']) == expected
+        counts.append(len(statements))
+    assert counts[0] == counts[1]
+
+def test_tagged_content_loads_feed_with_tags(app):
+    item = ParsedContent.query.first()
+    db.session.expunge_all()
+    item = db.session.get(ParsedContent, item.id)
+    with count_queries() as statements:
+        tagged = item.get_tagged_content()
+    assert tagged['rss_feed_title'].startswith('Feed ')
+    # One statement for the item with its tags and feed, one for the deferred summary
+    assert len(statements) == 2
@@ -0,0 +1,172 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import click
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.relational import db, ParsedContent, RSSFeed
+from app.models.relational.summary_job import BACKLOG_PRIORITY, INTERACTIVE_PRIORITY, SummaryJob
+from app.services import summary_service
+from app.services.summary_service import SummaryService
+from app.services.summary_worker import JOB_LEASE, SummaryWorker, init_summary_worker
+from app.utils.db_connection_manager import DBConnectionManager
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['TESTING'] = True
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        feed = RSSFeed(id=uuid.uuid4(), url='https://feed.example/rss', title='Feed A', category='news')
+        db.session.add(feed)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def _article(summary=None):
+    feed = db.session.query(RSSFeed).one()
+    article = ParsedContent(id=uuid.uuid4(), title='Article', url=f'https://news.example/{uuid.uuid4().hex}',
+                            content='body', feed_id=feed.id, pub_date=datetime(2024, 1, 2, 9), summary=summary)
+    db.session.add(article)
+    db.session.commit()
+    return article
+
+def _queue(count, priority, started=datetime(2024, 1, 1)):
+    jobs = [
+        SummaryJob(parsed_content_id=_article().id, priority=priority, created_at=started + timedelta(minutes=i))
+        for i in range(count)
+    ]
+    db.session.add_all(jobs)
+    db.session.commit()
+    return jobs
+
+def test_claim_keeps_a_slot_free_of_backlog_jobs(app):
+    worker = SummaryWorker(app, concurrency=3)
+    backlog = _queue(3, BACKLOG_PRIORITY)
+
+    claimed = worker._claim(3, worker._backlog_slots())
+    assert [job_id for job_id, _, _ in claimed] == [job.id for job in backlog[:2]]
+
+    worker._running_backlog = 2
+    assert worker._backlog_slots() == 0
+    interactive = _queue(1, INTERACTIVE_PRIORITY, started=datetime(2024, 1, 2))
+    claimed = worker._claim(1, worker._backlog_slots())
+    assert [job_id for job_id, _, _ in claimed] == [interactive[0].id]
+    assert db.session.get(SummaryJob, backlog[2].id).status == SummaryJob.QUEUED
+
+def test_claim_skips_jobs_claimed_by_another_worker(app):
+    worker = SummaryWorker(app, concurrency=2)
+    first, second = _queue(2, INTERACTIVE_PRIORITY)
+
+    # Another process claims the first job between the select and the conditional update
+    def race(connection, cursor, statement, parameters, context, executemany):
+        if statement.startswith('UPDATE summary_jobs') and not raced:
+            raced.append(True)
+            connection.connection.cursor().execute(
+                "UPDATE summary_jobs SET status = 'running' WHERE id = ?", (first.id.hex,)
+            )
+    raced = []
+    event.listen(db.engine, 'before_cursor_execute', race)
+    try:
+        claimed = worker._claim(2, worker._backlog_slots())
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', race)
+    db.session.expire_all()
+
+    assert raced
+    assert [job_id for job_id, _, _ in claimed] == [second.id]
+    job = db.session.get(SummaryJob, second.id)
+    assert (job.status, job.attempts) == (SummaryJob.RUNNING, 1)
+    assert db.session.get(SummaryJob, first.id).attempts == 0
+
+def test_submit_reprioritizes_the_active_job(app):
+    queued = _queue(2, BACKLOG_PRIORITY)
+
+    job = SummaryJob.submit(queued[1].parsed_content_id)
+    db.session.commit()
+    assert job.id == queued[1].id
+    assert job.priority == INTERACTIVE_PRIORITY
+    assert job.queue_position() == 0
+    assert db.session.query(SummaryJob).count() == 2
+
+    # A backlog submit never lowers the priority again
+    SummaryJob.submit(queued[1].parsed_content_id, BACKLOG_PRIORITY)
+    assert job.priority == INTERACTIVE_PRIORITY
+
+def test_submit_queues_a_new_job_once_the_last_one_finished(app):
+    job = _queue(1, BACKLOG_PRIORITY)[0]
+    job.status = SummaryJob.FAILED
+    db.session.commit()
+
+    new_job = SummaryJob.submit(job.parsed_content_id)
+    db.session.commit()
+    assert new_job.id != job.id
+    assert (new_job.status, new_job.priority) == (SummaryJob.QUEUED, INTERACTIVE_PRIORITY)
+
+def test_requeue_expired_leaves_live_jobs_running(app):
+    expired, live, queued = _queue(3, BACKLOG_PRIORITY)
+    expired.status, expired.started_at = SummaryJob.RUNNING, datetime.utcnow() - JOB_LEASE - timedelta(minutes=1)
+    live.status, live.started_at = SummaryJob.RUNNING, datetime.utcnow()
+    db.session.commit()
+
+    assert SummaryJob.requeue_expired(JOB_LEASE) == 1
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(SummaryJob, expired.id).status == SummaryJob.QUEUED
+    assert db.session.get(SummaryJob, expired.id).started_at is None
+    assert db.session.get(SummaryJob, live.id).status == SummaryJob.RUNNING
+    assert SummaryJob.queue_depth() == 2
+
+def test_no_worker_is_started_by_flask_commands(app, monkeypatch):
+    app.config.update(TESTING=False, SUMMARY_CONCURRENCY=1)
+    monkeypatch.setenv('FLASK_RUN_FROM_CLI', 'true')
+    started = []
+    monkeypatch.setattr(SummaryWorker, 'start', lambda self: started.append(self))
+
+    with click.Context(click.Command('deduplicate-content')):
+        assert init_summary_worker(app) is None
+    with click.Context(click.Command('run')):
+        assert init_summary_worker(app) is not None
+    monkeypatch.delenv('FLASK_RUN_FROM_CLI')
+    assert init_summary_worker(app) is not None
+    assert len(started) == 2
+
+def test_already_summarized_article_is_a_success(app, monkeypatch):
+    monkeypatch.setattr(DBConnectionManager, '_session_factory', sessionmaker(bind=db.engine))
+    article = _article(summary={'summary': 'Already done'})
+
+    assert asyncio.run(SummaryService().enhance_summary(article.id.hex)) is True
+
+def test_chunks_share_the_concurrency_limit_and_time_out_per_call(app, monkeypatch):
+    app.config['SUMMARY_CONCURRENCY'] = 2
+    monkeypatch.setattr(summary_service, 'CHUNK_TIMEOUT', 0.2)
+
+    class SlowAPI:
+        in_flight = peak = 0
+
+        async def generate_json(self, prompt_type, chunk):
+            SlowAPI.in_flight += 1
+            SlowAPI.peak = max(SlowAPI.peak, SlowAPI.in_flight)
+            try:
+                await asyncio.sleep(1 if chunk == 'slow' else 0.02)
+            finally:
+                SlowAPI.in_flight -= 1
+            return {'notes': chunk}
+
+    chunks = ['slow', 'slow', 'a', 'b', 'c']
+    notes = asyncio.run(SummaryService()._summarize_chunks(SlowAPI(), 'article', chunks))
+
+    # The slow chunks time out, and the others finish although they waited CHUNK_TIMEOUT for a slot
+    assert notes == [{'notes': chunk} for chunk in ('a', 'b', 'c')]
+    assert SlowAPI.peak == 2
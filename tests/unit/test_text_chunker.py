@@ -0,0 +1,47 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+import pytest
+
+from app.utils.text_chunker import (CHUNK_TOKENS, SINGLE_PASS_MAX_TOKENS, count_tokens, select_evenly,
+                                    split_for_summary)
+
+def _report(paragraphs):
+    return '\n\n'.join(
+        f'Paragraph {i}. ' + ' '.join(f'The actor deployed implant number {j} on host {i}.' for j in range(40))
+        for i in range(paragraphs)
+    )
+
+@pytest.mark.parametrize('count, limit, expected', [
+    (3, 5, [0, 1, 2]),
+    (5, 5, [0, 1, 2, 3, 4]),
+    (9, 3, [0, 4, 8]),
+    (10, 4, [0, 3, 6, 9]),
+    (10, 1, [0]),
+])
+def test_select_evenly(count, limit, expected):
+    assert select_evenly(list(range(count)), limit) == expected
+
+def test_short_text_is_a_single_chunk():
+    text = _report(2)
+    assert count_tokens(text) <= SINGLE_PASS_MAX_TOKENS
+    assert split_for_summary(text) == [text]
+
+def test_long_text_is_split_on_paragraphs():
+    text = _report(40)
+    chunks = split_for_summary(text, max_chunks=100)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= CHUNK_TOKENS for chunk in chunks)
+    assert all(chunk.startswith('Paragraph') for chunk in chunks)
+    assert chunks[0].startswith('Paragraph 0.')
+    assert chunks[-1].endswith('on host 39.')
+
+def test_long_text_is_capped_at_max_chunks():
+    text = _report(40)
+    chunks = split_for_summary(text, max_chunks=100)
+
+    capped = split_for_summary(text, max_chunks=3)
+    assert capped == select_evenly(chunks, 3)
+    assert (capped[0], capped[-1]) == (chunks[0], chunks[-1])